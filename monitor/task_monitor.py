@@ -1,83 +1,226 @@
+import re
+import time
+
 import psutil
-from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+from prometheus_client import CollectorRegistry, Gauge, push_to_gateway, start_http_server
 
 
 class TaskMetrics:
-    def __init__(self, task_name, monitor_url):
+    """
+    Coleta as métricas de CPU, memória, threads e E/S de tarefas do sistema.
+
+    Os processos de cada tarefa são resolvidos uma única vez pelo padrão do nome ou da linha
+    de comando, e os handles psutil.Process são mantidos entre as coletas, de modo que o uso de
+    CPU é a diferença desde a coleta anterior. As tarefas são resolvidas novamente quando algum
+    processo termina e a cada `rescan_interval` segundos, para encontrar processos novos.
+    """
+
+    def __init__(self, tasks, monitor_url=None, rescan_interval=60.0, clock=time.monotonic):
         """
         Inicializa o módulo de métricas.
 
-        :param task_name: Nome ou identificação da tarefa
-        :param monitor_url: URL do módulo monitor (Prometheus Pushgateway)
+        :param tasks: Padrões (expressões regulares) do nome ou da linha de comando das tarefas
+                      monitoradas, ou um único padrão
+        :param monitor_url: URL do módulo monitor (Prometheus Pushgateway), ou None para expor
+                            as métricas apenas pelo endpoint HTTP
+        :param rescan_interval: Intervalo em segundos entre as buscas por processos novos
+        :param clock: Função que retorna o instante atual em segundos
         """
-        self.cpu_usage1 = Gauge("script_cpu_usage_percent", "CPU usage of the script in percent")
+        if isinstance(tasks, str):
+            tasks = [tasks]
 
-        self.task_name = task_name
+        self.tasks = list(tasks)
+        self.task_name = self.tasks[0]
         self.monitor_url = monitor_url
+        self.rescan_interval = rescan_interval
+        self._clock = clock
+        self._patterns = {task: re.compile(task) for task in self.tasks}
+        self._processes = {task: {} for task in self.tasks}
+        self._last_scan = None
+        self._exited = False
+
         self.registry = CollectorRegistry()
-        self.cpu_gauge = Gauge(
-            f'{task_name}_cpu_usage',
-            'CPU usage of the task in percentage',
-            registry=self.registry
-        )
-        self.memory_gauge = Gauge(
-            f'{task_name}_memory_usage',
-            'Memory usage of the task in bytes',
-            registry=self.registry
-        )
+        self.processes_gauge = Gauge('task_processes', 'Number of processes of the task',
+                                     ['task'], registry=self.registry)
+        self.cpu_gauge = Gauge('task_cpu_usage_percent',
+                               'CPU usage of the task in percentage, since the last collection',
+                               ['task'], registry=self.registry)
+        self.memory_gauge = Gauge('task_memory_rss_bytes',
+                                  'Resident memory (RSS) of the task in bytes',
+                                  ['task'], registry=self.registry)
+        self.threads_gauge = Gauge('task_threads', 'Number of threads of the task',
+                                   ['task'], registry=self.registry)
+        self.io_read_gauge = Gauge('task_io_read_bytes', 'Bytes read by the task processes',
+                                   ['task'], registry=self.registry)
+        self.io_write_gauge = Gauge('task_io_write_bytes', 'Bytes written by the task processes',
+                                    ['task'], registry=self.registry)
+
+    def resolve(self):
+        """
+        Busca os processos de todas as tarefas em uma única varredura dos processos do sistema.
+
+        Os processos já conhecidos mantêm o seu handle; os novos têm o uso de CPU iniciado, já
+        que a primeira medida do psutil é sempre 0.
+
+        :return: PIDs dos processos novos, cujo uso de CPU só é medido a partir da próxima coleta
+        """
+        self._last_scan = self._clock()
+        self._exited = False
+        primed = set()
+        for proc in psutil.process_iter(['name', 'cmdline']):
+            name = proc.info['name'] or ''
+            cmdline = ' '.join(proc.info['cmdline'] or [])
+            for task, pattern in self._patterns.items():
+                if proc.pid in self._processes[task]:
+                    continue
+                if pattern.search(name) or pattern.search(cmdline):
+                    try:
+                        proc.cpu_percent(None)
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+                    self._processes[task][proc.pid] = proc
+                    primed.add(proc.pid)
+        return primed
 
     def collect_metrics(self):
         """
-        Coleta as métricas de CPU e memória da tarefa.
+        Coleta as métricas de todas as tarefas e retorna as da primeira delas.
+
+        Mantém o retorno da versão de uma única tarefa; use `collect_tasks` para obter as
+        métricas de todas as tarefas.
+
+        :return: Tupla com o uso de CPU e a memória (RSS) da primeira tarefa, ou None se
+                 nenhum processo dela foi encontrado
+        """
+        totals = self.collect_tasks()[self.task_name]
+        if not totals['processes']:
+            return None
+        return totals['cpu'], totals['rss']
+
+    def collect_tasks(self):
         """
-        try:
+        Coleta as métricas de CPU, memória, threads e E/S de todas as tarefas.
 
-            # Coleta informações do processo pela identificação do nome
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-                print(proc)
-                if self.task_name in proc.info['name']:
-                    cpu_usage = proc.info['cpu_percent']
-                    memory_usage = proc.info['memory_info'].rss  # RSS (Resident Set Size)
-                    # cpu_usage1 = proc.cpu_percent(interval=1)
-                    print(cpu_usage, memory_usage)
-                    # Atualiza os valores das métricas
-                    # self.cpu_usage1.set(process.cpu_percent(interval=1))
-                    self.cpu_gauge.set(cpu_usage)
-                    self.memory_gauge.set(memory_usage)
-                    return cpu_usage, memory_usage
-        except Exception as e:
-            print(f"Erro ao coletar métricas: {e}")
-        return None, None
+        Cada processo é lido uma única vez com psutil.Process.oneshot. Os processos que
+        terminaram são descartados, e as tarefas são resolvidas novamente na próxima coleta.
+        Os processos encontrados nesta coleta não somam CPU, já que o intervalo desde o início
+        da medida seria curto demais para um valor confiável.
+
+        :return: Dicionário com as métricas somadas dos processos de cada tarefa
+        """
+        primed = set()
+        if self._needs_scan():
+            try:
+                primed = self.resolve()
+            except Exception as e:
+                print(f"Erro ao buscar os processos das tarefas: {e}")
+
+        metrics = {}
+        for task, processes in self._processes.items():
+            totals = {'processes': 0, 'cpu': 0.0, 'rss': 0, 'threads': 0,
+                      'read_bytes': 0, 'write_bytes': 0}
+            for pid, proc in list(processes.items()):
+                try:
+                    with proc.oneshot():
+                        cpu = 0.0 if pid in primed else proc.cpu_percent(None)
+                        rss = proc.memory_info().rss
+                        threads = proc.num_threads()
+                        io = self._io_counters(proc)
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    del processes[pid]
+                    self._exited = True
+                    continue
+                except psutil.AccessDenied:
+                    continue
+
+                totals['processes'] += 1
+                totals['cpu'] += cpu
+                totals['rss'] += rss
+                totals['threads'] += threads
+                if io is not None:
+                    totals['read_bytes'] += io.read_bytes
+                    totals['write_bytes'] += io.write_bytes
+
+            self.processes_gauge.labels(task).set(totals['processes'])
+            self.cpu_gauge.labels(task).set(totals['cpu'])
+            self.memory_gauge.labels(task).set(totals['rss'])
+            self.threads_gauge.labels(task).set(totals['threads'])
+            self.io_read_gauge.labels(task).set(totals['read_bytes'])
+            self.io_write_gauge.labels(task).set(totals['write_bytes'])
+            metrics[task] = totals
+
+        return metrics
+
+    def serve(self, port=8001):
+        """
+        Expõe as métricas das tarefas em um endpoint HTTP para o Prometheus coletar.
+
+        :param port: Porta do endpoint
+        """
+        start_http_server(port, registry=self.registry)
 
     def push_metrics(self):
         """
         Envia as métricas coletadas para o módulo monitor.
         """
+        if not self.monitor_url:
+            return
         try:
-            push_to_gateway(self.monitor_url, job=self.task_name, registry=self.registry)
+            push_to_gateway(self.monitor_url, job='task_monitor', registry=self.registry)
             print(f"Métricas enviadas com sucesso para {self.monitor_url}.")
         except Exception as e:
             print(f"Erro ao enviar métricas: {e}")
 
+    def run(self, interval=5.0):
+        """
+        Coleta as métricas periodicamente e as envia ao Pushgateway, se configurado.
+
+        :param interval: Intervalo em segundos entre as coletas
+        """
+        while True:
+            for task, totals in self.collect_tasks().items():
+                if totals['processes']:
+                    print(f"{task}: CPU {totals['cpu']:.1f}%, memória {totals['rss']} bytes, "
+                          f"{totals['threads']} threads")
+                else:
+                    print(f"Tarefa {task} não encontrada.")
+            self.push_metrics()
+            time.sleep(interval)
+
+    def _needs_scan(self):
+        """
+        Indica se os processos das tarefas devem ser buscados novamente.
+
+        :return: True na primeira coleta, quando algum processo terminou ou quando passou
+                 `rescan_interval` desde a última busca
+        """
+        if self._last_scan is None or self._exited:
+            return True
+        return self._clock() - self._last_scan >= self.rescan_interval
+
+    @staticmethod
+    def _io_counters(proc):
+        """
+        Lê os contadores de E/S de um processo, quando o sistema os fornece.
+
+        :param proc: Processo
+        :return: Contadores de E/S, ou None se indisponíveis
+        """
+        try:
+            return proc.io_counters()
+        except (AttributeError, psutil.AccessDenied):
+            return None
+
 
 # Exemplo de uso
 if __name__ == "__main__":
-    # Nome da tarefa (por exemplo, "Task 1") e URL do monitor (Prometheus Pushgateway)
-    task_name = "mjpg_streamer"
+    # Padrões das tarefas monitoradas e URL do monitor (Prometheus Pushgateway)
     tasks = ["mjpg_streamer", "kworker/u17:3-uvcvideo", "python"]
     monitor_url = "http://localhost:9091"
 
-    # Instância do monitor de métricas
-    task_metrics = TaskMetrics(task_name, monitor_url)
-
-    # Coleta e envia métricas em loop (simulando monitoramento contínuo)
-    import time
+    # Instância do monitor de métricas, com as métricas também expostas na porta 8001
+    task_metrics = TaskMetrics(tasks, monitor_url)
+    task_metrics.serve(8001)
 
-    while True:
-        cpu, memory = task_metrics.collect_metrics()
-        if cpu is not None:
-            print(f"CPU: {cpu}%, Memória: {memory} bytes")
-            task_metrics.push_metrics()
-        else:
-            print("Tarefa não encontrada.")
-        time.sleep(5)  # Intervalo entre as coletas
+    # Coleta e envia métricas em loop (monitoramento contínuo)
+    task_metrics.run(interval=5)
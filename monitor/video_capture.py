@@ -3,8 +3,12 @@ import json
 import time
 import psutil
 import threading
+import yaml
 from prometheus_client import start_http_server, Gauge
-import paho.mqtt.publish as publish
+from vision.components.comm.mqtt_publisher import MqttPublisher
+from vision.components.metrics import DEVICE, STAGE_SECONDS, stage_timer
+from vision.components.stream.capture import FrameGrabber
+from vision.components.stream.motion import MotionGate
 from vision.components.vision import image_processing
 from mjpeg_streamer import MjpegServer, Stream
 from start_streamer import start_mjpg_streamer
@@ -23,23 +27,42 @@ stream_url = "http://localhost:8080/?action=stream"
 memory_usage = Gauge("script_memory_usage_mb", "Memory usage of the script in MB")
 cpu_usage = Gauge("script_cpu_usage_percent", "CPU usage of the script in percent")
 mqtt_publish_count = Gauge("mqtt_publish_count", "Number of MQTT messages published")
-frame_processing_time = Gauge("frame_processing_time", "Time taken to process each frame in seconds")
+skipped_frames = Gauge("motion_skipped_frames", "Number of frames skipped by the motion gate")
+dropped_frames = Gauge("capture_dropped_frames", "Number of captured frames replaced by a newer one before processing")
 
 # Global variable
 publish_count = 0  # Count published messages
+skipped_count = 0  # Count frames without motion
 MSG_ANTERIOR = None  # Last Message published on MQTT
 
 # Start Image processor
 image_processor = image_processing.ImageProcessing()
 
+# Motion gate: only frames with enough movement are processed
+with open('../vision/components/config.yaml', 'r', encoding="utf-8") as f:
+    config = yaml.load(f, Loader=yaml.SafeLoader)
+motion_config = dict(config.get('MOTION_GATE', {}))
+motion_gate = None
+if motion_config.pop('enabled', False):
+    motion_gate = MotionGate(**motion_config)
+
+# Dispositivo do stream, usado como rótulo das latências de cada etapa (vision_stage_seconds)
+DEVICE_ID = "disp0990sdf09s90sdf098s"
+DEVICE.set(DEVICE_ID)
+
 # MQTT Configuration
 MQTT_HOST = "localhost"
 MQTT_PORT = 1884
 MQTT_TOPIC = "env1234541/devices"
 
+# Conexão persistente com o broker, reaproveitada em todas as publicações
+publisher = MqttPublisher(MQTT_HOST, MQTT_PORT)
+
 # Start Prometheus Server on 8000 port
 start_http_server(8000)
 
+# Quadros anotados com as armas detectadas são enviados ao stream MJPEG, sem inferência extra
+annotated_stream = config.get('ANNOTATED_STREAM', False)
 stream = Stream("my_camera", size=(640, 480), quality=50, fps=1)
 
 server = MjpegServer("localhost", 8080)
@@ -61,29 +84,27 @@ def capture_frames_from_stream(url: str):
     """
     Captura quadros em tempo real de um stream de vídeo.
 
+    A leitura do stream roda em uma thread separada que mantém apenas o quadro mais recente,
+    então o processamento sempre recebe o quadro mais novo e a latência não cresce enquanto
+    um quadro está sendo processado.
+
     Args:
         url (str): URL do stream.
 
     Yields:
         np.ndarray: Captured Frames as NumPy arrays.
     """
-    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)  # Força FFMPEG para leitura
-    # cap = cv2.VideoCapture(0)
-    # TaskMetrics.collect_metrics(self)
-
-    if not cap.isOpened():
-        print(f"Erro ao abrir o stream: {url}")
-        return
+    grabber = FrameGrabber(url)
+    grabber.start()
 
-    while True:
-        ret, frame = cap.read()
-
-        if not ret:
-            print("Erro ao capturar quadro do stream.")
-            break
-        yield frame
-
-    cap.release()
+    try:
+        while grabber.is_alive():
+            frame = grabber.read(timeout=5)
+            dropped_frames.set(grabber.dropped)
+            if frame is not None:
+                yield frame
+    finally:
+        grabber.stop()
 
 # Inicia a coleta de métricas do sistema em uma thread separada
 metrics_thread = threading.Thread(target=collect_metrics, daemon=True)
@@ -91,6 +112,12 @@ metrics_thread.start()
 
 # Processamento de quadros
 for frame in capture_frames_from_stream(stream_url):
+    # Ignora quadros sem movimento suficiente
+    if motion_gate is not None and not motion_gate(frame):
+        skipped_count += 1
+        skipped_frames.set(skipped_count)
+        continue
+
     start_time = time.time()  # Início da medição do tempo
     resized_frame = cv2.resize(frame, (640, 360))  # Ajuste para a resolução desejada
 
@@ -99,13 +126,16 @@ for frame in capture_frames_from_stream(stream_url):
     # cv2.imshow(stream.name, frame)
 
     # Processa o quadro
-    # frame1 = stream.set_frame(frame)
-    state = image_processor.process(frame)
+    if annotated_stream:
+        state, annotated_frame = image_processor.process_annotated(frame)
+        stream.set_frame(annotated_frame)
+    else:
+        state = image_processor.process(frame)
 
     # Cria mensagem para o MQTT
     request = {
         "device": "SALA_CAMERA_01",
-        "devId": "disp0990sdf09s90sdf098s",
+        "devId": DEVICE_ID,
         "productKey": "fs0s0sd9ss9",
         "space": "SALA",
         "message": {"status": [{"code": "stream", "value": "real-time"}]},
@@ -121,16 +151,21 @@ for frame in capture_frames_from_stream(stream_url):
         # global MSG_ANTERIOR, publish_count
         if MSG_ANTERIOR != dado_json:
             MSG_ANTERIOR = dado_json
-            publish.single(MQTT_TOPIC, dado_json, hostname=MQTT_HOST, port=MQTT_PORT)
-            publish_count += 1  # Incrementa o contador de publicações
-            mqtt_publish_count.set(publish_count)  # Atualiza métrica no Prometheus
-            print("Mensagem publicada com sucesso:", dado_json)
+            with stage_timer('publish'):
+                published = publisher.publish(MQTT_TOPIC, dado_json)
+            if published:
+                publish_count += 1  # Incrementa o contador de publicações
+                mqtt_publish_count.set(publish_count)  # Atualiza métrica no Prometheus
+                print("Mensagem publicada com sucesso:", dado_json)
+            else:
+                print("Mensagem descartada: broker MQTT indisponível")
     except Exception as e:
         print(f"Erro ao publicar no MQTT: {e}")
 
     # Tempo de execução do ciclo
     cycle_time = time.time() - start_time
-    frame_processing_time.set(cycle_time)  # Atualiza métrica do Prometheus
+    # Histograma no Prometheus, para que a cauda da latência não se perca entre as coletas
+    STAGE_SECONDS.labels('frame', DEVICE_ID).observe(cycle_time)
     print(f"Tempo de processamento do frame: {cycle_time:.4f} segundos")
 
     # Finaliza se pressionar 'q'
@@ -0,0 +1,22 @@
+import pytest
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """
+    Set up a clock that only moves when the test sets it.
+
+    GIVEN: No elapsed time.
+    WHEN: The fixture is used.
+    THEN: Return a callable clock reading its `now` attribute, starting at 0.
+    """
+    return FakeClock()
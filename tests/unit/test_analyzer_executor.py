@@ -0,0 +1,113 @@
+import time
+import pytest
+from vision.components.vision.analyzer_executor import AnalyzerExecutor
+
+
+def slow(seconds, result):
+    def analyzer():
+        time.sleep(seconds)
+        return result
+    return analyzer
+
+
+def failing():
+    raise RuntimeError("model error")
+
+
+class TestAnalyzerExecutor:
+
+    @pytest.fixture
+    def analyzers(self):
+        """
+        Set up the analyzers fixture.
+
+        GIVEN: Three analyzers that take 0.2 seconds each.
+        WHEN: The fixture is used.
+        THEN: Return the analyzers by name.
+        """
+        return {'people': slow(0.2, {'n_detected_people': 2}),
+                'faces': slow(0.2, {'recognized_people': ['mayki']}),
+                'weapons': slow(0.2, {'weapon_detected': False})}
+
+    def test_concurrent_execution(self, analyzers):
+        """
+        Test that analyzers run concurrently.
+
+        GIVEN: Three independent analyzers.
+        WHEN: They are run by a concurrent executor.
+        THEN: Assert that the results are merged and the latency is close to a single analyzer.
+        """
+        executor = AnalyzerExecutor(concurrent=True)
+
+        start = time.monotonic()
+        result, failed = executor.run(analyzers)
+        elapsed = time.monotonic() - start
+
+        assert not failed
+        assert result == {'n_detected_people': 2, 'recognized_people': ['mayki'],
+                          'weapon_detected': False}
+        assert elapsed < 0.5
+        executor.shutdown()
+
+    def test_sequential_execution(self, analyzers):
+        """
+        Test that analyzers run one after another in sequential mode.
+
+        GIVEN: Three independent analyzers.
+        WHEN: They are run by a sequential executor.
+        THEN: Assert that the latency is the sum of the analyzers.
+        """
+        executor = AnalyzerExecutor(concurrent=False)
+
+        start = time.monotonic()
+        result, failed = executor.run(analyzers)
+
+        assert time.monotonic() - start >= 0.6
+        assert len(result) == 3
+        assert not failed
+
+    def test_timeout_and_failure(self):
+        """
+        Test analyzers that exceed their timeout or fail.
+
+        GIVEN: An analyzer slower than its timeout, a failing analyzer and a fast analyzer.
+        WHEN: They are run by a concurrent executor.
+        THEN: Assert that only the fast analyzer contributes results and the others are
+              reported as failed.
+        """
+        executor = AnalyzerExecutor(concurrent=True, timeouts={'faces': 0.1})
+
+        result, failed = executor.run({'faces': slow(1, {'recognized_people': ['mayki']}),
+                                       'weapons': failing,
+                                       'people': slow(0, {'n_detected_people': 1})})
+
+        assert result == {'n_detected_people': 1}
+        assert failed == {'faces', 'weapons'}
+        executor.shutdown()
+
+    def test_busy_analyzer_not_submitted(self):
+        """
+        Test that an analyzer still running after its timeout is not submitted again.
+
+        GIVEN: An analyzer that timed out and is still running.
+        WHEN: The analyzers are run again before and after it finishes.
+        THEN: Assert that it is skipped and reported while busy, and run again once finished.
+        """
+        executor = AnalyzerExecutor(concurrent=True, timeouts={'faces': 0.1})
+        executor.run({'faces': slow(0.4, {'recognized_people': []})})
+
+        skipped = []
+        result, failed = executor.run({'faces': slow(0, {'recognized_people': ['mayki']}),
+                                       'people': slow(0, {'n_detected_people': 1})},
+                                      skipped.append)
+
+        assert result == {'n_detected_people': 1}
+        assert failed == {'faces'}
+        assert skipped == ['faces']
+
+        time.sleep(0.5)
+        result, failed = executor.run({'faces': slow(0, {'recognized_people': ['mayki']})})
+
+        assert result == {'recognized_people': ['mayki']}
+        assert not failed
+        executor.shutdown()
@@ -0,0 +1,96 @@
+import numpy as np
+from vision.components.vision.batching import MicroBatcher, group_frames
+from vision.components.vision.image_processing import ImageProcessing
+
+
+class TestBatching:
+
+    def test_group_frames_by_shape(self):
+        """
+        Test grouping of frames by shape.
+
+        GIVEN: Frames of two different shapes, interleaved.
+        WHEN: The frames are grouped.
+        THEN: Assert that frames with the same shape share a group, in order.
+        """
+        frames = [np.zeros((480, 640, 3)), np.zeros((720, 1280, 3)),
+                  np.zeros((480, 640, 3)), np.zeros((720, 1280, 3))]
+
+        assert group_frames(frames) == [[0, 2], [1, 3]]
+
+    def test_micro_batcher_collects_requests(self):
+        """
+        Test that concurrent requests are served by a single batch call.
+
+        GIVEN: A MicroBatcher with a batch size of four and a long wait.
+        WHEN: Four requests are submitted at once.
+        THEN: Assert that each request gets its own result from a single batch call.
+        """
+        calls = []
+
+        def double(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, max_batch_size=4, max_wait_ms=1000)
+        futures = [batcher.submit(item) for item in range(4)]
+
+        assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+        assert calls == [[0, 1, 2, 3]]
+        batcher.close()
+
+    def test_micro_batcher_wait_limit(self):
+        """
+        Test that a lone request is not held longer than the wait limit.
+
+        GIVEN: A MicroBatcher with a large batch size and a short wait.
+        WHEN: A single request is made.
+        THEN: Assert that its result is returned.
+        """
+        batcher = MicroBatcher(lambda items: [item + 1 for item in items],
+                               max_batch_size=64, max_wait_ms=5)
+
+        assert batcher(1) == 2
+        batcher.close()
+
+    def test_micro_batcher_propagates_errors(self):
+        """
+        Test that a failing batch fails every request of the batch.
+
+        GIVEN: A MicroBatcher whose batch function raises an exception.
+        WHEN: Requests are submitted.
+        THEN: Assert that every future carries the exception.
+        """
+        def fail(items):
+            raise ValueError("model error")
+
+        batcher = MicroBatcher(fail, max_batch_size=2, max_wait_ms=1000)
+        futures = [batcher.submit(item) for item in range(2)]
+
+        assert all(isinstance(future.exception(timeout=5), ValueError) for future in futures)
+        batcher.close()
+
+    def test_micro_batcher_short_results(self):
+        """
+        Test that a batch with fewer results than items fails its requests.
+
+        GIVEN: A MicroBatcher whose batch function drops the last result.
+        WHEN: Requests are submitted.
+        THEN: Assert that every future carries an error instead of a mismatched result.
+        """
+        batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=2, max_wait_ms=1000)
+        futures = [batcher.submit(item) for item in range(2)]
+
+        assert all(isinstance(future.exception(timeout=5), ValueError) for future in futures)
+        batcher.close()
+
+    def test_batch_device_label(self):
+        """
+        Test the device label of the stages of a micro-batch.
+
+        GIVEN: Batches with images of one and of several devices.
+        WHEN: The device label of the batch is computed.
+        THEN: Assert that the shared device is kept and mixed batches are labelled 'batch'.
+        """
+        assert ImageProcessing._batch_device(['cam1', 'cam1']) == 'cam1'
+        assert ImageProcessing._batch_device(['cam1', 'cam2']) == 'batch'
@@ -0,0 +1,88 @@
+import pytest
+from vision.bench.report import compare, measure, peak_rss_mb, summarize
+
+
+class TestMeasure:
+
+    def test_warmup_not_timed(self):
+        """
+        Test the measure of the latency of a stage.
+
+        GIVEN: Three frames and a stage recording the frames it processes.
+        WHEN: The stage is measured with two passes and two warm-up runs.
+        THEN: Assert that the warm-up runs use the first frame and only the passes are timed.
+        """
+        processed = []
+
+        latencies = measure([1, 2, 3], processed.append, repeat=2, warmup=2)
+
+        assert processed == [1, 1, 1, 2, 3, 1, 2, 3]
+        assert len(latencies) == 6
+        assert all(latency >= 0 for latency in latencies)
+
+
+class TestSummarize:
+
+    def test_percentiles_and_fps(self):
+        """
+        Test the summary of the latencies of a stage.
+
+        GIVEN: The latencies of 100 frames, from 1 to 100 ms.
+        WHEN: They are summarized.
+        THEN: Assert the percentiles, mean, max and frames per second.
+        """
+        summary = summarize([float(value) for value in range(1, 101)])
+
+        assert summary['frames'] == 100
+        assert summary['p50_ms'] == pytest.approx(50.5)
+        assert summary['p95_ms'] == pytest.approx(95.05)
+        assert summary['p99_ms'] == pytest.approx(99.01)
+        assert summary['mean_ms'] == pytest.approx(50.5)
+        assert summary['max_ms'] == 100.0
+        assert summary['fps'] == pytest.approx(1000 / 50.5, rel=1e-3)
+
+    def test_no_latencies(self):
+        """
+        Test that an empty stage is rejected.
+
+        GIVEN: No latency.
+        WHEN: It is summarized.
+        THEN: Assert that a ValueError is raised.
+        """
+        with pytest.raises(ValueError):
+            summarize([])
+
+    def test_peak_rss(self):
+        """
+        Test the peak resident memory of the process.
+
+        GIVEN: The running test process.
+        WHEN: Its peak memory is read.
+        THEN: Assert that it is a positive number of megabytes.
+        """
+        assert peak_rss_mb() > 0
+
+
+class TestCompare:
+
+    def test_regression_flagged(self):
+        """
+        Test the comparison with a baseline report.
+
+        GIVEN: A baseline and a run where one stage got 50% slower and another is new.
+        WHEN: The reports are compared with a 10% tolerance.
+        THEN: Assert that only the slower stage is a regression and the new one is ignored.
+        """
+        baseline = {'stages': {'person': {'p50_ms': 10.0, 'p95_ms': 20.0, 'fps': 100.0},
+                               'weapon': {'p50_ms': 40.0, 'p95_ms': 50.0, 'fps': 25.0}}}
+        current = {'stages': {'person': {'p50_ms': 10.0, 'p95_ms': 21.0, 'fps': 100.0},
+                              'weapon': {'p50_ms': 60.0, 'p95_ms': 75.0, 'fps': 16.0},
+                              'face': {'p50_ms': 5.0, 'p95_ms': 6.0, 'fps': 200.0}}}
+
+        comparison = compare(current, baseline, tolerance=0.1)
+
+        assert set(comparison) == {'person', 'weapon'}
+        assert comparison['person']['p95_ms'] == 1.05
+        assert not comparison['person']['regression']
+        assert comparison['weapon'] == {'p50_ms': 1.5, 'p95_ms': 1.5, 'fps': 0.64,
+                                        'regression': True}
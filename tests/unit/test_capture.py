@@ -0,0 +1,110 @@
+import threading
+import time
+import numpy as np
+from vision.components.stream.capture import FrameGrabber
+
+
+class FakeCapture:
+
+    def __init__(self, n_frames, opened=True):
+        self.frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(n_frames)]
+        self.opened = opened
+        self.released = False
+        self.gate = threading.Semaphore(0)
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        self.gate.acquire()
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+class TestFrameGrabber:
+
+    def test_latest_frame_is_read(self):
+        """
+        Test that a slow consumer always gets the freshest frame.
+
+        GIVEN: A stream that delivers three frames before the consumer reads.
+        WHEN: The consumer reads a frame.
+        THEN: Assert that it gets the last frame and the two older ones are dropped.
+        """
+        capture = FakeCapture(5)
+        grabber = FrameGrabber("rtsp://camera", opener=lambda url: capture)
+        grabber.start()
+
+        for _ in range(3):
+            capture.gate.release()
+        while grabber.captured < 3:
+            time.sleep(0.01)
+
+        assert int(grabber.read(timeout=1)[0, 0, 0]) == 2
+        assert grabber.dropped == 2
+        assert grabber.read(timeout=0.05) is None
+
+        capture.gate.release(10)
+        grabber.stop()
+
+    def test_stream_end(self):
+        """
+        Test that the grabber stops at the end of the stream.
+
+        GIVEN: A stream with a single frame.
+        WHEN: The stream ends.
+        THEN: Assert that the frame is read, the thread stops and the stream is released.
+        """
+        capture = FakeCapture(1)
+        grabber = FrameGrabber("rtsp://camera", opener=lambda url: capture)
+        grabber.start()
+
+        capture.gate.release()
+        assert int(grabber.read(timeout=1)[0, 0, 0]) == 0
+        capture.gate.release()
+
+        assert grabber.read(timeout=1) is None
+        grabber.stop()
+        assert not grabber.is_alive()
+        assert capture.released
+
+    def test_stream_not_opened(self):
+        """
+        Test a stream that cannot be opened.
+
+        GIVEN: A stream that fails to open.
+        WHEN: The grabber is started.
+        THEN: Assert that reads return None and the thread stops.
+        """
+        grabber = FrameGrabber("rtsp://camera", opener=lambda url: FakeCapture(0, opened=False))
+        grabber.start()
+
+        assert grabber.read(timeout=1) is None
+        grabber.stop()
+        assert not grabber.is_alive()
+
+    def test_reconnect_with_backoff(self):
+        """
+        Test that a dropped stream is reopened.
+
+        GIVEN: A grabber with reconnection whose first stream fails to open.
+        WHEN: The stream is reopened.
+        THEN: Assert that the frame of the second stream is read after one reconnection.
+        """
+        second = FakeCapture(1)
+        captures = [FakeCapture(0, opened=False), second]
+        second.gate.release()
+        grabber = FrameGrabber("rtsp://camera", opener=lambda url: captures.pop(0),
+                               reconnect=True, backoff_min=0.01)
+        grabber.start()
+
+        assert int(grabber.read(timeout=5)[0, 0, 0]) == 0
+        assert grabber.reconnects == 1
+        assert grabber.is_alive()
+
+        second.gate.release()
+        grabber.stop()
@@ -0,0 +1,73 @@
+from vision.components.comm.device_state import DeviceStateCache
+
+
+class TestDeviceStateCache:
+
+    def test_alternating_devices(self):
+        """
+        Test that alternating cameras only publish their own changes.
+
+        GIVEN: Two cameras with different, steady states.
+        WHEN: Their messages alternate.
+        THEN: Assert that only the first message of each camera is a change.
+        """
+        states = DeviceStateCache()
+        camera1 = {'n_detected_people': 1, 'recognized_people': [], 'weapon_detected': False}
+        camera2 = {'n_detected_people': 3, 'recognized_people': [], 'weapon_detected': False}
+
+        results = [states.changed(device, state)
+                   for device, state in [('cam1', camera1), ('cam2', camera2)] * 3]
+
+        assert results == [True, True, False, False, False, False]
+
+    def test_state_change(self):
+        """
+        Test that a changed state of a device is published.
+
+        GIVEN: A device with a stored state.
+        WHEN: A different state arrives.
+        THEN: Assert that it is a change and becomes the stored state.
+        """
+        states = DeviceStateCache()
+        states.changed('cam1', {'n_detected_people': 1})
+
+        assert states.changed('cam1', {'n_detected_people': 2}) is True
+        assert states.get('cam1') == {'n_detected_people': 2}
+
+    def test_lru_bound(self):
+        """
+        Test that the number of tracked devices is bounded.
+
+        GIVEN: A cache of at most two devices.
+        WHEN: Three devices send messages.
+        THEN: Assert that the least recently seen device is evicted.
+        """
+        states = DeviceStateCache(max_devices=2)
+        states.changed('cam1', {})
+        states.changed('cam2', {})
+        states.changed('cam1', {})
+        states.changed('cam3', {})
+
+        assert len(states) == 2
+        assert states.get('cam2') is None
+        assert states.changed('cam1', {}) is False
+
+    def test_ttl(self, fake_clock):
+        """
+        Test that devices not seen for longer than the TTL are forgotten.
+
+        GIVEN: A cache with a 60 seconds TTL and two devices.
+        WHEN: Only one device sends messages for more than 60 seconds.
+        THEN: Assert that the silent device is forgotten and publishes again.
+        """
+        states = DeviceStateCache(ttl=60, clock=fake_clock)
+        states.changed('cam1', {})
+        states.changed('cam2', {})
+
+        fake_clock.now = 50
+        states.changed('cam1', {})
+        fake_clock.now = 100
+        assert states.changed('cam1', {}) is False
+
+        assert len(states) == 1
+        assert states.changed('cam2', {}) is True
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+from vision.components.vision.face_index import FaceIndex
+
+
+class TestFaceIndex:
+
+    @pytest.fixture
+    def index(self):
+        """
+        Set up the FaceIndex fixture.
+
+        GIVEN: Three known crops of two identities.
+        WHEN: The fixture is used.
+        THEN: Initialize and return the FaceIndex with the crops embeddings.
+        """
+        index = FaceIndex(threshold=0.3)
+        index.add("mayki.1.jpg", np.array([1.0, 0.0, 0.0]))
+        index.add("mayki.2.jpg", np.array([2.0, 0.2, 0.0]))
+        index.add("Joel.1.jpeg", np.array([0.0, 0.0, 3.0]))
+        return index
+
+    def test_rows_are_normalized(self, index):
+        """
+        Test that the embeddings matrix holds unit-norm float32 rows.
+
+        GIVEN: An index built from non-normalized embeddings.
+        WHEN: The matrix is inspected.
+        THEN: Assert that it has one float32 unit-norm row per crop.
+        """
+        assert index.matrix.shape == (3, 3)
+        assert index.matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0)
+        assert index.names == ["mayki", "mayki", "Joel"]
+
+    def test_batch_match(self, index):
+        """
+        Test matching of several faces at once.
+
+        GIVEN: Embeddings of a known face, another known face and an unknown face.
+        WHEN: The embeddings are matched against the index.
+        THEN: Assert that the known faces are named and the unknown one is None.
+        """
+        faces = np.array([[0.0, 0.1, 5.0], [3.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+        result = index.match(faces)
+
+        assert result == ["Joel", "mayki", None]
+
+    def test_remove_and_replace(self, index):
+        """
+        Test removal and replacement of crops in the index.
+
+        GIVEN: An index with three crops.
+        WHEN: One crop is removed and another one replaced.
+        THEN: Assert that the matches reflect the updated index.
+        """
+        index.remove("Joel.1.jpeg")
+        index.add("mayki.1.jpg", np.array([0.0, 1.0, 0.0]))
+
+        assert len(index) == 2
+        assert index.match(np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 0.0]])) == [None, "mayki"]
+
+    def test_empty_index(self):
+        """
+        Test matching against an empty index.
+
+        GIVEN: An index without crops.
+        WHEN: A face is matched.
+        THEN: Assert that the face is not recognized.
+        """
+        index = FaceIndex(threshold=0.68)
+
+        assert index.match(np.array([[1.0, 0.0]])) == [None]
+        assert index.match(np.empty((0, 2))) == []
+
+    def test_search_distances(self, index):
+        """
+        Test that the match distances are returned with the names.
+
+        GIVEN: Embeddings of an exact known face and an unknown face.
+        WHEN: The embeddings are searched in the index.
+        THEN: Assert that the known face is at distance zero and the unknown one is too far.
+        """
+        names, distances = index.search(np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 0.0]]))
+
+        assert names == ["Joel", None]
+        assert distances[0] == pytest.approx(0.0, abs=1e-6)
+        assert distances[1] > index.threshold
@@ -0,0 +1,134 @@
+import json
+import os
+import pytest
+import numpy as np
+from vision.components.vision.face_manifest import FaceManifest
+
+
+class TestFaceManifest:
+
+    @pytest.fixture
+    def paths(self, tmp_path):
+        """
+        Set up the images and crops directories fixture.
+
+        GIVEN: An images directory with two reference images and an empty crops directory.
+        WHEN: The fixture is used.
+        THEN: Return the images and crops paths.
+        """
+        images_path = tmp_path / "images"
+        crops_path = tmp_path / "crops"
+        images_path.mkdir()
+        crops_path.mkdir()
+        (images_path / "mayki.1.jpg").write_bytes(b"mayki")
+        (images_path / "Joel.1.jpeg").write_bytes(b"joel")
+        (images_path / "notes.txt").write_bytes(b"ignored")
+        return str(images_path), str(crops_path)
+
+    def record(self, manifest, pending):
+        for file, (digest, mtime) in pending.items():
+            manifest.update(file, digest, mtime, file, np.ones(3))
+        manifest.save()
+
+    def test_new_images_are_pending(self, paths):
+        """
+        Test the first scan of a database without manifest.
+
+        GIVEN: Two reference images and no manifest.
+        WHEN: The images directory is scanned.
+        THEN: Assert that both images are pending and nothing was deleted.
+        """
+        images_path, crops_path = paths
+        manifest = FaceManifest(crops_path, "VGG-Face")
+
+        pending, deleted = manifest.scan(images_path, (".jpg", ".jpeg"))
+
+        assert sorted(pending) == ["Joel.1.jpeg", "mayki.1.jpg"]
+        assert deleted == []
+
+    def test_only_changes_are_pending(self, paths):
+        """
+        Test a scan after images were touched, edited and deleted.
+
+        GIVEN: A saved manifest of two images.
+        WHEN: One image is touched without changes, the other is deleted and a new one added.
+        THEN: Assert that only the new image is pending and the removed one is deleted.
+        """
+        images_path, crops_path = paths
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        self.record(manifest, manifest.scan(images_path, (".jpg", ".jpeg"))[0])
+
+        os.utime(os.path.join(images_path, "mayki.1.jpg"), (1, 1))
+        os.remove(os.path.join(images_path, "Joel.1.jpeg"))
+        with open(os.path.join(images_path, "Isis.1.jpeg"), "wb") as f:
+            f.write(b"isis")
+
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        pending, deleted = manifest.scan(images_path, (".jpg", ".jpeg"))
+
+        assert list(pending) == ["Isis.1.jpeg"]
+        assert deleted == ["Joel.1.jpeg"]
+        assert manifest.entries["mayki.1.jpg"]["mtime"] == 1
+
+    def test_edited_image_is_pending(self, paths):
+        """
+        Test a scan after an image content was edited.
+
+        GIVEN: A saved manifest of two images.
+        WHEN: The content of one image changes.
+        THEN: Assert that the edited image is pending.
+        """
+        images_path, crops_path = paths
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        self.record(manifest, manifest.scan(images_path, (".jpg", ".jpeg"))[0])
+
+        with open(os.path.join(images_path, "mayki.1.jpg"), "wb") as f:
+            f.write(b"mayki edited")
+        os.utime(os.path.join(images_path, "mayki.1.jpg"), (2, 2))
+
+        pending, _ = FaceManifest(crops_path, "VGG-Face").scan(images_path, (".jpg", ".jpeg"))
+
+        assert list(pending) == ["mayki.1.jpg"]
+
+    def test_model_change_discards_embeddings(self, paths):
+        """
+        Test loading a manifest computed with another model.
+
+        GIVEN: A manifest saved with the VGG-Face model.
+        WHEN: The manifest is loaded for the Facenet model.
+        THEN: Assert that the entries are kept without embeddings.
+        """
+        images_path, crops_path = paths
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        self.record(manifest, manifest.scan(images_path, (".jpg", ".jpeg"))[0])
+
+        manifest = FaceManifest(crops_path, "Facenet")
+
+        assert len(manifest.entries) == 2
+        assert all(entry["embedding"] is None for entry in manifest.entries.values())
+
+    def test_old_version_is_outdated(self, paths):
+        """
+        Test loading a manifest saved by an older crop extraction.
+
+        GIVEN: A saved manifest of two images, rewritten as an older version.
+        WHEN: The manifest is loaded and the images directory scanned.
+        THEN: Assert that it is outdated and every image is pending without embedding.
+        """
+        images_path, crops_path = paths
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        self.record(manifest, manifest.scan(images_path, (".jpg", ".jpeg"))[0])
+        assert not manifest.outdated
+
+        with open(manifest.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data["version"] = FaceManifest.VERSION - 1
+        with open(manifest.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        manifest = FaceManifest(crops_path, "VGG-Face")
+        pending, _ = manifest.scan(images_path, (".jpg", ".jpeg"))
+
+        assert manifest.outdated
+        assert sorted(pending) == ["Joel.1.jpeg", "mayki.1.jpg"]
+        assert all(entry["embedding"] is None for entry in manifest.entries.values())
@@ -3,7 +3,8 @@ import cv2
 import numpy as np
 import requests
 import os
-from vision.components.vision.face_recognition import FaceRecognition
+from vision.components.vision.face_recognition import FaceRecognition, align_face
+from vision.components.vision.model_registry import ModelRegistry
 
 class TestFaceRecognition:
 
@@ -59,3 +60,111 @@ class TestFaceRecognition:
         expected_names = ["Eduardo", "mayki"]
         base_names = [os.path.basename(name).split(".")[0] for name in recognized_names]
         assert all(name in base_names for name in expected_names)
+
+    def test_face_recognition_without_people(self, mocker):
+        """
+        Test that faces are not searched when no person was detected.
+
+        GIVEN: An image of a known person and an empty list of person boxes.
+        WHEN: Face recognition runs on the image with the person boxes.
+        THEN: Assert that nobody is recognized and the face detector is not run.
+        """
+        sample_image = cv2.imread(os.path.join(self.images_path, "mayki.1.jpg"))
+        detect = mocker.spy(FaceRecognition, "_detect")
+        recognized_names = self.face_recognition(sample_image, person_boxes=np.empty((0, 4)))
+        assert recognized_names == []
+        detect.assert_not_called()
+
+    def test_face_recognition_person_roi(self):
+        """
+        Test face recognition restricted to the regions of the detected people.
+
+        GIVEN: An image of a known person and a person box covering the whole image.
+        WHEN: Face recognition runs on the image with the person box.
+        THEN: Assert that the person is recognized.
+        """
+        sample_image = cv2.imread(os.path.join(self.images_path, "mayki.1.jpg"))
+        height, width = sample_image.shape[:2]
+        person_boxes = np.array([[0, 0, width, height]])
+        recognized_names = self.face_recognition(sample_image, person_boxes=person_boxes)
+        assert "mayki" in recognized_names
+
+    def test_align_face(self):
+        """
+        Test that a face is cropped and rotated so that the eyes are level.
+
+        GIVEN: An image with two eye points at different heights and their landmarks.
+        WHEN: The face is aligned.
+        THEN: Assert that the crop has the size of the face box and the eyes are level.
+        """
+        img = np.zeros((100, 100), dtype=np.uint8)
+        img[30, 30] = img[40, 60] = 255
+        landmarks = {'right_eye': [30, 30], 'left_eye': [60, 40]}
+        face = align_face(img, [20, 20, 80, 80], landmarks)
+        assert face.shape == (60, 60)
+        eyes = np.argwhere(face > 0)
+        assert eyes[:, 0].max() - eyes[:, 0].min() <= 2
+
+
+class TestFaceDatabaseUpdate:
+
+    @pytest.fixture
+    def face_recognition(self, tmp_path, mocker):
+        """
+        Set up a face database with one reference image and stubbed face models.
+
+        GIVEN: A reference image whose face is found, and a constant embedding.
+        WHEN: The fixture is used.
+        THEN: Return a FaceRecognition of the database with its own model registry.
+        """
+        images, crops = tmp_path / 'images', tmp_path / 'crops'
+        images.mkdir()
+        crops.mkdir()
+        cv2.imwrite(str(images / 'mayki.1.jpg'), np.zeros((8, 8, 3), dtype=np.uint8))
+
+        def extract_crop(image_path, crop_path):
+            return cv2.imwrite(crop_path, cv2.imread(image_path))
+
+        mocker.patch('vision.components.vision.face_recognition.extract_crop', extract_crop)
+        mocker.patch.object(FaceRecognition, 'represent',
+                            return_value=np.ones(4, dtype=np.float32))
+        return FaceRecognition(str(images), str(crops), workers=1, registry=ModelRegistry())
+
+    def test_crop_removed_when_face_lost(self, face_recognition, mocker):
+        """
+        Test that the crop of an edited reference image without a face is deleted.
+
+        GIVEN: A database with the crop of a reference image.
+        WHEN: The image is edited so that no face is found anymore, and the database updated.
+        THEN: Assert that the crop file is deleted and the face is no longer indexed.
+        """
+        crop = os.path.join(face_recognition.crops_path, 'mayki.1.jpg')
+        face_recognition.update_db()
+        assert os.path.exists(crop)
+
+        image = os.path.join(face_recognition.images_path, 'mayki.1.jpg')
+        cv2.imwrite(image, np.full((8, 8, 3), 255, dtype=np.uint8))
+        os.utime(image, (0, 0))
+        mocker.patch('vision.components.vision.face_recognition.extract_crop',
+                     return_value=False)
+        face_recognition.update_db()
+
+        assert not os.path.exists(crop)
+        assert 'mayki.1.jpg' not in face_recognition.index.keys
+
+
+class TestFaceRecognitionErrors:
+
+    def test_model_error_propagated(self, tmp_path, mocker):
+        """
+        Test that an error of the face models is not swallowed.
+
+        GIVEN: A face detector that raises an exception.
+        WHEN: Face recognition runs on an image.
+        THEN: Assert that the exception reaches the caller, so the analyzer is reported failed.
+        """
+        mocker.patch.object(FaceRecognition, 'detect', side_effect=RuntimeError("falha"))
+        face_recognition = FaceRecognition(str(tmp_path), str(tmp_path), registry=ModelRegistry())
+
+        with pytest.raises(RuntimeError):
+            face_recognition(np.zeros((8, 8, 3), dtype=np.uint8))
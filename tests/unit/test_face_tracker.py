@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from vision.components.vision.face_tracker import FaceTracker, box_iou
+
+
+class Recognizer:
+
+    def __init__(self, names, distance=0.1):
+        self.names = names
+        self.distance = distance
+        self.calls = []
+
+    def __call__(self, positions):
+        self.calls.append(positions)
+        return [self.names[p] for p in positions], np.full(len(positions), self.distance)
+
+
+class TestFaceTracker:
+
+    @pytest.fixture
+    def tracker(self):
+        """
+        Set up the FaceTracker fixture.
+
+        GIVEN: A tracker recognizing confident faces every 3 frames and others every 2.
+        WHEN: The fixture is used.
+        THEN: Return the tracker.
+        """
+        return FaceTracker(iou_threshold=0.3, recognize_every=3, retry_every=2,
+                           confident_distance=0.5, max_missed=1)
+
+    def test_box_iou(self):
+        """
+        Test the intersection over union of boxes.
+
+        GIVEN: A box, the same box, a half-overlapping box and a disjoint box.
+        WHEN: Their intersection over union is computed.
+        THEN: Assert that it is 1, 1/3 and 0.
+        """
+        iou = box_iou(np.array([[0, 0, 10, 10]]),
+                      np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]]))
+
+        assert iou.shape == (1, 3)
+        assert iou[0] == pytest.approx([1.0, 1 / 3, 0.0])
+
+    def test_identity_is_carried_forward(self, tracker):
+        """
+        Test that a steady face is only recognized every few frames.
+
+        GIVEN: A face slowly moving in front of the camera for six frames.
+        WHEN: The frames are tracked.
+        THEN: Assert that the face keeps its name and is recognized in frames 1 and 4 only.
+        """
+        recognizer = Recognizer(["mayki"])
+
+        names = [tracker.update("cam", np.array([[10 + i, 10, 60 + i, 60]]), recognizer)
+                 for i in range(6)]
+
+        assert names == [["mayki"]] * 6
+        assert recognizer.calls == [[0], [0]]
+
+    def test_unknown_face_is_retried(self, tracker):
+        """
+        Test that low-confidence faces are recognized more often.
+
+        GIVEN: An unknown face standing still for five frames.
+        WHEN: The frames are tracked.
+        THEN: Assert that it is recognized in frames 1, 3 and 5.
+        """
+        recognizer = Recognizer([None], distance=0.9)
+
+        for _ in range(5):
+            assert tracker.update("cam", np.array([[10, 10, 60, 60]]), recognizer) == [None]
+
+        assert len(recognizer.calls) == 3
+
+    def test_new_face_is_recognized(self, tracker):
+        """
+        Test that only the faces that appear are recognized.
+
+        GIVEN: A tracked face and a second face appearing in the next frame.
+        WHEN: The second frame is tracked.
+        THEN: Assert that only the new face is recognized and both are named.
+        """
+        tracker.update("cam", np.array([[10, 10, 60, 60]]), Recognizer(["mayki"]))
+        recognizer = Recognizer(["Joel", "mayki"])
+
+        names = tracker.update("cam", np.array([[200, 10, 250, 60], [12, 10, 62, 60]]),
+                               recognizer)
+
+        assert names == ["Joel", "mayki"]
+        assert recognizer.calls == [[0]]
+
+    def test_lost_face_is_forgotten(self, tracker):
+        """
+        Test that a face missing for too long starts a new track.
+
+        GIVEN: A tracked face missing for two frames (more than max_missed).
+        WHEN: It comes back.
+        THEN: Assert that it is recognized again.
+        """
+        box = np.array([[10, 10, 60, 60]])
+        tracker.update("cam", box, Recognizer(["mayki"]))
+        tracker.update("cam", np.empty((0, 4)), Recognizer([]))
+        tracker.update("cam", np.empty((0, 4)), Recognizer([]))
+        recognizer = Recognizer(["mayki"])
+
+        tracker.update("cam", box, recognizer)
+
+        assert recognizer.calls == [[0]]
+
+    def test_devices_are_independent(self, tracker):
+        """
+        Test that the tracks of different devices are not mixed.
+
+        GIVEN: The same face box tracked on one device.
+        WHEN: A frame of another device has a face at the same place.
+        THEN: Assert that the face of the other device is recognized.
+        """
+        box = np.array([[10, 10, 60, 60]])
+        tracker.update("cam1", box, Recognizer(["mayki"]))
+        recognizer = Recognizer(["Joel"])
+
+        assert tracker.update("cam2", box, recognizer) == ["Joel"]
+        assert recognizer.calls == [[0]]
+        assert len(tracker) == 2
@@ -0,0 +1,42 @@
+import numpy as np
+from vision.components.vision.image_cache import CachedImage, ImageCache
+
+
+class TestImageCache:
+
+    def image(self, nbytes):
+        return CachedImage(np.zeros(nbytes, dtype=np.uint8), etag='"v1"')
+
+    def test_eviction_by_size(self):
+        """
+        Test that the least recently used images are evicted by size.
+
+        GIVEN: A cache of 100 bytes holding two images of 40 bytes.
+        WHEN: The first image is used and a third image of 40 bytes is cached.
+        THEN: Assert that the second image is evicted and the size stays within the limit.
+        """
+        cache = ImageCache(max_bytes=100)
+        cache.put("a", self.image(40))
+        cache.put("b", self.image(40))
+        cache.get("a")
+        cache.put("c", self.image(40))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.size == 80
+
+    def test_replace_and_oversized(self):
+        """
+        Test replacing an image and caching an image larger than the cache.
+
+        GIVEN: A cache of 100 bytes holding one image.
+        WHEN: The image is replaced by a larger one and an oversized image is cached.
+        THEN: Assert that the size is updated and the oversized image is not cached.
+        """
+        cache = ImageCache(max_bytes=100)
+        cache.put("a", self.image(10))
+        cache.put("a", self.image(60))
+        cache.put("b", self.image(200))
+
+        assert cache.size == 60
+        assert len(cache) == 1
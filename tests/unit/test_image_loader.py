@@ -0,0 +1,123 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import pytest
+from vision.components.vision.image_loader import ImageLoader
+
+IMAGE = cv2.imencode(".png", np.full((8, 8, 3), 127, dtype=np.uint8))[1].tobytes()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+
+    requests = []
+
+    def do_GET(self):
+        ImageHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/slow.png":
+            time.sleep(1)
+        if self.path == "/cached.png" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path == "/cached.png":
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    """
+    Set up a local HTTP server fixture.
+
+    GIVEN: An HTTP server that serves a small PNG image.
+    WHEN: The fixture is used.
+    THEN: Return the base URL of the server.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+class TestImageLoader:
+    def test_load_from_url(self, server_url):
+        """
+        Test loading an image from a URL.
+
+        GIVEN: A URL of a PNG image.
+        WHEN: The image is loaded.
+        THEN: Assert that the decoded image is returned.
+        """
+        loader = ImageLoader()
+
+        img = loader.load(f"{server_url}/image.png")
+
+        assert img.shape == (8, 8, 3)
+        assert int(img[0, 0, 0]) == 127
+
+    def test_max_bytes(self, server_url):
+        """
+        Test the maximum image size.
+
+        GIVEN: A loader limited to fewer bytes than the image size.
+        WHEN: The image is loaded.
+        THEN: Assert that no image is returned.
+        """
+        loader = ImageLoader(max_bytes=len(IMAGE) - 1)
+
+        assert loader.load(f"{server_url}/image.png") is None
+
+    def test_read_timeout(self, server_url):
+        """
+        Test the read timeout.
+
+        GIVEN: A loader with a read timeout shorter than the server response time.
+        WHEN: The image is loaded.
+        THEN: Assert that the load gives up and no image is returned.
+        """
+        loader = ImageLoader(read_timeout=0.2)
+
+        assert loader.load(f"{server_url}/slow.png") is None
+
+    def test_normalize_google_drive_url(self):
+        """
+        Test the conversion of Google Drive sharing URLs.
+
+        GIVEN: A Google Drive sharing URL and an invalid Google Drive URL.
+        WHEN: The URLs are normalized.
+        THEN: Assert that the sharing URL becomes a download URL and the invalid one is rejected.
+        """
+        url = "https://drive.google.com/file/d/13DEkxSaE31Lbwur0BusC_T1tXtyJcDDU/view?usp=sharing"
+
+        assert ImageLoader.normalize_url(url) == \
+            "https://drive.google.com/uc?id=13DEkxSaE31Lbwur0BusC_T1tXtyJcDDU"
+        with pytest.raises(ValueError):
+            ImageLoader.normalize_url("https://drive.google.com/invalid")
+
+    def test_cache_revalidation(self, server_url):
+        """
+        Test that repeated URLs are revalidated instead of downloaded again.
+
+        GIVEN: A loader with cache and a URL served with an ETag.
+        WHEN: The same URL is loaded twice.
+        THEN: Assert that the second request is conditional and returns the cached frame.
+        """
+        loader = ImageLoader(cache_max_bytes=1024 * 1024)
+        ImageHandler.requests.clear()
+
+        first = loader.load(f"{server_url}/cached.png#frame")
+        first[:] = 0
+        second = loader.load(f"{server_url}/cached.png")
+
+        assert ImageHandler.requests == [("/cached.png", None), ("/cached.png", '"v1"')]
+        assert len(loader.cache) == 1
+        assert int(second[0, 0, 0]) == 127
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+from vision.components.metrics import DEVICE, device_context, stage_timer
+from vision.components.vision.analyzer_executor import AnalyzerExecutor
+from vision.components.vision.model_registry import ModelRegistry
+from vision.components.vision.person_detection import PersonDetector
+
+
+def stage_count(stage, device):
+    return REGISTRY.get_sample_value('vision_stage_seconds_count',
+                                     {'stage': stage, 'device': device}) or 0.0
+
+
+def stage_sum(stage, device):
+    return REGISTRY.get_sample_value('vision_stage_seconds_sum',
+                                     {'stage': stage, 'device': device}) or 0.0
+
+
+class FakeResult:
+
+    boxes = []
+
+
+class TestStageTimer:
+
+    def test_observed_with_device(self):
+        """
+        Test that a stage is observed with the device of the context.
+
+        GIVEN: A stage timed inside the context of a device.
+        WHEN: The stage finishes.
+        THEN: Assert that one latency is observed for that stage and device only.
+        """
+        before = stage_count('test_stage', 'camera-1')
+        before_unknown = stage_count('test_stage', 'unknown')
+
+        with device_context('camera-1'):
+            with stage_timer('test_stage'):
+                pass
+
+        assert stage_count('test_stage', 'camera-1') == before + 1
+        assert stage_count('test_stage', 'unknown') == before_unknown
+        assert DEVICE.get() == 'unknown'
+
+    def test_failed_stage_is_observed(self):
+        """
+        Test that a failing stage is still observed.
+
+        GIVEN: A stage that raises.
+        WHEN: The exception leaves the stage.
+        THEN: Assert that the exception is propagated and the latency observed.
+        """
+        before = stage_count('failed_stage', 'unknown')
+
+        with pytest.raises(RuntimeError):
+            with stage_timer('failed_stage'):
+                raise RuntimeError("falha")
+
+        assert stage_count('failed_stage', 'unknown') == before + 1
+
+    def test_empty_device_keeps_label(self):
+        """
+        Test that a missing device keeps the current label.
+
+        GIVEN: A device context nested in another one without a device.
+        WHEN: The current device is read inside it.
+        THEN: Assert that the outer device is kept.
+        """
+        with device_context('camera-2'):
+            with device_context(None):
+                assert DEVICE.get() == 'camera-2'
+
+
+class TestAnalyzerContext:
+
+    def test_device_reaches_analyzer_threads(self):
+        """
+        Test that the analyzers running on the thread pool see the device.
+
+        GIVEN: A concurrent executor and analyzers reading the current device.
+        WHEN: They run inside the context of a device.
+        THEN: Assert that every analyzer saw that device.
+        """
+        executor = AnalyzerExecutor(concurrent=True)
+        try:
+            with device_context('camera-3'):
+                results, _ = executor.run({'a': lambda: {'a': DEVICE.get()},
+                                           'b': lambda: {'b': DEVICE.get()}})
+        finally:
+            executor.shutdown()
+
+        assert results == {'a': 'camera-3', 'b': 'camera-3'}
+
+
+class TestModelStage:
+
+    def test_model_wait_not_observed(self):
+        """
+        Test that the wait for a shared model is not observed as latency of its stage.
+
+        GIVEN: A person detector whose shared model is used by another thread for 0.2s.
+        WHEN: The detector calls the model meanwhile.
+        THEN: Assert that the observed latency excludes the wait for the model.
+        """
+        registry = ModelRegistry()
+        detector = PersonDetector("vision/models/yolov8n.pt", registry=registry)
+        detector._model = registry.acquire('person', lambda: lambda *args, **kwargs: [FakeResult()])
+        before = stage_sum('person_detection', 'camera-4')
+
+        def detect():
+            with device_context('camera-4'):
+                detector.boxes(np.zeros((8, 8, 3), dtype=np.uint8))
+
+        with detector._model.locked():
+            thread = threading.Thread(target=detect)
+            thread.start()
+            time.sleep(0.2)
+        thread.join()
+
+        assert stage_count('person_detection', 'camera-4') >= 1
+        assert stage_sum('person_detection', 'camera-4') - before < 0.1
@@ -0,0 +1,127 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+from vision.components.vision.face_tracker import box_iou
+from vision.components.vision.model_backend import (acquire_yolo, exported_path, is_stale,
+                                                   load_yolo)
+from vision.components.vision.model_registry import ModelRegistry
+
+
+class TestExportedPath:
+
+    def test_backend_paths(self):
+        """
+        Test the cache path of each backend.
+
+        GIVEN: PyTorch weights.
+        WHEN: The export path is computed for each backend, with and without INT8.
+        THEN: Assert that exports are cached next to the weights with distinct names.
+        """
+        weights = 'vision/models/yolov8s.pt'
+
+        assert exported_path(weights, 'torch') == weights
+        assert exported_path(weights, 'onnx') == 'vision/models/yolov8s.onnx'
+        assert exported_path(weights, 'onnx', int8=True) == 'vision/models/yolov8s_int8.onnx'
+        assert exported_path(weights, 'openvino') == 'vision/models/yolov8s_openvino_model'
+        assert exported_path(weights, 'openvino', int8=True) == \
+            'vision/models/yolov8s_int8_openvino_model'
+
+    def test_invalid_backend(self):
+        """
+        Test that an unknown backend is rejected.
+
+        GIVEN: A backend name that is not supported.
+        WHEN: The export path is computed.
+        THEN: Assert that a ValueError is raised.
+        """
+        with pytest.raises(ValueError):
+            exported_path('vision/models/yolov8s.pt', 'tensorrt')
+
+    def test_stale_export(self, tmp_path):
+        """
+        Test that an export older than its weights is exported again.
+
+        GIVEN: Weights, an export newer than them, and then the weights updated.
+        WHEN: The export is checked before and after the update.
+        THEN: Assert that it is stale only when missing or older than the weights.
+        """
+        weights = tmp_path / 'model.pt'
+        export = tmp_path / 'model.onnx'
+        weights.write_bytes(b'weights')
+
+        assert is_stale(str(weights), str(export))
+
+        export.write_bytes(b'export')
+        os.utime(weights, (1000, 1000))
+        os.utime(export, (2000, 2000))
+        assert not is_stale(str(weights), str(export))
+
+        os.utime(weights, (3000, 3000))
+        assert is_stale(str(weights), str(export))
+
+
+def config_weights(key):
+    """Path to the weights of a model of the service configuration, from the repository root."""
+    with open('vision/components/config.yaml', 'r', encoding="utf-8") as f:
+        config = yaml.load(f, Loader=yaml.SafeLoader)
+    # The configuration paths are relative to the directory of the vision package
+    return os.path.normpath(os.path.join('vision', config[key]))
+
+
+class TestBackendParity:
+
+    @pytest.mark.parametrize("key, task", [
+        ('PERSON_DETECTION_MODEL', 'detect'),
+        ('POSE_ESTIMATION_MODEL', 'pose'),
+        ('WEAPON_DETECTION_MODEL', 'detect'),
+    ])
+    def test_onnx_matches_torch(self, tmp_path, key, task):
+        """
+        Test that the ONNX export of a configured model matches the PyTorch model.
+
+        GIVEN: The weights of a model of the configuration, copied with their ONNX export to a
+               temporary directory.
+        WHEN: Both run on the same image.
+        THEN: Assert that they find the same number of objects with overlapping boxes.
+        """
+        pytest.importorskip("onnxruntime")
+        source = config_weights(key)
+        if not os.path.exists(source):
+            pytest.skip(f"Weights not found: {source}")
+        weights = str(tmp_path / os.path.basename(source))
+        shutil.copy(source, weights)
+        frame = cv2.imread('tests/unit/test_images/garoto_com_revolver.png')
+
+        torch_boxes = load_yolo(weights, 'torch')(frame, verbose=False)[0].boxes
+        onnx_model = load_yolo(weights, 'onnx', task=task)
+        onnx_boxes = onnx_model(frame, verbose=False)[0].boxes
+
+        assert os.path.exists(exported_path(weights, 'onnx'))
+        assert len(onnx_boxes) == len(torch_boxes)
+        if len(torch_boxes):
+            iou = box_iou(torch_boxes.xyxy.cpu().numpy(), onnx_boxes.xyxy.cpu().numpy())
+            assert np.all(iou.max(axis=1) > 0.9)
+
+
+class TestAcquireYolo:
+
+    def test_calibration_data_forwarded(self, mocker):
+        """
+        Test that the calibration dataset reaches the model loader.
+
+        GIVEN: A YOLO model acquired for OpenVINO INT8 with a calibration dataset.
+        WHEN: The model is loaded through its handle.
+        THEN: Assert that load_yolo gets the calibration dataset.
+        """
+        load = mocker.patch('vision.components.vision.model_backend.load_yolo')
+
+        handle = acquire_yolo('vision/models/yolov8s.pt', 'openvino', True, 'detect',
+                              calibration_data='coco128.yaml', registry=ModelRegistry())
+        handle.get()
+
+        load.assert_called_once_with('vision/models/yolov8s.pt', 'openvino', True, 'detect',
+                                     'coco128.yaml')
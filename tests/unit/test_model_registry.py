@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+from vision.components.vision.model_registry import ModelRegistry
+
+
+class TestModelRegistry:
+
+    @pytest.fixture
+    def registry(self):
+        """
+        Set up an empty registry.
+
+        GIVEN: No registered model.
+        WHEN: The fixture is used.
+        THEN: Return a new ModelRegistry.
+        """
+        return ModelRegistry()
+
+    def test_lazy_single_load(self, registry):
+        """
+        Test that a model is loaded once, on first use.
+
+        GIVEN: Two handles of the same key.
+        WHEN: Both handles get the model.
+        THEN: Assert that the loader ran only at the first get and both share the model.
+        """
+        loads = []
+        first = registry.acquire('model', lambda: loads.append(1) or object())
+        second = registry.acquire('model', lambda: pytest.fail("Loader duplicado"))
+
+        assert not loads
+        assert first.get() is second.get()
+        assert len(loads) == 1
+
+    def test_concurrent_first_use(self, registry):
+        """
+        Test that concurrent first uses wait for a single load.
+
+        GIVEN: A slow loader and several threads using the model at once.
+        WHEN: The threads get the model.
+        THEN: Assert that the loader ran once and every thread got the same model.
+        """
+        loads = []
+
+        def loader():
+            loads.append(1)
+            time.sleep(0.05)
+            return object()
+
+        handle = registry.acquire('model', loader)
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(handle.get()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert len({id(model) for model in models}) == 1
+
+    def test_calls_serialized(self, registry):
+        """
+        Test that the calls of a shared model do not overlap.
+
+        GIVEN: A slow model shared by two handles.
+        WHEN: Several threads call it at once through both handles.
+        THEN: Assert that every call returned and at most one ran at a time.
+        """
+        running, overlaps = [], []
+
+        def model(value):
+            running.append(value)
+            if len(running) > 1:
+                overlaps.append(value)
+            time.sleep(0.02)
+            running.remove(value)
+            return value
+
+        handles = [registry.acquire('model', lambda: model) for _ in range(2)]
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(handles[i % 2](i)))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(results) == [0, 1, 2, 3]
+        assert not overlaps
+
+    def test_locked_blocks_calls(self, registry):
+        """
+        Test that a model used in a locked block is not called concurrently.
+
+        GIVEN: A shared model used in a locked block.
+        WHEN: Another thread calls the model while the block runs.
+        THEN: Assert that the call only runs after the block exits.
+        """
+        events = []
+        handle = registry.acquire('model', lambda: lambda: events.append('call'))
+
+        with handle.locked() as model:
+            thread = threading.Thread(target=handle)
+            thread.start()
+            time.sleep(0.02)
+            events.append('block')
+            assert callable(model)
+        thread.join()
+
+        assert events == ['block', 'call']
+
+    def test_release_drops_model(self, registry):
+        """
+        Test that the model is dropped with its last handle.
+
+        GIVEN: Two handles of a loaded model.
+        WHEN: They are released one at a time, the first one twice.
+        THEN: Assert that the model stays until the last handle is released.
+        """
+        first = registry.acquire('model', object)
+        second = registry.acquire('model', object)
+        first.get()
+
+        first.release()
+        first.release()
+        assert 'model' in registry
+        assert registry.loaded() == ['model']
+
+        second.release()
+        assert 'model' not in registry
+        with pytest.raises(RuntimeError):
+            second.get()
+
+    def test_context_manager(self, registry):
+        """
+        Test that a handle used as a context manager is released on exit.
+
+        GIVEN: A handle opened in a with block.
+        WHEN: The block exits.
+        THEN: Assert that the model is no longer registered.
+        """
+        with registry.acquire('model', object) as handle:
+            assert handle.get() is not None
+
+        assert len(registry) == 0
+
+    def test_failed_load_is_retried(self, registry):
+        """
+        Test that a failed load does not leave a broken model behind.
+
+        GIVEN: A loader that fails the first time.
+        WHEN: The model is used twice.
+        THEN: Assert that the first use raises and the second one loads the model.
+        """
+        attempts = []
+
+        def loader():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("falha")
+            return 'model'
+
+        handle = registry.acquire('model', loader)
+        with pytest.raises(OSError):
+            handle.get()
+
+        assert handle.get() == 'model'
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+import pytest
+from vision.components.stream.motion import MotionGate
+
+
+class TestMotionGate:
+
+    @pytest.fixture
+    def background(self):
+        """
+        Set up a static background frame fixture.
+
+        GIVEN: A synthetic 640x480 scene with a gradient.
+        WHEN: The fixture is used.
+        THEN: Return the BGR frame.
+        """
+        gradient = np.tile(np.linspace(0, 200, 640, dtype=np.uint8), (480, 1))
+        return cv2.cvtColor(gradient, cv2.COLOR_GRAY2BGR)
+
+    def moved(self, background, x):
+        frame = background.copy()
+        cv2.rectangle(frame, (x, 200), (x + 100, 400), (255, 255, 255), -1)
+        return frame
+
+    def test_static_scene_is_skipped(self, background):
+        """
+        Test that a static scene only passes the first frame.
+
+        GIVEN: A motion gate and a stream of identical frames.
+        WHEN: The frames are checked.
+        THEN: Assert that only the first frame passes.
+        """
+        gate = MotionGate()
+
+        assert [gate(background) for _ in range(3)] == [True, False, False]
+
+    def test_motion_passes(self, background):
+        """
+        Test that a moving object passes the gate.
+
+        GIVEN: A motion gate that saw the static background.
+        WHEN: An object appears and moves.
+        THEN: Assert that the frames with the object pass.
+        """
+        gate = MotionGate()
+        gate(background)
+
+        assert gate(self.moved(background, 50)) is True
+        assert gate(self.moved(background, 200)) is True
+        assert gate.changed_ratio > 0.01
+
+    def test_region_of_interest(self, background):
+        """
+        Test that motion outside the region of interest is ignored.
+
+        GIVEN: A motion gate restricted to the right half of the frame.
+        WHEN: An object moves in the left half, then in the right half.
+        THEN: Assert that only the motion in the right half passes.
+        """
+        gate = MotionGate(roi=[[[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]])
+        gate(background)
+
+        assert gate(self.moved(background, 50)) is False
+        assert gate(self.moved(background, 450)) is True
+
+    def test_max_idle(self, fake_clock, background):
+        """
+        Test that a static scene is still processed after the maximum idle time.
+
+        GIVEN: A motion gate with a maximum idle time of 10 seconds.
+        WHEN: Identical frames arrive for 10 seconds.
+        THEN: Assert that a frame passes after 10 seconds.
+        """
+        gate = MotionGate(max_idle=10, clock=fake_clock)
+        gate(background)
+
+        fake_clock.now = 5
+        assert gate(background) is False
+        fake_clock.now = 10
+        assert gate(background) is True
@@ -0,0 +1,43 @@
+import paho.mqtt.client as mqtt
+from vision.components.comm.mqtt_publisher import MqttPublisher
+
+
+class TestMqttPublisher:
+
+    def publisher(self, mocker, qos, rc):
+        client = mocker.patch("paho.mqtt.client.Client").return_value
+        client.publish.return_value = mqtt.MQTTMessageInfo(1)
+        client.publish.return_value.rc = rc
+        return MqttPublisher("localhost", 1883, qos=qos), client
+
+    def test_single_connection(self, mocker):
+        """
+        Test that several messages share the same connection.
+
+        GIVEN: A connected MqttPublisher.
+        WHEN: Three messages are published.
+        THEN: Assert that the client connected once and published every message.
+        """
+        publisher, client = self.publisher(mocker, 1, mqtt.MQTT_ERR_SUCCESS)
+
+        results = [publisher.publish("visao", f"mensagem {i}") for i in range(3)]
+
+        assert results == [True, True, True]
+        client.connect_async.assert_called_once_with("localhost", 1883)
+        client.loop_start.assert_called_once()
+        assert client.publish.call_count == 3
+        client.publish.assert_called_with("visao", "mensagem 2", qos=1)
+
+    def test_disconnected_publish(self, mocker):
+        """
+        Test publishing while the connection is down.
+
+        GIVEN: A disconnected MqttPublisher.
+        WHEN: A message is published with QoS 0 and with QoS 1.
+        THEN: Assert that only the QoS 1 message is kept to be sent later.
+        """
+        publisher, _ = self.publisher(mocker, 0, mqtt.MQTT_ERR_NO_CONN)
+        assert publisher.publish("visao", "mensagem") is False
+
+        publisher, _ = self.publisher(mocker, 1, mqtt.MQTT_ERR_NO_CONN)
+        assert publisher.publish("visao", "mensagem") is True
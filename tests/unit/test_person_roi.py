@@ -0,0 +1,53 @@
+import numpy as np
+from vision.components.vision.person_roi import upper_body_rois
+
+
+class TestUpperBodyRois:
+
+    def test_upper_body_region(self):
+        """
+        Test the upper-body region of a single person.
+
+        GIVEN: A person box in the middle of the frame.
+        WHEN: Its region is computed.
+        THEN: Assert that it keeps the top half of the box plus the side margins.
+        """
+        rois = upper_body_rois(np.array([[100, 100, 200, 300]]), (480, 640, 3))
+
+        assert rois == [(90, 80, 210, 200)]
+
+    def test_clipped_to_frame(self):
+        """
+        Test that regions do not leave the frame.
+
+        GIVEN: A person box touching the top left corner.
+        WHEN: Its region is computed.
+        THEN: Assert that the region starts at the frame origin.
+        """
+        rois = upper_body_rois(np.array([[0.0, 0.0, 50.0, 100.0]]), (480, 640, 3))
+
+        assert rois == [(0, 0, 55, 50)]
+
+    def test_overlapping_regions_are_merged(self):
+        """
+        Test that overlapping regions are searched once.
+
+        GIVEN: Two overlapping people and a third one far from them.
+        WHEN: Their regions are computed.
+        THEN: Assert that the first two are merged into their bounding box.
+        """
+        boxes = np.array([[100, 100, 200, 300], [180, 120, 280, 320], [500, 100, 600, 300]])
+
+        rois = upper_body_rois(boxes, (480, 640, 3))
+
+        assert sorted(rois) == [(90, 80, 290, 220), (490, 80, 610, 200)]
+
+    def test_no_people(self):
+        """
+        Test that no region is searched without people.
+
+        GIVEN: An empty array of person boxes.
+        WHEN: The regions are computed.
+        THEN: Assert that there is no region.
+        """
+        assert upper_body_rois(np.empty((0, 4)), (480, 640, 3)) == []
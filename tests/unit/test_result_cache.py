@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+import pytest
+from vision.components.vision.result_cache import FrameResultCache, dhash
+
+
+class TestFrameResultCache:
+
+    @pytest.fixture
+    def frame(self):
+        """
+        Set up a frame fixture.
+
+        GIVEN: A synthetic scene with a gradient and a dark rectangle.
+        WHEN: The fixture is used.
+        THEN: Return the BGR frame.
+        """
+        gradient = np.tile(np.linspace(0, 255, 640, dtype=np.uint8), (480, 1))
+        frame = cv2.cvtColor(gradient, cv2.COLOR_GRAY2BGR)
+        cv2.rectangle(frame, (100, 100), (250, 400), (20, 20, 20), -1)
+        return frame
+
+    def test_dhash_similarity(self, frame):
+        """
+        Test that the hash tolerates noise but not scene changes.
+
+        GIVEN: A frame, a noisy copy and a copy with a new object.
+        WHEN: The hashes are compared.
+        THEN: Assert that the noisy copy is close and the changed scene is far.
+        """
+        rng = np.random.default_rng(0)
+        noisy = np.clip(frame + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+        changed = frame.copy()
+        cv2.rectangle(changed, (400, 50), (600, 450), (255, 255, 255), -1)
+
+        assert (dhash(frame) ^ dhash(noisy)).bit_count() <= 4
+        assert (dhash(frame) ^ dhash(changed)).bit_count() > 4
+
+    def test_reuse_per_device(self, frame):
+        """
+        Test that results are reused only for the same device.
+
+        GIVEN: Cached results of a frame of one camera.
+        WHEN: The same frame is looked up for that camera and for another camera.
+        THEN: Assert that only the first camera reuses the results.
+        """
+        cache = FrameResultCache()
+        state = {'n_detected_people': 1, 'recognized_people': ['mayki'], 'weapon_detected': False}
+        cache.put('cam1', dhash(frame), state)
+
+        cached = cache.get('cam1', dhash(frame))
+        cached['recognized_people'].append('Joel')
+
+        assert cache.get('cam1', dhash(frame)) == state
+        assert cache.get('cam2', dhash(frame)) is None
+
+    def test_max_age(self, fake_clock, frame):
+        """
+        Test that old results are not reused.
+
+        GIVEN: Cached results with a 30 seconds maximum age.
+        WHEN: The same frame arrives after 31 seconds.
+        THEN: Assert that the results are not reused.
+        """
+        cache = FrameResultCache(max_age=30, clock=fake_clock)
+        cache.put('cam1', dhash(frame), {'n_detected_people': 0})
+
+        fake_clock.now = 31
+
+        assert cache.get('cam1', dhash(frame)) is None
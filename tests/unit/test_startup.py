@@ -0,0 +1,69 @@
+import subprocess
+import sys
+
+import pytest
+from vision.components.startup import StartupTimer
+
+
+class TestStartupTimer:
+
+    def test_phases_and_total(self, fake_clock):
+        """
+        Test the report of the startup phases.
+
+        GIVEN: A timer with a timed phase and a phase recorded elsewhere.
+        WHEN: The report is built.
+        THEN: Assert that every phase and the total are reported in order.
+        """
+        timer = StartupTimer(fake_clock)
+
+        with timer.phase('imports'):
+            fake_clock.now += 1.5
+        timer.record('warm_up.person_detection', 0.25)
+        fake_clock.now += 0.25
+
+        assert timer.phases == {'imports': 1.5, 'warm_up.person_detection': 0.25}
+        assert timer.report().splitlines() == ["Tempo de inicialização:",
+                                               "  imports: 1.500 s",
+                                               "  warm_up.person_detection: 0.250 s",
+                                               "  total: 1.750 s"]
+
+    def test_failed_phase_is_recorded(self, fake_clock):
+        """
+        Test that a failing phase is still timed.
+
+        GIVEN: A phase that raises.
+        WHEN: The exception leaves the phase.
+        THEN: Assert that the exception is propagated and the phase recorded.
+        """
+        timer = StartupTimer(fake_clock)
+
+        with pytest.raises(RuntimeError):
+            with timer.phase('init'):
+                fake_clock.now += 2.0
+                raise RuntimeError("falha")
+
+        assert timer.phases == {'init': 2.0}
+
+
+class TestLazyImports:
+
+    def test_heavy_frameworks_not_imported(self):
+        """
+        Test that importing the vision components does not load the deep learning frameworks.
+
+        GIVEN: A new interpreter.
+        WHEN: The image processing and the MQTT client modules are imported.
+        THEN: Assert that ultralytics, DeepFace, RetinaFace, TensorFlow and torch are not loaded.
+        """
+        code = ("import sys\n"
+                "import vision.components.vision\n"
+                "import vision.components.vision.image_processing\n"
+                "import vision.components.comm.vision_comm_mqtt\n"
+                "heavy = ('ultralytics', 'deepface', 'retinaface', 'tensorflow', 'torch')\n"
+                "print(','.join(name for name in heavy if name in sys.modules))\n")
+
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True)
+
+        assert result.stdout.strip() == ''
@@ -0,0 +1,102 @@
+import sys
+
+import pytest
+from vision.components.stream import __main__ as stream_main
+
+
+class FakeImageProcessing:
+
+    config_paths = []
+
+    def __init__(self, config_path):
+        self.config_paths.append(config_path)
+
+    def warm_up(self):
+        return {}
+
+
+class FakeSupervisor:
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def run(self):
+        pass
+
+
+class FakePublisher:
+
+    args = []
+
+    def __init__(self, *args, **kwargs):
+        self.args.append(args)
+
+    def close(self):
+        pass
+
+
+class TestStreamMain:
+
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        """
+        Set up a configuration file with a single camera.
+
+        GIVEN: A camera of the CAMERAS section.
+        WHEN: The fixture is used.
+        THEN: Return the path of the configuration file.
+        """
+        path = tmp_path / 'config.yaml'
+        path.write_text("CAMERAS:\n"
+                        "  - url: http://localhost:8080/?action=stream\n"
+                        "    devId: disp0990sdf09s90sdf098s\n"
+                        "    device: SALA_CAMERA_01\n"
+                        "    space: SALA\n", encoding="utf-8")
+        return str(path)
+
+    @pytest.fixture
+    def fakes(self, config_path, monkeypatch):
+        """
+        Set up the stream entry point with fake models and MQTT clients.
+
+        GIVEN: The configuration file passed with --config and the required MQTT variables.
+        WHEN: The fixture is used.
+        THEN: Replace the models, the supervisor and the publisher of the entry point.
+        """
+        monkeypatch.setattr(sys, 'argv', ['vision.components.stream', '--config', config_path])
+        monkeypatch.setenv('MQTT_HOST', 'localhost')
+        monkeypatch.setenv('MQTT_TOPIC_VISION_PUBLISH', 'topic')
+        monkeypatch.setattr(stream_main, 'load_dotenv', lambda: None)
+        monkeypatch.setattr(stream_main, 'ImageProcessing', FakeImageProcessing)
+        monkeypatch.setattr(stream_main, 'StreamSupervisor', FakeSupervisor)
+        monkeypatch.setattr(stream_main, 'MqttPublisher', FakePublisher)
+        FakeImageProcessing.config_paths.clear()
+        FakePublisher.args.clear()
+
+    def test_config_forwarded(self, config_path, fakes):
+        """
+        Test that the configuration file of the command line builds the image processing.
+
+        GIVEN: A configuration file passed with --config and fake models and MQTT clients.
+        WHEN: The stream entry point runs.
+        THEN: Assert that ImageProcessing is built from that configuration file.
+        """
+        stream_main.main()
+
+        assert FakeImageProcessing.config_paths == [config_path]
+
+    def test_max_queued_messages(self, fakes, monkeypatch):
+        """
+        Test that the publisher gets the MQTT settings of the environment.
+
+        GIVEN: The MQTT port, QoS and maximum queued messages in the environment.
+        WHEN: The stream entry point runs.
+        THEN: Assert that the publisher is built with all of them.
+        """
+        monkeypatch.setenv('MQTT_MOSQUITTO_TLS_PORT', '8883')
+        monkeypatch.setenv('MQTT_PUBLISH_QOS', '1')
+        monkeypatch.setenv('MQTT_MAX_QUEUED_MESSAGES', '25')
+
+        stream_main.main()
+
+        assert FakePublisher.args == [('localhost', 8883, 1, 25)]
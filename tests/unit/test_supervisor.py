@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+from vision.components.stream.supervisor import Camera, StreamSupervisor
+
+
+class FakeGrabber:
+
+    def __init__(self, url):
+        self.url = url
+        self.frame = None
+        self.dropped = 0
+        self.reconnects = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def read(self, timeout=None):
+        frame, self.frame = self.frame, None
+        return frame
+
+
+class FakeProcessing:
+
+    def __init__(self):
+        self.devices = []
+
+    def process(self, img, device_id=None):
+        self.devices.append(device_id)
+        return {'n_detected_people': int(img[0, 0, 0])}
+
+    def build_message(self, request, state):
+        return {**request, **state}
+
+
+class FakePublisher:
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, topic, payload):
+        self.messages.append((topic, payload))
+        return True
+
+
+class TestStreamSupervisor:
+
+    @pytest.fixture
+    def setup(self, fake_clock):
+        """
+        Set up a supervisor of three cameras with fake grabbers and models.
+
+        GIVEN: Three cameras, the second one limited to 0.5 frames per second.
+        WHEN: The fixture is used.
+        THEN: Return the supervisor, its grabbers, the processor, the publisher and the clock.
+        """
+        cameras = [Camera("rtsp://a", "A", "CAM_A", "SALA"),
+                   Camera("rtsp://b", "B", "CAM_B", "SALA", fps=0.5),
+                   Camera("rtsp://c", "C", "CAM_C", "SALA")]
+        grabbers = {}
+
+        def factory(url):
+            grabbers[url] = FakeGrabber(url)
+            return grabbers[url]
+
+        processing, publisher = FakeProcessing(), FakePublisher()
+        supervisor = StreamSupervisor(cameras, processing, publisher, "topic",
+                                      grabber_factory=factory, clock=fake_clock)
+        return supervisor, grabbers, processing, publisher, fake_clock
+
+    @staticmethod
+    def feed(grabbers, value=1):
+        for grabber in grabbers.values():
+            grabber.frame = np.full((2, 2, 3), value, dtype=np.uint8)
+
+    @staticmethod
+    def drain(supervisor):
+        while (taken := supervisor.next_frame()) is not None:
+            supervisor.process(*taken)
+            supervisor.done(taken[0])
+
+    def test_round_robin_with_fps_budget(self, setup):
+        """
+        Test that the cameras are served in turn within their fps budgets.
+
+        GIVEN: Every camera with a new frame in each of three rounds one second apart.
+        WHEN: The frames are processed.
+        THEN: Assert that the cameras alternate and the second one is processed every other round.
+        """
+        supervisor, grabbers, processing, _, clock = setup
+
+        for _ in range(3):
+            self.feed(grabbers)
+            self.drain(supervisor)
+            clock.now += 1.0
+
+        assert processing.devices == ["A", "B", "C", "A", "C", "A", "B", "C"]
+        assert supervisor.stats()["B"]["processed"] == 2
+
+    def test_busy_camera_is_skipped(self, setup):
+        """
+        Test that a camera being processed is not taken by another worker.
+
+        GIVEN: A camera taken by a worker and not yet done.
+        WHEN: Another worker takes a frame.
+        THEN: Assert that it gets the next camera with a frame.
+        """
+        supervisor, grabbers, _, _, clock = setup
+        self.feed(grabbers)
+        slot, _ = supervisor.next_frame()
+
+        clock.now += 10
+        grabbers["rtsp://a"].frame = np.zeros((2, 2, 3), dtype=np.uint8)
+
+        assert supervisor.next_frame()[0].camera.dev_id == "B"
+        assert slot.camera.dev_id == "A"
+
+    def test_only_changed_states_are_published(self, setup):
+        """
+        Test that the results of a camera are published only when they change.
+
+        GIVEN: A camera whose frames produce the same state twice and then a new one.
+        WHEN: The frames are processed.
+        THEN: Assert that two messages are published for that camera.
+        """
+        supervisor, grabbers, _, publisher, clock = setup
+
+        for value in (1, 1, 2):
+            grabbers["rtsp://a"].frame = np.full((2, 2, 3), value, dtype=np.uint8)
+            self.drain(supervisor)
+            clock.now += 1.0
+
+        assert len(publisher.messages) == 2
+        assert all(topic == "topic" for topic, _ in publisher.messages)
+
+    def test_motion_gate_outside_lock(self, fake_clock):
+        """
+        Test that the motion gates run without holding the supervisor lock.
+
+        GIVEN: Two cameras with motion gates, the first one without motion.
+        WHEN: A frame is taken.
+        THEN: Assert that the gates ran unlocked and the second camera was taken.
+        """
+        cameras = [Camera("rtsp://a", "A", "CAM_A", "SALA"),
+                   Camera("rtsp://b", "B", "CAM_B", "SALA")]
+        grabbers, locked = {}, []
+
+        def factory(url):
+            grabbers[url] = FakeGrabber(url)
+            return grabbers[url]
+
+        def gate(frame):
+            locked.append(supervisor._lock.locked())
+            return bool(frame.any())
+
+        supervisor = StreamSupervisor(cameras, FakeProcessing(), FakePublisher(), "topic",
+                                      grabber_factory=factory, clock=fake_clock,
+                                      motion_gate_factory=lambda: gate)
+        grabbers["rtsp://a"].frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        grabbers["rtsp://b"].frame = np.ones((2, 2, 3), dtype=np.uint8)
+
+        slot, _ = supervisor.next_frame()
+
+        assert slot.camera.dev_id == "B"
+        assert locked == [False, False]
+        assert supervisor.stats()["A"]["skipped"] == 1
+        assert supervisor.next_frame() is None
+
+    def test_camera_from_config(self):
+        """
+        Test the camera settings read from the configuration.
+
+        GIVEN: A complete entry, an entry without URL and one with a zero fps budget.
+        WHEN: The cameras are built.
+        THEN: Assert that the first one is built and the other ones are rejected.
+        """
+        camera = Camera.from_config({'url': "rtsp://a", 'devId': 12, 'space': "SALA",
+                                     'fps': 2})
+
+        assert camera.dev_id == "12"
+        assert camera.device == "12"
+        assert camera.fps == 2.0
+        assert camera.request()['message']['status'][0]['value'] == "rtsp://a"
+        with pytest.raises(ValueError):
+            Camera.from_config({'devId': "A", 'space': "SALA"})
+        with pytest.raises(ValueError):
+            Camera.from_config({'url': "rtsp://a", 'devId': "A", 'space': "SALA", 'fps': 0})
@@ -0,0 +1,165 @@
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+from monitor.task_monitor import TaskMetrics
+
+
+def start_task(marker, code='import time; time.sleep(60)'):
+    return subprocess.Popen([sys.executable, '-c', code, marker])
+
+
+class TestTaskMetrics:
+
+    @pytest.fixture
+    def marker(self, request):
+        """
+        Set up a command line marker unique to the test.
+
+        GIVEN: The name of the test.
+        WHEN: The fixture is used.
+        THEN: Return a marker matched only by the processes started by the test.
+        """
+        return f'task-monitor-{request.node.name}'
+
+    def test_collect_task_process(self, marker):
+        """
+        Test the collection of the metrics of a task matched by its command line.
+
+        GIVEN: A running process with the marker in its command line.
+        WHEN: The metrics are collected.
+        THEN: Assert that the process is found with its memory and threads.
+        """
+        task = start_task(marker)
+        try:
+            metrics = TaskMetrics(marker).collect_tasks()[marker]
+        finally:
+            task.kill()
+            task.wait()
+
+        assert metrics['processes'] == 1
+        assert metrics['rss'] > 0
+        assert metrics['threads'] >= 1
+
+    def test_collect_metrics_tuple(self, marker):
+        """
+        Test the (CPU, memory) tuple returned for the first task.
+
+        GIVEN: A running process of the first task and a second task without processes.
+        WHEN: The metrics are collected.
+        THEN: Assert that the CPU and memory of the first task are returned, and None for a
+              task without processes.
+        """
+        task = start_task(marker)
+        try:
+            cpu, memory = TaskMetrics([marker, f'{marker}-missing']).collect_metrics()
+        finally:
+            task.kill()
+            task.wait()
+
+        assert cpu == 0.0
+        assert memory > 0
+        assert TaskMetrics(f'{marker}-missing').collect_metrics() is None
+
+    def test_process_handles_are_kept(self, fake_clock, marker, monkeypatch):
+        """
+        Test that the processes are not searched again at every collection.
+
+        GIVEN: A task already resolved and a rescan interval not yet elapsed.
+        WHEN: The metrics are collected again, then after the interval.
+        THEN: Assert that the processes are only searched again after the interval.
+        """
+        task = start_task(marker)
+        try:
+            task_metrics = TaskMetrics([marker], rescan_interval=60, clock=fake_clock)
+            task_metrics.collect_tasks()
+
+            scans = []
+            resolve = task_metrics.resolve
+            monkeypatch.setattr(task_metrics, 'resolve', lambda: scans.append(1) or resolve())
+
+            assert task_metrics.collect_tasks()[marker]['processes'] == 1
+            assert not scans
+
+            fake_clock.now += 60
+            task_metrics.collect_tasks()
+            assert len(scans) == 1
+        finally:
+            task.kill()
+            task.wait()
+
+    def test_resolved_again_after_exit(self, fake_clock, marker):
+        """
+        Test that a task is resolved again when its process exits.
+
+        GIVEN: A resolved task whose process exits and is restarted.
+        WHEN: The metrics are collected after the exit and after the restart.
+        THEN: Assert that the exit is noticed and the new process found without waiting for
+              the rescan interval.
+        """
+        task_metrics = TaskMetrics([marker], rescan_interval=3600, clock=fake_clock)
+        first = start_task(marker)
+        try:
+            assert task_metrics.collect_tasks()[marker]['processes'] == 1
+        finally:
+            first.kill()
+            first.wait()
+
+        assert task_metrics.collect_tasks()[marker]['processes'] == 0
+
+        second = start_task(marker)
+        try:
+            assert task_metrics.collect_tasks()[marker]['processes'] == 1
+        finally:
+            second.kill()
+            second.wait()
+
+    def test_cpu_measured_from_next_collection(self, marker, mocker):
+        """
+        Test that a process found in a collection only reports its CPU in the next one.
+
+        GIVEN: A running task busy on the CPU, not resolved yet.
+        WHEN: The metrics are collected twice.
+        THEN: Assert that the first collection only primes the CPU measure, without reporting
+              it, and the second one reports it.
+        """
+        cpu_percent = mocker.spy(psutil.Process, 'cpu_percent')
+        task = start_task(marker, 'while True: pass')
+        try:
+            task_metrics = TaskMetrics(marker)
+            first = task_metrics.collect_tasks()[marker]
+            first_reads = [call for call in cpu_percent.call_args_list
+                           if call.args[0].pid == task.pid]
+            time.sleep(0.2)
+            second = task_metrics.collect_tasks()[marker]
+        finally:
+            task.kill()
+            task.wait()
+
+        assert first['processes'] == second['processes'] == 1
+        assert len(first_reads) == 1
+        assert first['cpu'] == 0.0
+        assert second['cpu'] > 0.0
+
+    def test_metrics_exported(self, marker):
+        """
+        Test that the collected metrics are exported in the registry of the task monitor.
+
+        GIVEN: A running task.
+        WHEN: The metrics are collected.
+        THEN: Assert that the registry has the number of processes and the memory of the task.
+        """
+        task = start_task(marker)
+        try:
+            task_metrics = TaskMetrics(marker)
+            metrics = task_metrics.collect_tasks()[marker]
+        finally:
+            task.kill()
+            task.wait()
+
+        registry = task_metrics.registry
+        assert registry.get_sample_value('task_processes', {'task': marker}) == 1
+        assert registry.get_sample_value('task_memory_rss_bytes',
+                                         {'task': marker}) == metrics['rss']
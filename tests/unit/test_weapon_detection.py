@@ -2,7 +2,9 @@ import pytest
 import cv2
 import requests
 import numpy as np
-from vision.components.vision.weapon_detection import WeaponDetector
+from vision.components.vision.weapon_detection import (WeaponDetector, hand_keypoints, hand_tiles,
+                                                      non_max_suppression)
+from vision.components.vision.model_registry import ModelRegistry
 
 
 class TestWeaponDetector:
@@ -149,3 +151,150 @@ class TestWeaponDetector:
         result = detector.alert(frame)
 
         assert result is True
+
+    def test_hand_keypoints(self):
+        """
+        Test the extrapolation of the hands of several people at once.
+
+        GIVEN: The pose keypoints of two people with known elbows and wrists.
+        WHEN: Their hand keypoints are computed.
+        THEN: Assert that each hand lies past its wrist by 30% of the forearm.
+        """
+        keypoints = np.zeros((2, 17, 2), dtype=np.float32)
+        keypoints[0, [7, 8, 9, 10]] = [[0.1, 0.1], [0.5, 0.5], [0.2, 0.2], [0.6, 0.5]]
+        keypoints[1, [7, 8, 9, 10]] = [[0.3, 0.3], [0.9, 0.9], [0.4, 0.3], [0.9, 0.8]]
+
+        hands = hand_keypoints(keypoints)
+
+        assert hands.shape == (2, 2, 2)
+        assert hands[0] == pytest.approx(np.array([[0.23, 0.23], [0.63, 0.5]]))
+        assert hands[1] == pytest.approx(np.array([[0.43, 0.3], [0.9, 0.77]]))
+        assert hand_keypoints(np.empty((0, 17, 2))).shape == (0, 2, 2)
+
+    def test_weapon_person_association(self):
+        """
+        Test the association of the weapons to the people holding them.
+
+        GIVEN: A weapon held by two people, a weapon held by one person and one held by nobody.
+        WHEN: The detections are associated to the hand keypoints.
+        THEN: Assert that the free weapon is dropped and each weapon goes to the closest hand.
+        """
+        detections = np.array([[0.2, 0.2, 0.4, 0.4, 0.9],
+                               [0.8, 0.8, 1.0, 1.0, 0.5],
+                               [0.0, 0.0, 0.05, 0.05, 0.7]])
+        hands = np.array([[[0.23, 0.23], [0.6, 0.5]],
+                          [[0.32, 0.3], [0.9, 0.95]]])
+
+        held, persons = WeaponDetector._associate(detections, hands)
+
+        assert persons.tolist() == [1, 1]
+        assert held[:, 4] == pytest.approx([0.9, 0.5])
+        assert len(WeaponDetector._associate(detections, np.empty((0, 2, 2)))[0]) == 0
+
+    def test_analysis_derived_results(self):
+        """
+        Test that the alert, boxes and annotations derive from a single analysis.
+
+        GIVEN: The analysis of a frame with a weapon held by the second person.
+        WHEN: Its alert, detections and annotated frame are obtained.
+        THEN: Assert that they describe the held weapon without running any model.
+        """
+        detections = np.array([[0.2, 0.2, 0.4, 0.4, 0.9]])
+        hands = np.array([[[0.8, 0.8], [0.9, 0.9]], [[0.3, 0.3], [0.5, 0.5]]])
+
+        analysis = WeaponDetector._analysis(detections, hands)
+        frame = WeaponDetector.annotate(np.zeros((1000, 1000, 3), dtype=np.uint8), analysis)
+
+        assert analysis.alert is True
+        assert analysis.detections() == [pytest.approx([0.2, 0.2, 0.4, 0.4, 0.9, 1])]
+        assert tuple(frame[400, 200]) == (0, 0, 255)
+        assert tuple(frame[800, 800]) == (0, 255, 0)
+
+    def test_hand_tiles(self):
+        """
+        Test the full-resolution tiles around the hands.
+
+        GIVEN: Two close hands in the center of a 4K frame, one in a corner and one at the top.
+        WHEN: The tiles are computed.
+        THEN: Assert that close hands share a tile and every tile fits inside the frame.
+        """
+        hands = np.array([[[0.5, 0.5], [0.51, 0.5]], [[0.99, 0.99], [0.1, 0.02]]])
+
+        tiles = hand_tiles(hands, (2160, 3840, 3), 640)
+
+        assert tiles == [(1600, 760, 2240, 1400), (3200, 1520, 3840, 2160), (64, 0, 704, 640)]
+        assert hand_tiles(hands, (400, 500, 3), 640) == [(0, 0, 500, 400)]
+
+    def test_non_max_suppression(self):
+        """
+        Test the merge of the detections of the low-resolution pass and the tiles.
+
+        GIVEN: Two overlapping detections of the same weapon and a separate one.
+        WHEN: The overlapping detections are suppressed.
+        THEN: Assert that the most confident of the overlapping detections is kept.
+        """
+        detections = np.array([[0.0, 0.0, 0.1, 0.1, 0.5],
+                               [0.0, 0.0, 0.1, 0.09, 0.9],
+                               [0.2, 0.2, 0.3, 0.3, 0.4]])
+
+        kept = non_max_suppression(detections, 0.3)
+
+        assert kept[:, 4] == pytest.approx([0.9, 0.4])
+
+
+class FakeBoxes:
+
+    def __init__(self, detections):
+        self.xyxyn = FakeTensor(detections[:, :4])
+        self.conf = FakeTensor(detections[:, 4])
+
+
+class FakeTensor:
+
+    def __init__(self, values):
+        self.values = values
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class FakeResult:
+
+    def __init__(self, detections):
+        self.boxes = FakeBoxes(detections)
+
+
+class TestWeaponBatch:
+
+    def test_frames_without_hands_skip_weapon_model(self):
+        """
+        Test that the batched analysis only runs the weapon model on frames with hands.
+
+        GIVEN: Three frames of the same shape, the second one without hands.
+        WHEN: They are analyzed in batch.
+        THEN: Assert that a single weapon model call gets the two frames with hands, and the
+              frame without hands has no weapon.
+        """
+        registry = ModelRegistry()
+        detector = WeaponDetector({'POSE_ESTIMATION_MODEL': "vision/models/yolov8m-pose.pt",
+                                   'WEAPON_DETECTION_MODEL': "vision/models/weapon_detector.pt"},
+                                  registry=registry)
+        calls = []
+
+        def weapon_model(frames, **kwargs):
+            calls.append(len(frames))
+            return [FakeResult(np.array([[0.4, 0.4, 0.6, 0.6, 0.9]], dtype=np.float32))
+                    for _ in frames]
+
+        detector._weapon_model = registry.acquire('weapon', lambda: weapon_model)
+        frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(3)]
+        hands = np.array([[[0.5, 0.5], [0.5, 0.5]]], dtype=np.float32)
+        keypoints = [hands, np.empty((0, 2, 2), dtype=np.float32), hands]
+
+        analyses = detector.analyze_batch(frames, keypoints)
+
+        assert calls == [2]
+        assert [analysis.alert for analysis in analyses] == [True, False, True]
@@ -0,0 +1,102 @@
+import threading
+import pytest
+from vision.components.comm.work_queue import WorkQueue
+
+
+class TestWorkQueue:
+
+    @pytest.fixture
+    def gate(self):
+        """
+        Set up a gate that holds the worker on its first item.
+
+        GIVEN: An unset threading event.
+        WHEN: The fixture is used.
+        THEN: Return the event, set when the test ends.
+        """
+        event = threading.Event()
+        yield event
+        event.set()
+
+    def blocked_queue(self, gate, policy):
+        processed = []
+        started = threading.Event()
+
+        def handler(item):
+            started.set()
+            gate.wait()
+            processed.append(item)
+
+        work_queue = WorkQueue(handler, workers=1, maxsize=2, policy=policy)
+        work_queue.start()
+        work_queue.put(0)
+        started.wait(timeout=5)
+        return work_queue, processed
+
+    def test_drop_oldest(self, gate):
+        """
+        Test the drop-oldest backpressure policy.
+
+        GIVEN: A queue of size two whose only worker is busy.
+        WHEN: Three more items are enqueued.
+        THEN: Assert that the oldest waiting item is discarded.
+        """
+        work_queue, processed = self.blocked_queue(gate, 'drop-oldest')
+
+        assert [work_queue.put(item) for item in (1, 2, 3)] == [True, True, True]
+        gate.set()
+        work_queue.join()
+
+        assert processed == [0, 2, 3]
+        assert work_queue.dropped == 1
+
+    def test_drop_newest(self, gate):
+        """
+        Test the drop-newest backpressure policy.
+
+        GIVEN: A queue of size two whose only worker is busy.
+        WHEN: Three more items are enqueued.
+        THEN: Assert that the newest item is discarded.
+        """
+        work_queue, processed = self.blocked_queue(gate, 'drop-newest')
+
+        assert [work_queue.put(item) for item in (1, 2, 3)] == [True, True, False]
+        gate.set()
+        work_queue.join()
+
+        assert processed == [0, 1, 2]
+        assert work_queue.dropped == 1
+
+    def test_handler_errors_do_not_stop_workers(self):
+        """
+        Test that a failing item does not stop the worker.
+
+        GIVEN: A handler that fails for one item.
+        WHEN: Several items are enqueued.
+        THEN: Assert that the remaining items are processed.
+        """
+        processed = []
+
+        def handler(item):
+            if item == 1:
+                raise ValueError("invalid message")
+            processed.append(item)
+
+        work_queue = WorkQueue(handler, workers=2, maxsize=8, policy='block')
+        work_queue.start()
+        for item in range(4):
+            work_queue.put(item)
+        work_queue.stop()
+
+        assert sorted(processed) == [0, 2, 3]
+
+    def test_invalid_policy(self):
+        """
+        Test that unknown policies are rejected.
+
+        GIVEN: An unknown backpressure policy.
+        WHEN: A WorkQueue is created.
+        THEN: Assert that a ValueError is raised.
+        """
+        with pytest.raises(ValueError):
+            WorkQueue(print, policy='drop-random')
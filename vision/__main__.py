@@ -5,13 +5,37 @@ weapons, and performs facial recognition in images.
 This module receives camera data sent over an MQTT topic,
 processes the images, and returns the analyzed results in JSON format.
 """
-from vision.components.comm.vision_comm_mqtt import VisionCommMqtt
-from monitor import  task_monitor
+import os
+
+from prometheus_client import start_http_server
+
+from vision.components.startup import StartupTimer
 
 if __name__ == '__main__':
 
     # Main entry point for the vision system.
 
-    visionSubiscribe = VisionCommMqtt()
+    # The duration of each startup phase is reported before subscribing, to follow the
+    # cold start across releases
+    timer = StartupTimer()
+    with timer.phase('imports'):
+        from vision.components.comm.vision_comm_mqtt import VisionCommMqtt
+
+    # Prometheus endpoint of the stage latencies, work queue and startup metrics
+    metrics_port_str = os.getenv('VISION_METRICS_PORT', '8000')
+    try:
+        metrics_port = int(metrics_port_str)
+    except ValueError as exc:
+        raise ValueError(f"Valor inválido para a porta de métricas: {metrics_port_str}") from exc
+    if metrics_port:
+        start_http_server(metrics_port)
+
+    with timer.phase('init'):
+        visionSubiscribe = VisionCommMqtt()
+
+    for model, seconds in visionSubiscribe.image_processing.warm_up().items():
+        timer.record(f'warm_up.{model}', seconds)
+    print(timer.report())
+
     visionSubiscribe.subiscribe()
     # task_monitor.run()
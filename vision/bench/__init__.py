@@ -0,0 +1,11 @@
+"""Benchmarks for the computer vision system."""
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+"""Directory of the vision package."""
+
+DEFAULT_IMAGES = PACKAGE_DIR.parent / 'tests' / 'unit' / 'test_images'
+"""Default corpus: the images of the unit tests."""
+
+DEFAULT_CONFIG = PACKAGE_DIR / 'components' / 'config.yaml'
+"""Default configuration file: the one of the service."""
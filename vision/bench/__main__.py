@@ -0,0 +1,202 @@
+"""
+End-to-end benchmark of the computer vision system.
+
+Replays a corpus of images and videos through each detector and through the full
+ImageProcessing pipeline, and reports the p50/p95/p99 latency, frames per second and
+peak resident memory of each stage as JSON, to compare runs across commits.
+
+The models are built from the same configuration file as the service (found next to the
+package by default). The model paths inside it are relative, so run the benchmark from the
+same directory as the service.
+
+Usage:
+    python -m vision.bench [--images tests/unit/test_images] [--repeat 10]
+                           [--stages person,weapon,face,pipeline] [--output report.json]
+                           [--baseline previous.json] [--tolerance 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Optional
+
+import cv2
+import yaml
+
+from vision.bench import DEFAULT_CONFIG, DEFAULT_IMAGES
+from vision.bench.report import compare, measure, peak_rss_mb, summarize
+from vision.components.vision.face_recognition import FaceRecognition
+from vision.components.vision.image_processing import ImageProcessing
+from vision.components.vision.person_detection import PersonDetector
+from vision.components.vision.weapon_detection import WeaponDetector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+"""Extensions of the images of the corpus."""
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov')
+"""Extensions of the videos of the corpus."""
+
+STAGES = ('person', 'weapon', 'face', 'pipeline')
+"""Stages that can be benchmarked."""
+
+
+def load_corpus(path: str, video_stride: int = 30, max_video_frames: int = 100) -> list:
+    """
+    Load the frames of the images and videos of a directory, in file name order.
+
+    Args:
+        path (str): Directory with the images and videos.
+        video_stride (int): Only one of every `video_stride` frames of a video is kept.
+        max_video_frames (int): Maximum number of frames kept from each video.
+
+    Returns:
+        list: The frames as BGR NumPy arrays.
+    """
+    frames = []
+    for file in sorted(os.listdir(path)):
+        extension = os.path.splitext(file)[1].lower()
+        if extension in IMAGE_EXTENSIONS:
+            frame = cv2.imread(os.path.join(path, file))
+            if frame is not None:
+                frames.append(frame)
+        elif extension in VIDEO_EXTENSIONS:
+            capture = cv2.VideoCapture(os.path.join(path, file))
+            position, kept = 0, 0
+            while kept < max_video_frames:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if position % video_stride == 0:
+                    frames.append(frame)
+                    kept += 1
+                position += 1
+            capture.release()
+    return frames
+
+
+def build_stages(config_path: str, names: list[str]) -> dict[str, tuple[Any, Callable]]:
+    """
+    Build the benchmarked stages from the configuration file.
+
+    The detectors share their models with the pipeline through the model registry, so
+    benchmarking every stage does not load the models twice.
+
+    Args:
+        config_path (str): Path to the YAML configuration file.
+        names (list): Names of the stages to be built, from STAGES.
+
+    Returns:
+        dict: For each stage, the component (with a `warm_up` method, or None) and the
+              function processing a frame.
+    """
+    with open(config_path, 'r', encoding="utf-8") as f:
+        config = yaml.load(f, Loader=yaml.SafeLoader)
+
+    stages: dict[str, tuple[Any, Callable]] = {}
+    if 'person' in names:
+        detector = PersonDetector(config['PERSON_DETECTION_MODEL'],
+                                  **config.get('INFERENCE_BACKEND', {}))
+        stages['person'] = (detector, detector.count)
+    if 'weapon' in names:
+        weapon_detector = WeaponDetector(config)
+        stages['weapon'] = (weapon_detector, weapon_detector.alert)
+    if 'face' in names:
+        face_recognition = FaceRecognition(config['FACE_RECOGNITION_IMAGES'],
+                                           config['FACE_RECOGNITION_CROPS'],
+                                           config.get('FACE_RECOGNITION_MODEL', 'VGG-Face'),
+                                           config.get('FACE_RECOGNITION_THRESHOLD', 0.68),
+                                           config.get('FACE_RECOGNITION_WORKERS'),
+                                           config.get('FACE_RECOGNITION_MIN_FACE_SIZE', 0),
+                                           config.get('FACE_RECOGNITION_ROI_MIN_SIZE', 320))
+        stages['face'] = (face_recognition, face_recognition)
+    if 'pipeline' in names:
+        # Without a device identifier, the result cache and the face tracker are bypassed
+        image_processing = ImageProcessing(config_path)
+        stages['pipeline'] = (None, image_processing.process)
+    return stages
+
+
+def git_commit() -> Optional[str]:
+    """
+    Get the commit of the benchmarked code.
+
+    Returns:
+        str: The abbreviated hash of HEAD, or None outside a git checkout.
+    """
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main() -> None:
+    """Run the benchmark and print or save its JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES))
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG))
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--video-stride', type=int, default=30)
+    parser.add_argument('--max-video-frames', type=int, default=100)
+    parser.add_argument('--output', help="JSON report file (printed when omitted)")
+    parser.add_argument('--baseline', help="JSON report of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Relative p95 increase flagged as a regression")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = set(names) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    frames = load_corpus(args.images, args.video_stride, args.max_video_frames)
+    if not frames:
+        raise SystemExit(f"No images or videos found in {args.images}")
+
+    report: dict[str, Any] = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'corpus': {'path': args.images, 'frames': len(frames)},
+        'repeat': args.repeat,
+        'stages': {},
+    }
+
+    for name, (component, step) in build_stages(args.config, names).items():
+        if component is not None:
+            component.warm_up(frames[0])
+        latencies = measure(frames, step, args.repeat, args.warmup)
+        # The peak is cumulative, since every stage runs in the same process
+        report['stages'][name] = {**summarize(latencies), 'peak_rss_mb': round(peak_rss_mb(), 1)}
+    report['peak_rss_mb'] = round(peak_rss_mb(), 1)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding="utf-8") as f:
+            report['comparison'] = compare(report, json.load(f), args.tolerance)
+        regressions = [stage for stage, result in report['comparison'].items()
+                       if result['regression']]
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding="utf-8") as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if regressions:
+        print(f"Regressions above {args.tolerance:.0%} in p95: {', '.join(regressions)}",
+              file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
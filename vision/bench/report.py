@@ -0,0 +1,110 @@
+"""
+Benchmark report of the computer vision system.
+
+Measures and summarizes the latencies of each stage of the pipeline and compares the summary
+with the one of a previous run, so regressions can be spotted across commits.
+"""
+import resource
+import sys
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+"""Latency percentiles reported for each stage."""
+
+
+def measure(frames: list[np.ndarray], step: Callable[[np.ndarray], Any], repeat: int,
+            warmup: int = 1) -> list[float]:
+    """
+    Measure the latency of a stage over the frames.
+
+    Args:
+        frames (list): Frames to be processed.
+        step (Callable): Function applied to each frame.
+        repeat (int): Number of passes over the frames.
+        warmup (int): Number of untimed runs on the first frame.
+
+    Returns:
+        list: Latency of each frame in milliseconds.
+    """
+    for _ in range(warmup):
+        step(frames[0])
+
+    latencies = []
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            step(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident memory of the process since it started.
+
+    Returns:
+        float: Peak resident set size in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """
+    Summarize the latencies of a stage.
+
+    Args:
+        latencies (list): Latency of each frame in milliseconds.
+
+    Returns:
+        dict: Number of frames, p50/p95/p99, mean and max latency in milliseconds, and
+              the frames processed per second.
+
+    Raises:
+        ValueError: If there are no latencies.
+    """
+    if not latencies:
+        raise ValueError("Nenhuma latência medida")
+
+    values = np.asarray(latencies, dtype=np.float64)
+    summary = {'frames': int(values.size)}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{percentile}_ms'] = round(float(value), 3)
+    summary['mean_ms'] = round(float(values.mean()), 3)
+    summary['max_ms'] = round(float(values.max()), 3)
+    summary['fps'] = round(1000 * values.size / float(values.sum()), 3) if values.sum() else 0.0
+    return summary
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.1) -> dict[str, dict]:
+    """
+    Compare the stages of a report with the ones of a baseline report.
+
+    Args:
+        current (dict): Report of the current run, with the summary of each stage under
+                        'stages'.
+        baseline (dict): Report of the baseline run, in the same format.
+        tolerance (float): Relative increase of the p95 latency above which a stage is
+                           flagged as a regression.
+
+    Returns:
+        dict: For each stage present in both reports, the ratio of the current to the
+              baseline p50, p95 and fps, and whether the stage regressed.
+    """
+    comparison = {}
+    for stage, summary in current['stages'].items():
+        reference = baseline.get('stages', {}).get(stage)
+        if reference is None:
+            continue
+
+        ratios = {}
+        for key in ('p50_ms', 'p95_ms', 'fps'):
+            ratios[key] = round(summary[key] / reference[key], 3) if reference[key] else None
+        ratios['regression'] = ratios['p95_ms'] is not None and ratios['p95_ms'] > 1 + tolerance
+        comparison[stage] = ratios
+
+    return comparison
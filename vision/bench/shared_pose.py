@@ -0,0 +1,86 @@
+"""
+Benchmark of the shared pose inference mode.
+
+Compares the per-frame latency of counting people with the person detection model and
+then running the weapon alert (two person-level inferences) against counting people from
+the pose model boxes reused by the weapon alert (one person-level inference).
+
+The images default to the test images and the models to the ones of the service
+configuration, both found relative to the package, so the script runs from any directory.
+
+Usage:
+    python -m vision.bench.shared_pose [--images tests/unit/test_images] [--repeat 10]
+                                       [--config vision/components/config.yaml]
+"""
+import argparse
+import os
+import statistics
+
+import cv2
+import numpy as np
+import yaml
+
+from vision.bench import DEFAULT_CONFIG, DEFAULT_IMAGES, PACKAGE_DIR
+from vision.bench.report import measure
+from vision.components.vision.person_detection import PersonDetector
+from vision.components.vision.weapon_detection import WeaponDetector
+
+
+def config_model(config: dict, key: str) -> str:
+    """
+    Get the path of a model of the service configuration.
+
+    Args:
+        config (dict): The service configuration.
+        key (str): Key of the model path, such as PERSON_DETECTION_MODEL.
+
+    Returns:
+        str: The model path, resolved from the package directory like the service does.
+    """
+    return os.path.normpath(os.path.join(PACKAGE_DIR, config[key]))
+
+
+def main() -> None:
+    """Run the benchmark and print the latency of both modes."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES))
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG))
+    parser.add_argument('--person-model', help="Overrides PERSON_DETECTION_MODEL")
+    parser.add_argument('--pose-model', help="Overrides POSE_ESTIMATION_MODEL")
+    parser.add_argument('--weapon-model', help="Overrides WEAPON_DETECTION_MODEL")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding="utf-8") as f:
+        config = yaml.load(f, Loader=yaml.SafeLoader)
+    person_model = args.person_model or config_model(config, 'PERSON_DETECTION_MODEL')
+    pose_model = args.pose_model or config_model(config, 'POSE_ESTIMATION_MODEL')
+    weapon_model = args.weapon_model or config_model(config, 'WEAPON_DETECTION_MODEL')
+
+    frames = [cv2.imread(os.path.join(args.images, file))
+              for file in sorted(os.listdir(args.images))]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        raise SystemExit(f"No images found in {args.images}")
+
+    person_detector = PersonDetector(person_model)
+    weapon_detector = WeaponDetector({'POSE_ESTIMATION_MODEL': pose_model,
+                                      'WEAPON_DETECTION_MODEL': weapon_model})
+
+    def separate(frame: np.ndarray) -> tuple[int, bool]:
+        return person_detector.count(frame), weapon_detector.alert(frame)
+
+    def shared(frame: np.ndarray) -> tuple[int, bool]:
+        n_people, keypoints = weapon_detector.people(frame)
+        return n_people, weapon_detector.alert(frame, keypoints)
+
+    for name, step in (('separate', separate), ('shared', shared)):
+        latencies = measure(frames, step, args.repeat)
+        print(f"{name:>8}: mean {statistics.mean(latencies):8.1f} ms | "
+              f"median {statistics.median(latencies):8.1f} ms | "
+              f"max {max(latencies):8.1f} ms ({len(latencies)} frames)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Per-device state used to publish only the results that changed."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class DeviceStateCache:
+    """
+    Last published state of each device, bounded in size and age.
+
+    States are kept in least recently seen order: when more than `max_devices` devices are
+    tracked the least recently seen one is evicted, and devices not seen for `ttl` seconds are
+    forgotten, so a device that comes back after a long time publishes again.
+
+    Attributes:
+        max_devices (int): Maximum number of devices tracked.
+        ttl (float): Time in seconds without messages after which a device is forgotten.
+
+    Methods:
+        changed(device: str, state: dict) -> bool: Store the state of a device and tell
+                                                   whether it differs from the previous one.
+        get(device: str) -> dict: Get the current state of a device.
+    """
+
+    max_devices: int
+    """Maximum number of devices tracked."""
+
+    ttl: float
+    """Time in seconds without messages after which a device is forgotten."""
+
+    def __init__(self, max_devices: int = 1024, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize an empty DeviceStateCache.
+
+        Args:
+            max_devices (int): Maximum number of devices tracked.
+            ttl (float): Time in seconds without messages after which a device is forgotten.
+            clock (Callable): Function returning the current time in seconds.
+        """
+        self.max_devices = max_devices
+        self.ttl = ttl
+        self._clock = clock
+        self._states: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, device: str) -> Optional[dict]:
+        """
+        Get the current state of a device.
+
+        Args:
+            device (str): Device identifier.
+
+        Returns:
+            dict: The last stored state, or None if unknown or expired.
+        """
+        with self._lock:
+            entry = self._states.get(device)
+            if entry is None or self._clock() - entry[0] > self.ttl:
+                return None
+            return entry[1]
+
+    def changed(self, device: str, state: dict) -> bool:
+        """
+        Store the state of a device and tell whether it differs from the previous one.
+
+        Args:
+            device (str): Device identifier.
+            state (dict): The new state of the device.
+
+        Returns:
+            bool: True if the device is unknown, was forgotten or its state changed.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._states.pop(device, None)
+            changed = entry is None or now - entry[0] > self.ttl or entry[1] != state
+            self._states[device] = (now, state.copy() if changed or entry is None else entry[1])
+
+            # The least recently seen device is always first, so expired devices are at the front
+            while self._states and (len(self._states) > self.max_devices or
+                                    now - next(iter(self._states.values()))[0] > self.ttl):
+                self._states.popitem(last=False)
+
+        return changed
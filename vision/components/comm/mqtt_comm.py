@@ -5,7 +5,9 @@ from typing import Optional
 
 import paho.mqtt.client as mqtt
 from dotenv import load_dotenv
-from paho.mqtt.client import Client, MQTTMessage
+from paho.mqtt.client import Client, ConnectFlags, MQTTMessage
+from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCode
 
 from vision.components.comm.communication_base import CommunicationBase
 
@@ -37,19 +39,53 @@ class MqttComm(CommunicationBase):  # pylint: disable=too-few-public-methods
             raise ValueError(f"Valor inválido para o "
                              f"máximo de conexões: {mqtt_max_connections_str}") from exc
 
+        mqtt_publish_qos_str = os.getenv('MQTT_PUBLISH_QOS', '0')
+        mqtt_max_queued_str = os.getenv('MQTT_MAX_QUEUED_MESSAGES', '100')
+        try:
+            self.mqtt_publish_qos = int(mqtt_publish_qos_str)
+            self.mqtt_max_queued_messages = int(mqtt_max_queued_str)
+        except ValueError as exc:
+            raise ValueError(f"Valor inválido para a publicação: QoS={mqtt_publish_qos_str}, "
+                             f"fila={mqtt_max_queued_str}") from exc
+
         self.count_connections = 0
-        # self.client: mqtt.Client = None
+        self.client: Optional[mqtt.Client] = None
 
     def subiscribe(self) -> None:
-        """register on a specific MQTT broker topic"""
+        """
+        register on a specific MQTT broker topic
+
+        The same connection is kept open to publish the results, and the client reconnects
+        (and subscribes again) automatically if the connection drops.
+        """
         client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         client.on_message = self._work_load
+        client.on_connect = self._on_connect
         client.on_connect_fail = self._on_connect_fail
+        client.max_queued_messages_set(self.mqtt_max_queued_messages)
+        client.reconnect_delay_set(min_delay=1, max_delay=60)
+        self.client = client
         client.connect(self.mqtt_host, self.mqtt_port)
+        client.loop_forever()
+
+    def _on_connect(self, client: Client, userdata: Optional[None], flags: ConnectFlags,
+                    reason_code: ReasonCode, properties: Optional[Properties]) -> None:
+        """
+        function executed every time the connection with the MQTT broker is established
+            Parameters:
+                client (Client): the client instance for this callback
+                userdata (NoneType): the private user data as set in Client() or user_data_set()
+                flags (ConnectFlags): the flags sent by the broker
+                reason_code (ReasonCode): the connection result
+                properties (Properties): the MQTT v5.0 properties sent by the broker
+        """
+        if reason_code.is_failure:
+            print(f"Failed to connect to MQTT Broker: {reason_code}")
+            return
         print("Connected to MQTT Broker!")
+        self.count_connections = 0
         assert self.mqtt_topic_subscribe is not None
         client.subscribe(self.mqtt_topic_subscribe)
-        client.loop_forever()
 
     @abstractmethod
     def _work_load(self, client: Client, userdata: Optional[None], msg: MQTTMessage) -> None:
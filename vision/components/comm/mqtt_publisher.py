@@ -0,0 +1,67 @@
+"""Long-lived MQTT publisher with automatic reconnection."""
+import paho.mqtt.client as mqtt
+
+
+class MqttPublisher:
+    """
+    Publisher that keeps a single connection to the MQTT broker.
+
+    Unlike ``paho.mqtt.publish.single``, which opens a TCP connection, performs the CONNECT
+    handshake and disconnects for every message, this publisher connects once in a background
+    network loop and reconnects automatically, so each publish is a single packet write.
+    Messages published while disconnected are kept in the client outbound queue.
+
+    Attributes:
+        client (Client): The paho MQTT client.
+        qos (int): Quality of service level of the published messages.
+
+    Methods:
+        publish(topic: str, payload: str) -> bool: Publish a message.
+        close() -> None: Disconnect from the broker.
+    """
+
+    client: mqtt.Client
+    """The paho MQTT client."""
+
+    qos: int
+    """Quality of service level of the published messages."""
+
+    def __init__(self, host: str, port: int, qos: int = 0,
+                 max_queued_messages: int = 100) -> None:
+        """
+        Initialize the MqttPublisher and start the connection in the background.
+
+        Args:
+            host (str): Hostname of the MQTT broker.
+            port (int): Port of the MQTT broker.
+            qos (int): Quality of service level of the published messages.
+            max_queued_messages (int): Maximum number of messages in the outbound queue.
+        """
+        self.qos = qos
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.client.max_queued_messages_set(max_queued_messages)
+        self.client.reconnect_delay_set(min_delay=1, max_delay=60)
+        self.client.connect_async(host, port)
+        self.client.loop_start()
+
+    def publish(self, topic: str, payload: str) -> bool:
+        """
+        Publish a message on the persistent connection.
+
+        Args:
+            topic (str): Topic of the message.
+            payload (str): Payload of the message.
+
+        Returns:
+            bool: True if the message was sent or queued, False if it was discarded
+                  (QoS 0 while disconnected, or outbound queue full).
+        """
+        info = self.client.publish(topic, payload, qos=self.qos)
+        # QoS 1 and 2 messages are kept in the outbound queue until the connection is back
+        return info.rc == mqtt.MQTT_ERR_SUCCESS or \
+            (info.rc == mqtt.MQTT_ERR_NO_CONN and self.qos > 0)
+
+    def close(self) -> None:
+        """Disconnect from the broker and stop the network loop."""
+        self.client.disconnect()
+        self.client.loop_stop()
@@ -2,11 +2,14 @@
 from typing import Any, Optional
 
 import json
+import os
 
-from paho.mqtt import publish
-from paho.mqtt.client import Client, MQTTMessage
+from paho.mqtt.client import MQTT_ERR_SUCCESS, Client, MQTTMessage, error_string
 
+from vision.components.comm.device_state import DeviceStateCache
 from vision.components.comm.mqtt_comm import MqttComm
+from vision.components.comm.work_queue import WorkQueue
+from vision.components.metrics import device_context, stage_timer
 from vision.components.vision.image_processing import ImageProcessing
 
 
@@ -18,7 +21,9 @@ class VisionCommMqtt(MqttComm):
         Attributes:
             config (dict): Configuration dictionary containing MQTT settings.
             count_connections (int): Counter for the number of connection attempts.
-            state (dict): Dictionary to hold the current state information.
+            states (DeviceStateCache): Last published state of each device.
+            work_queue (WorkQueue): Bounded queue between the MQTT network loop and the
+                                    image processing workers.
         """
 
     config: dict
@@ -27,22 +32,48 @@ class VisionCommMqtt(MqttComm):
     count_connections: int
     """Counter for the number of connection attempts."""
 
-    state: dict
-    """Dictionary to hold the current state information."""
+    states: DeviceStateCache
+    """Last published state of each device, keyed by devId."""
+
+    work_queue: WorkQueue
+    """Bounded queue between the MQTT network loop and the image processing workers.
+
+    The workers (VISION_WORKERS) share the models of the registry, and each model runs one
+    image at a time, so more than one worker only overlaps the different models of
+    different images."""
 
     def __init__(self):
         super().__init__()
-        self.state = {}
         self.image_processing = ImageProcessing()
 
+        workers_str = os.getenv('VISION_WORKERS', '1')
+        queue_size_str = os.getenv('VISION_QUEUE_SIZE', '16')
+        try:
+            workers = int(workers_str)
+            queue_size = int(queue_size_str)
+        except ValueError as exc:
+            raise ValueError(f"Valor inválido para a fila de trabalho: "
+                             f"workers={workers_str}, tamanho={queue_size_str}") from exc
+
+        max_devices_str = os.getenv('VISION_STATE_MAX_DEVICES', '1024')
+        state_ttl_str = os.getenv('VISION_STATE_TTL', '3600')
+        try:
+            self.states = DeviceStateCache(int(max_devices_str), float(state_ttl_str))
+        except ValueError as exc:
+            raise ValueError(f"Valor inválido para o estado dos dispositivos: "
+                             f"máximo={max_devices_str}, ttl={state_ttl_str}") from exc
+
+        self.work_queue = WorkQueue(self._process_message, workers, queue_size,
+                                    os.getenv('VISION_QUEUE_POLICY', 'drop-oldest'))
+        self.work_queue.start()
+
     def _work_load(self, client: Client, userdata: Optional[None], msg: MQTTMessage) -> None:
         """
         Callback function for handling incoming MQTT messages.
 
-        This function is triggered when a message is received on the
-        subscribed topic. It loads the image from the URL provided in
-        the message, performs detection and recognition tasks, and publishes the
-        results back to the MQTT broker if there are changes in the state.
+        This function is triggered when a message is received on the subscribed topic.
+        It only enqueues the message payload for the worker pool, so the MQTT network loop
+        is never blocked by image processing (except with the 'block' queue policy).
 
         Args:
             client (MQTTClient): The MQTT client instance.
@@ -50,26 +81,54 @@ class VisionCommMqtt(MqttComm):
                       any type that is passed to callbacks.
             msg: The MQTT message received from the broker.
         """
-        request = json.loads(msg.payload.decode('utf-8'))
+        if not self.work_queue.put(msg.payload):
+            print("Fila de trabalho cheia, mensagem descartada")
 
-        img = self.image_processing.load_image_from_source(request['message']['status'][0]['value'])
+    def _process_message(self, payload: bytes) -> None:
+        """
+        Process a message taken from the work queue.
 
-        if img is not None:
-            new_state = self.image_processing.process(img)
+        It loads the image from the URL provided in the message, performs detection and
+        recognition tasks, and publishes the results back to the MQTT broker if the state of
+        the device (identified by the request 'devId') changed. The stage latencies observed
+        while handling the message are labelled with the device.
 
-            if new_state != self.state:
-                self.state = new_state.copy()
-                response = self.image_processing.build_message(request, new_state)
-                self.publish(json.dumps(response))
+        Args:
+            payload (bytes): The payload of the MQTT message.
+        """
+        request = json.loads(payload.decode('utf-8'))
+        device_id = str(request.get('devId', ''))
+
+        with device_context(device_id):
+            img = self.image_processing.load_image_from_source(
+                request['message']['status'][0]['value'])
+
+            if img is not None:
+                new_state = self.image_processing.process(img, device_id)
+
+                if self.states.changed(device_id, new_state):
+                    response = self.image_processing.build_message(request, new_state)
+                    self.publish(json.dumps(response))
 
     def publish(self, data: Any) -> None:
         """
-        Publishes data to the MQTT topic.
+        Publishes data to the MQTT topic on the already connected subscribe client.
+
+        The message is written to the open connection with the configured QoS
+        (MQTT_PUBLISH_QOS); while reconnecting, QoS 1 and 2 messages wait in the client
+        outbound queue (up to MQTT_MAX_QUEUED_MESSAGES).
+
         Args:
             data (Any): The data to publish.
-            Raises: ValueError: If the MQTT publish topic is not defined.
+            Raises: ValueError: If the MQTT publish topic is not defined or the client
+                                is not connected.
         """
         if not self.mqtt_topic_publish:
             raise ValueError("MQTT publish topic is not defined")
+        if self.client is None:
+            raise ValueError("MQTT client is not connected")
 
-        publish.single(self.mqtt_topic_publish, data, hostname=self.mqtt_host, port=self.mqtt_port)
+        with stage_timer('publish'):
+            info = self.client.publish(self.mqtt_topic_publish, data, qos=self.mqtt_publish_qos)
+        if info.rc != MQTT_ERR_SUCCESS:
+            print(f"Falha ao publicar no MQTT: {error_string(info.rc)}")
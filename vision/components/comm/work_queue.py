@@ -0,0 +1,136 @@
+"""Bounded work queue between the MQTT network loop and the image processing workers."""
+import queue
+import threading
+from typing import Any, Callable
+
+from vision.components.metrics import QUEUE_DEPTH, QUEUE_DROPPED
+
+
+class WorkQueue:
+    """
+    Bounded queue served by a pool of worker threads.
+
+    Producers (the MQTT callback) only enqueue work and return immediately, so the network
+    loop keeps reading the socket and sending keepalives while images are being processed.
+    When the queue is full the backpressure policy decides what happens:
+
+    - ``drop-oldest``: the oldest waiting item is discarded to make room for the new one.
+    - ``drop-newest``: the new item is discarded.
+    - ``block``: the producer waits until there is room in the queue.
+
+    Attributes:
+        handler (Callable): Function executed by the workers for each item.
+        policy (str): Backpressure policy applied when the queue is full.
+        dropped (int): Number of items discarded by the backpressure policy.
+
+    Methods:
+        start() -> None: Start the worker threads.
+        put(item) -> bool: Enqueue an item according to the backpressure policy.
+        stop() -> None: Stop the worker threads after the queued items are processed.
+    """
+
+    POLICIES = ('drop-oldest', 'drop-newest', 'block')
+    """Supported backpressure policies."""
+
+    handler: Callable[[Any], None]
+    """Function executed by the workers for each item."""
+
+    policy: str
+    """Backpressure policy applied when the queue is full."""
+
+    dropped: int
+    """Number of items discarded by the backpressure policy."""
+
+    def __init__(self, handler: Callable[[Any], None], workers: int = 1,
+                 maxsize: int = 16, policy: str = 'drop-oldest') -> None:
+        """
+        Initialize the WorkQueue.
+
+        Args:
+            handler (Callable): Function executed by the workers for each item.
+            workers (int): Number of worker threads.
+            maxsize (int): Maximum number of items waiting in the queue.
+            policy (str): Backpressure policy: 'drop-oldest', 'drop-newest' or 'block'.
+
+        Raises:
+            ValueError: If the policy is not supported or the sizes are not positive.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de fila inválida: {policy}")
+        if workers < 1 or maxsize < 1:
+            raise ValueError("O número de workers e o tamanho da fila devem ser positivos")
+
+        self.handler = handler
+        self.policy = policy
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f'vision-worker-{i}',
+                                          daemon=True) for i in range(workers)]
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, item: Any) -> bool:
+        """
+        Enqueue an item according to the backpressure policy.
+
+        Args:
+            item: The item to be processed by the workers.
+
+        Returns:
+            bool: False if the new item was discarded, True otherwise.
+        """
+        if self.policy == 'block':
+            self._queue.put(item)
+            QUEUE_DEPTH.set(self._queue.qsize())
+            return True
+
+        with self._lock:
+            try:
+                self._queue.put_nowait(item)
+                accepted = True
+            except queue.Full:
+                accepted = self.policy == 'drop-oldest'
+                if accepted:
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                    except queue.Empty:
+                        pass
+                    self._queue.put_nowait(item)
+                self.dropped += 1
+                QUEUE_DROPPED.labels(self.policy).inc()
+
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return accepted
+
+    def join(self) -> None:
+        """Wait until every queued item has been processed."""
+        self._queue.join()
+
+    def stop(self) -> None:
+        """Stop the worker threads after the queued items are processed."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        """Process items from the queue until a stop sentinel is received."""
+        while True:
+            item = self._queue.get()
+            QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                if item is None:
+                    return
+                self.handler(item)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Erro ao processar mensagem: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,71 @@
+"""Prometheus metrics of the computer vision system."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+QUEUE_DEPTH = Gauge('vision_queue_depth',
+                    'Number of messages waiting in the work queue')
+"""Number of messages waiting in the work queue."""
+
+QUEUE_DROPPED = Counter('vision_queue_dropped_messages',
+                        'Messages dropped by the work queue backpressure policy',
+                        ['policy'])
+"""Messages dropped by the work queue backpressure policy."""
+
+STARTUP_SECONDS = Gauge('vision_startup_seconds',
+                        'Duration of each startup phase of the last start, in seconds',
+                        ['phase'])
+"""Duration of each startup phase of the last start, in seconds."""
+
+STAGE_SECONDS = Histogram('vision_stage_seconds',
+                          'Latency of each stage of the processing of a frame, in seconds',
+                          ['stage', 'device'],
+                          buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                                   10.0, 30.0))
+"""Latency of each stage of the processing of a frame, in seconds."""
+
+DEVICE: ContextVar[str] = ContextVar('vision_device', default='unknown')
+"""Device whose frame is being processed, used as the label of the stage latencies."""
+
+
+@contextmanager
+def device_context(device_id: Optional[str]) -> Iterator[None]:
+    """
+    Label the stage latencies observed inside the block with a device.
+
+    Threads started inside the block only inherit the device if they run in a copy of the
+    current context (see contextvars.copy_context).
+
+    Args:
+        device_id (str): Identifier of the device, or None to keep the current label.
+    """
+    if not device_id:
+        yield
+        return
+
+    token = DEVICE.set(device_id)
+    try:
+        yield
+    finally:
+        DEVICE.reset(token)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Observe the latency of a stage in the vision_stage_seconds histogram.
+
+    The latency is observed even if the stage fails, labelled with the device of the
+    current context.
+
+    Args:
+        stage (str): Name of the stage, such as 'fetch', 'pose' or 'publish'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage, DEVICE.get()).observe(time.perf_counter() - start)
@@ -0,0 +1,87 @@
+"""Timing of the startup phases of the computer vision system."""
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from vision.components.metrics import STARTUP_SECONDS
+
+
+class StartupTimer:
+    """
+    Timer of the phases of the startup, from the imports to the first subscription.
+
+    Attributes:
+        phases (dict): Duration in seconds of each finished phase, in the order they ran.
+
+    Methods:
+        phase(name: str) -> ContextManager: Time a phase of the startup.
+        record(name: str, seconds: float) -> None: Record a phase timed elsewhere.
+        total() -> float: Time in seconds since the timer was created.
+        report() -> str: Report the duration of each phase and export them as metrics.
+    """
+
+    phases: dict[str, float]
+    """Duration in seconds of each finished phase, in the order they ran."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """
+        Initialize the StartupTimer, starting the total time.
+
+        Args:
+            clock (Callable): Function returning the current time in seconds.
+        """
+        self.phases = {}
+        self._clock = clock
+        self._start = clock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a phase of the startup, recorded even if it fails.
+
+        Args:
+            name (str): Name of the phase.
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record a phase timed elsewhere.
+
+        Args:
+            name (str): Name of the phase.
+            seconds (float): Duration of the phase in seconds.
+        """
+        self.phases[name] = seconds
+
+    def total(self) -> float:
+        """
+        Get the time since the timer was created.
+
+        Returns:
+            float: Elapsed time in seconds.
+        """
+        return self._clock() - self._start
+
+    def report(self) -> str:
+        """
+        Report the duration of each phase and the total startup time.
+
+        The durations are also exported in the vision_startup_seconds gauge, labelled by
+        phase, so the cold start can be followed across releases.
+
+        Returns:
+            str: One line per phase, followed by the total.
+        """
+        total = self.total()
+        lines = ["Tempo de inicialização:"]
+        for name, seconds in self.phases.items():
+            STARTUP_SECONDS.labels(name).set(seconds)
+            lines.append(f"  {name}: {seconds:.3f} s")
+        STARTUP_SECONDS.labels('total').set(total)
+        lines.append(f"  total: {total:.3f} s")
+        return '\n'.join(lines)
@@ -0,0 +1 @@
+"""Video stream processing module for the computer vision system."""
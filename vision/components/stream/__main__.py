@@ -0,0 +1,83 @@
+"""
+Multi-camera stream supervisor entry point.
+
+Reads the cameras of the CAMERAS section of the configuration and processes their streams
+with a single set of loaded models, publishing the results on MQTT.
+
+Usage:
+    python -m vision.components.stream [--config ../vision/components/config.yaml]
+"""
+import argparse
+import functools
+import os
+
+import yaml
+from dotenv import load_dotenv
+
+from vision.components.comm.device_state import DeviceStateCache
+from vision.components.comm.mqtt_publisher import MqttPublisher
+from vision.components.stream.capture import FrameGrabber
+from vision.components.stream.motion import MotionGate
+from vision.components.stream.supervisor import Camera, StreamSupervisor
+from vision.components.vision.image_processing import ImageProcessing
+
+
+def main() -> None:
+    """Start the stream supervisor with the cameras of the configuration file."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='../vision/components/config.yaml')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding="utf-8") as f:
+        config = yaml.load(f, Loader=yaml.SafeLoader)
+
+    cameras = [Camera.from_config(entry) for entry in config.get('CAMERAS', [])]
+    if not cameras:
+        raise ValueError("Nenhuma câmera configurada na seção CAMERAS")
+
+    load_dotenv()
+    mqtt_host = os.getenv('MQTT_HOST')
+    if mqtt_host is None:
+        raise ValueError("A variável de ambiente 'MQTT_HOST' não está definida")
+    mqtt_topic = os.getenv("MQTT_TOPIC_VISION_PUBLISH")
+    if not mqtt_topic:
+        raise ValueError("A variável de ambiente 'MQTT_TOPIC_VISION_PUBLISH' não está definida")
+    mqtt_port_str = os.getenv('MQTT_MOSQUITTO_TLS_PORT', '1883')
+    mqtt_publish_qos_str = os.getenv('MQTT_PUBLISH_QOS', '0')
+    mqtt_max_queued_str = os.getenv('MQTT_MAX_QUEUED_MESSAGES', '100')
+    try:
+        publisher = MqttPublisher(mqtt_host, int(mqtt_port_str), int(mqtt_publish_qos_str),
+                                  int(mqtt_max_queued_str))
+    except ValueError as exc:
+        raise ValueError(f"Valor inválido para o MQTT: porta={mqtt_port_str}, "
+                         f"QoS={mqtt_publish_qos_str}, fila={mqtt_max_queued_str}") from exc
+
+    supervisor_config = config.get('STREAM_SUPERVISOR', {})
+    backoff_min = supervisor_config.get('backoff_min', 1.0)
+    backoff_max = supervisor_config.get('backoff_max', 60.0)
+
+    motion_config = dict(config.get('MOTION_GATE', {}))
+    motion_gate_factory = None
+    if motion_config.pop('enabled', False):
+        motion_gate_factory = functools.partial(MotionGate, **motion_config)
+
+    image_processing = ImageProcessing(args.config)
+    image_processing.warm_up()
+
+    supervisor = StreamSupervisor(
+        cameras, image_processing, publisher, mqtt_topic,
+        workers=supervisor_config.get('workers', 1),
+        grabber_factory=lambda url: FrameGrabber(url, reconnect=True, backoff_min=backoff_min,
+                                                 backoff_max=backoff_max),
+        motion_gate_factory=motion_gate_factory,
+        states=DeviceStateCache(max_devices=len(cameras)))
+
+    try:
+        supervisor.run()
+    finally:
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
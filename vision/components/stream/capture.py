@@ -0,0 +1,200 @@
+"""
+Video capture module for the computer vision system.
+
+This module reads a video stream in its own thread and keeps only the most recent frame,
+so a slow consumer always processes the freshest frame instead of a growing backlog.
+"""
+import threading
+from typing import Any, Callable, Optional
+
+import cv2
+import numpy as np
+
+
+def open_stream(url: str) -> Any:
+    """
+    Open a video stream with the FFMPEG backend.
+
+    Args:
+        url (str): URL of the stream.
+
+    Returns:
+        cv2.VideoCapture: The opened capture.
+    """
+    return cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+
+
+class FrameGrabber:
+    """
+    Capture thread with latest-frame semantics.
+
+    The thread reads the stream continuously into a single-slot buffer, so the capture
+    buffer of OpenCV never fills with stale frames. Frames overwritten before being read by
+    the consumer are counted as dropped. When `reconnect` is enabled, a stream that fails to
+    open or stops delivering frames is reopened with exponential backoff.
+
+    Attributes:
+        url (str): URL of the stream.
+        reconnect (bool): Whether the stream is reopened when it fails.
+        backoff_min (float): Initial delay in seconds before reopening the stream.
+        backoff_max (float): Maximum delay in seconds before reopening the stream.
+        captured (int): Number of frames read from the stream.
+        dropped (int): Number of frames overwritten before being read.
+        reconnects (int): Number of times the stream was reopened.
+
+    Methods:
+        start() -> None: Start the capture thread.
+        read(timeout: float) -> np.ndarray: Wait for a frame newer than the last one read.
+        stop() -> None: Stop the capture thread.
+        is_alive() -> bool: Tell whether the capture thread is running.
+    """
+
+    url: str
+    """URL of the stream."""
+
+    reconnect: bool
+    """Whether the stream is reopened when it fails."""
+
+    backoff_min: float
+    """Initial delay in seconds before reopening the stream."""
+
+    backoff_max: float
+    """Maximum delay in seconds before reopening the stream."""
+
+    captured: int
+    """Number of frames read from the stream."""
+
+    dropped: int
+    """Number of frames overwritten before being read."""
+
+    reconnects: int
+    """Number of times the stream was reopened."""
+
+    def __init__(self, url: str, opener: Callable[[str], Any] = open_stream,
+                 reconnect: bool = False, backoff_min: float = 1.0,
+                 backoff_max: float = 60.0) -> None:
+        """
+        Initialize the FrameGrabber.
+
+        Args:
+            url (str): URL of the stream.
+            opener (Callable): Function opening the stream and returning an object with the
+                               `isOpened`, `read` and `release` methods of cv2.VideoCapture.
+            reconnect (bool): Whether the stream is reopened when it fails.
+            backoff_min (float): Initial delay in seconds before reopening the stream.
+            backoff_max (float): Maximum delay in seconds before reopening the stream.
+        """
+        self.url = url
+        self.reconnect = reconnect
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.captured = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._opener = opener
+        self._frame: Optional[np.ndarray] = None
+        self._fresh = False
+        self._running = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._capture, name=f'capture-{url}', daemon=True)
+
+    def start(self) -> None:
+        """Start the capture thread."""
+        self._running = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the capture thread and wait for it to release the stream."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        """
+        Tell whether the capture thread is running.
+
+        Returns:
+            bool: True while the stream is being read.
+        """
+        return self._thread.is_alive()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait for a frame newer than the last one read.
+
+        Args:
+            timeout (float): Maximum time in seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            np.ndarray: The most recent frame, or None on timeout or if the capture stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._fresh or not self._running, timeout)
+            if not self._fresh:
+                return None
+            self._fresh = False
+            return self._frame
+
+    def _store(self, frame: np.ndarray) -> None:
+        """
+        Replace the buffered frame with a new one.
+
+        Args:
+            frame (np.ndarray): The new frame.
+        """
+        with self._condition:
+            if self._fresh:
+                self.dropped += 1
+            self._frame = frame
+            self._fresh = True
+            self.captured += 1
+            self._condition.notify_all()
+
+    def _capture(self) -> None:
+        """Read the stream until it ends (or, with reconnection, until the grabber is stopped)."""
+        backoff = self.backoff_min
+        try:
+            while self._running:
+                if self._read_stream():
+                    backoff = self.backoff_min
+                if not self.reconnect:
+                    return
+
+                with self._condition:
+                    if self._condition.wait_for(lambda: not self._running, backoff):
+                        return
+                backoff = min(backoff * 2, self.backoff_max)
+                self.reconnects += 1
+                print(f"Reconectando ao stream {self.url} (tentativa {self.reconnects})")
+        finally:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+
+    def _read_stream(self) -> bool:
+        """
+        Open the stream and read it until it fails or the grabber is stopped.
+
+        Returns:
+            bool: True if at least one frame was read.
+        """
+        cap = self._opener(self.url)
+        read_any = False
+        try:
+            if not cap.isOpened():
+                print(f"Erro ao abrir o stream: {self.url}")
+                return False
+
+            while self._running:
+                ret, frame = cap.read()
+                if not ret:
+                    print("Erro ao capturar quadro do stream.")
+                    break
+                self._store(frame)
+                read_any = True
+        finally:
+            cap.release()
+
+        return read_any
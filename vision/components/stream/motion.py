@@ -0,0 +1,157 @@
+"""
+Motion detection module for the computer vision system.
+
+This module decides whether a frame of a video stream changed enough to be worth
+processing, so the processing cost follows the scene activity instead of the frame rate.
+"""
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Motion gate in front of the image processing of a video stream.
+
+    Each frame is converted to a blurred, downscaled grayscale copy and compared with the
+    background, either by frame differencing (``diff``) or by a MOG2 background subtractor
+    (``mog2``). The frame passes the gate when the ratio of changed pixels inside the region
+    of interest reaches `min_changed_ratio`.
+
+    Attributes:
+        min_changed_ratio (float): Minimum ratio of changed pixels for a frame to pass.
+        threshold (int): Minimum gray level difference for a pixel to count as changed.
+        width (int): Width of the downscaled copy used for the comparison.
+        max_idle (float): Maximum time in seconds without letting a frame pass, or None.
+        changed_ratio (float): Ratio of changed pixels of the last frame checked.
+
+    Methods:
+        __call__(frame: np.ndarray) -> bool: Tell whether the frame should be processed.
+    """
+
+    METHODS = ('diff', 'mog2')
+    """Supported motion detection methods."""
+
+    min_changed_ratio: float
+    """Minimum ratio of changed pixels for a frame to pass."""
+
+    threshold: int
+    """Minimum gray level difference for a pixel to count as changed."""
+
+    width: int
+    """Width of the downscaled copy used for the comparison."""
+
+    max_idle: Optional[float]
+    """Maximum time in seconds without letting a frame pass, or None."""
+
+    changed_ratio: float
+    """Ratio of changed pixels of the last frame checked."""
+
+    def __init__(self, min_changed_ratio: float = 0.01, threshold: int = 25, width: int = 160,
+                 method: str = 'diff', roi: Optional[list[list[list[float]]]] = None,
+                 max_idle: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the MotionGate.
+
+        Args:
+            min_changed_ratio (float): Minimum ratio of changed pixels for a frame to pass.
+            threshold (int): Minimum gray level difference for a pixel to count as changed.
+            width (int): Width of the downscaled copy used for the comparison.
+            method (str): Motion detection method: 'diff' or 'mog2'.
+            roi (list): Regions of interest as polygons of normalized [x, y] points.
+                        The whole frame is used if None.
+            max_idle (float): Maximum time in seconds without letting a frame pass, so the
+                              results are refreshed even in a static scene. None disables it.
+            clock (Callable): Function returning the current time in seconds.
+
+        Raises:
+            ValueError: If the method is not supported.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Método de detecção de movimento inválido: {method}")
+
+        self.min_changed_ratio = min_changed_ratio
+        self.threshold = threshold
+        self.width = width
+        self.max_idle = max_idle
+        self.changed_ratio = 0.0
+        self._roi = roi
+        self._clock = clock
+        self._mask: Optional[np.ndarray] = None
+        self._previous: Optional[np.ndarray] = None
+        self._last_pass = -float('inf')
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(
+            varThreshold=threshold, detectShadows=False) if method == 'mog2' else None
+
+    def __call__(self, frame: np.ndarray) -> bool:
+        """
+        Tell whether the frame changed enough to be processed.
+
+        Args:
+            frame (np.ndarray): BGR frame of the video stream.
+
+        Returns:
+            bool: True if the frame should be processed, False otherwise.
+        """
+        small = self._preprocess(frame)
+        if self._mask is None or self._mask.shape != small.shape:
+            self._mask = self._roi_mask(small.shape)
+            self._previous = None
+
+        if self._subtractor is not None:
+            changed = self._subtractor.apply(small) > 0
+        elif self._previous is None:
+            changed = np.ones(small.shape, dtype=bool)
+        else:
+            changed = cv2.absdiff(small, self._previous) > self.threshold
+        self._previous = small
+
+        roi_pixels = int(np.count_nonzero(self._mask))
+        self.changed_ratio = int(np.count_nonzero(changed & self._mask)) / max(roi_pixels, 1)
+
+        now = self._clock()
+        passed = self.changed_ratio >= self.min_changed_ratio or \
+            (self.max_idle is not None and now - self._last_pass >= self.max_idle)
+        if passed:
+            self._last_pass = now
+
+        return passed
+
+    def _preprocess(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Build the blurred, downscaled grayscale copy of a frame.
+
+        Args:
+            frame (np.ndarray): BGR frame of the video stream.
+
+        Returns:
+            np.ndarray: The grayscale copy, `width` pixels wide.
+        """
+        height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _roi_mask(self, shape: tuple[int, ...]) -> np.ndarray:
+        """
+        Rasterize the regions of interest for the downscaled frame size.
+
+        Args:
+            shape (tuple): Shape of the downscaled grayscale frame.
+
+        Returns:
+            np.ndarray: Boolean mask of the pixels inside the regions of interest.
+        """
+        if not self._roi:
+            return np.ones(shape, dtype=bool)
+
+        mask = np.zeros(shape, dtype=np.uint8)
+        scale = np.array([shape[1] - 1, shape[0] - 1], dtype=np.float64)
+        polygons = [np.round(np.asarray(polygon) * scale).astype(np.int32)
+                    for polygon in self._roi]
+        cv2.fillPoly(mask, polygons, 1)
+        return mask.astype(bool)
@@ -0,0 +1,331 @@
+"""
+Multi-camera stream supervisor for the computer vision system.
+
+This module reads several camera streams at once, each one on its own frame grabber, and
+schedules the inference of their frames fairly on a single set of loaded models, publishing
+the results of each camera on MQTT when they change.
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from vision.components.comm.device_state import DeviceStateCache
+from vision.components.comm.mqtt_publisher import MqttPublisher
+from vision.components.metrics import device_context, stage_timer
+from vision.components.stream.capture import FrameGrabber
+from vision.components.stream.motion import MotionGate
+
+
+@dataclass
+class Camera:
+    """
+    Camera read by the supervisor.
+
+    Attributes:
+        url (str): URL of the camera stream.
+        dev_id (str): Identifier of the device, used to track its published state.
+        device (str): Name of the device in the published messages.
+        space (str): Space where the camera is installed.
+        product_key (str): Product key of the device in the published messages.
+        fps (float): Maximum number of frames per second processed for this camera.
+    """
+
+    url: str
+    dev_id: str
+    device: str
+    space: str
+    product_key: str = ''
+    fps: float = 1.0
+
+    @classmethod
+    def from_config(cls, entry: dict[str, Any]) -> 'Camera':
+        """
+        Build a camera from an entry of the CAMERAS section of the configuration.
+
+        Args:
+            entry (dict): Camera settings with the keys url, devId, space and, optionally,
+                          device, productKey and fps.
+
+        Returns:
+            Camera: The configured camera.
+
+        Raises:
+            ValueError: If a required key is missing or the fps budget is not positive.
+        """
+        try:
+            camera = cls(url=entry['url'], dev_id=str(entry['devId']),
+                         device=entry.get('device', str(entry['devId'])),
+                         space=entry['space'], product_key=entry.get('productKey', ''),
+                         fps=float(entry.get('fps', 1.0)))
+        except KeyError as exc:
+            raise ValueError(f"Câmera sem o campo obrigatório {exc}: {entry}") from exc
+        if camera.fps <= 0:
+            raise ValueError(f"Orçamento de fps inválido para a câmera {camera.dev_id}")
+        return camera
+
+    def request(self) -> dict[str, Any]:
+        """
+        Build the request of a frame of this camera, in the format of the MQTT requests.
+
+        Returns:
+            dict: The request used to build the published message.
+        """
+        return {
+            "device": self.device,
+            "devId": self.dev_id,
+            "productKey": self.product_key,
+            "space": self.space,
+            "message": {"status": [{"code": "stream", "value": self.url}]},
+            "sensorType": "camera",
+            "timeStamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class _CameraSlot:  # pylint: disable=too-few-public-methods
+    """Runtime state of a camera inside the supervisor."""
+
+    def __init__(self, camera: Camera, grabber: FrameGrabber,
+                 motion_gate: Optional[MotionGate]) -> None:
+        self.camera = camera
+        self.grabber = grabber
+        self.motion_gate = motion_gate
+        self.next_due = 0.0
+        self.busy = False
+        self.processed = 0
+        self.skipped = 0
+
+
+class StreamSupervisor:
+    """
+    Supervisor of the streams of several cameras sharing the same models.
+
+    Each camera is read by a FrameGrabber that reconnects with backoff when the stream drops.
+    Inference workers take the latest frame of the cameras in round-robin order, skipping
+    cameras whose fps budget is spent, so a busy or high-resolution camera cannot starve the
+    others. Frames without motion (when a motion gate is configured) do not spend the budget.
+
+    Attributes:
+        image_processing: Shared processor with the `process` and `build_message` methods
+                          of ImageProcessing.
+        publisher (MqttPublisher): Persistent connection to the MQTT broker.
+        topic (str): MQTT topic of the published messages.
+        states (DeviceStateCache): Last published state of each camera.
+        workers (int): Number of inference threads.
+
+    Methods:
+        start() -> None: Start the frame grabbers and the inference workers.
+        stop() -> None: Stop the inference workers and the frame grabbers.
+        run() -> None: Start and supervise the cameras until interrupted.
+        stats() -> dict: Counters of each camera, by device identifier.
+    """
+
+    IDLE_WAIT = 0.05
+
+    image_processing: Any
+    """Shared processor with the `process` and `build_message` methods of ImageProcessing."""
+
+    publisher: MqttPublisher
+    """Persistent connection to the MQTT broker."""
+
+    topic: str
+    """MQTT topic of the published messages."""
+
+    states: DeviceStateCache
+    """Last published state of each camera."""
+
+    workers: int
+    """Number of inference threads."""
+
+    def __init__(self, cameras: list[Camera], image_processing: Any, publisher: MqttPublisher,
+                 topic: str, workers: int = 1,
+                 grabber_factory: Callable[[str], FrameGrabber] =
+                 lambda url: FrameGrabber(url, reconnect=True),
+                 motion_gate_factory: Optional[Callable[[], MotionGate]] = None,
+                 states: Optional[DeviceStateCache] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the StreamSupervisor.
+
+        Args:
+            cameras (list): Cameras to be read.
+            image_processing: Shared processor with the `process` and `build_message` methods
+                              of ImageProcessing.
+            publisher (MqttPublisher): Persistent connection to the MQTT broker.
+            topic (str): MQTT topic of the published messages.
+            workers (int): Number of inference threads. The models are shared and each one
+                           runs one frame at a time, so more than one worker only overlaps
+                           the different models of different frames.
+            grabber_factory (Callable): Function creating the frame grabber of a stream URL.
+            motion_gate_factory (Callable): Function creating the motion gate of a camera,
+                                            or None to process every frame.
+            states (DeviceStateCache): Last published state of each camera.
+            clock (Callable): Function returning the current time in seconds.
+        """
+        self.image_processing = image_processing
+        self.publisher = publisher
+        self.topic = topic
+        self.states = states or DeviceStateCache()
+        self.workers = workers
+        self._clock = clock
+        self._slots = [_CameraSlot(camera, grabber_factory(camera.url),
+                                   None if motion_gate_factory is None else motion_gate_factory())
+                       for camera in cameras]
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the frame grabbers and the inference workers."""
+        self._stopped.clear()
+        for slot in self._slots:
+            slot.grabber.start()
+        self._threads = [threading.Thread(target=self._work, name=f'stream-worker-{i}',
+                                          daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop the inference workers and the frame grabbers."""
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join()
+        for slot in self._slots:
+            slot.grabber.stop()
+
+    def run(self) -> None:
+        """Start and supervise the cameras until interrupted with Ctrl+C."""
+        self.start()
+        try:
+            while not self._stopped.wait(60):
+                for dev_id, counters in self.stats().items():
+                    print(f"Câmera {dev_id}: {counters}")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get the counters of each camera.
+
+        Returns:
+            dict: Processed, skipped (without motion), dropped frames and reconnections,
+                  by device identifier.
+        """
+        return {slot.camera.dev_id: {'processed': slot.processed, 'skipped': slot.skipped,
+                                     'dropped': slot.grabber.dropped,
+                                     'reconnects': slot.grabber.reconnects}
+                for slot in self._slots}
+
+    def next_frame(self) -> Optional[tuple[_CameraSlot, np.ndarray]]:
+        """
+        Take the next frame to be processed, in round-robin order of the cameras.
+
+        A camera is eligible when it is not being processed by another worker, its fps
+        budget allows another frame and it has a frame newer than the last one taken.
+        The selected camera is marked busy until `done` is called.
+
+        The motion gate runs outside the lock, while its camera is marked busy, so the
+        other workers keep taking the frames of the other cameras meanwhile.
+
+        Returns:
+            tuple: The camera slot and its frame, or None if no camera is eligible.
+        """
+        now = self._clock()
+        tried: set[int] = set()
+        while True:
+            with self._lock:
+                taken = self._take(now, tried)
+            if taken is None:
+                return None
+
+            position, slot, frame = taken
+            moved = slot.motion_gate is None or slot.motion_gate(frame)
+            with self._lock:
+                if moved:
+                    slot.next_due = now + 1 / slot.camera.fps
+                    self._cursor = position + 1
+                    return slot, frame
+                slot.busy = False
+                slot.skipped += 1
+
+    def _take(self, now: float,
+              tried: set[int]) -> Optional[tuple[int, _CameraSlot, np.ndarray]]:
+        """
+        Mark busy the next eligible camera not tried yet and read its frame.
+
+        Must be called holding the lock.
+
+        Args:
+            now (float): Current time of the supervisor clock.
+            tried (set): Positions of the cameras already tried, updated in place.
+
+        Returns:
+            tuple: The position of the camera, its slot and its frame, or None if no camera
+                   is eligible.
+        """
+        for offset in range(len(self._slots)):
+            position = (self._cursor + offset) % len(self._slots)
+            slot = self._slots[position]
+            if position in tried or slot.busy or slot.next_due > now:
+                continue
+
+            tried.add(position)
+            frame = slot.grabber.read(timeout=0)
+            if frame is None:
+                continue
+
+            slot.busy = True
+            return position, slot, frame
+
+        return None
+
+    def done(self, slot: _CameraSlot) -> None:
+        """
+        Release a camera taken by `next_frame`.
+
+        Args:
+            slot (_CameraSlot): The camera slot whose frame was processed.
+        """
+        with self._lock:
+            slot.busy = False
+            slot.processed += 1
+
+    def process(self, slot: _CameraSlot, frame: np.ndarray) -> None:
+        """
+        Process a frame of a camera and publish the results if its state changed.
+
+        Args:
+            slot (_CameraSlot): The camera slot of the frame.
+            frame (np.ndarray): The frame to be processed.
+        """
+        camera = slot.camera
+        state = self.image_processing.process(frame, camera.dev_id)
+        if self.states.changed(camera.dev_id, state):
+            message = self.image_processing.build_message(camera.request(), state)
+            with device_context(camera.dev_id), stage_timer('publish'):
+                published = self.publisher.publish(self.topic, json.dumps(message))
+            if not published:
+                print(f"Mensagem da câmera {camera.dev_id} descartada: broker MQTT indisponível")
+
+    def _work(self) -> None:
+        """Process the frames of the cameras until the supervisor is stopped."""
+        while not self._stopped.is_set():
+            taken = self.next_frame()
+            if taken is None:
+                self._stopped.wait(self.IDLE_WAIT)
+                continue
+
+            slot, frame = taken
+            try:
+                self.process(slot, frame)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Erro ao processar o quadro da câmera {slot.camera.dev_id}: {e}")
+            finally:
+                self.done(slot)
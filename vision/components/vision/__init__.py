@@ -1,5 +1,25 @@
 """This module receives camera data sent over an MQTT topic,
-processes the images, and returns the analyzed results in JSON format."""
-from .person_detection import PersonDetector
-from .weapon_detection import WeaponDetector
-from .face_recognition import FaceRecognition
+processes the images, and returns the analyzed results in JSON format.
+
+The detectors are imported on first access, so importing the package does not load
+ultralytics, DeepFace, RetinaFace or their deep learning frameworks.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .person_detection import PersonDetector
+    from .weapon_detection import WeaponDetector
+    from .face_recognition import FaceRecognition
+
+_EXPORTS = {'PersonDetector': 'person_detection',
+            'WeaponDetector': 'weapon_detection',
+            'FaceRecognition': 'face_recognition'}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
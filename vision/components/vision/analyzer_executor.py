@@ -0,0 +1,129 @@
+"""
+Analyzer execution module for the computer vision system.
+
+This module runs the independent analyzers of an image (people count, face recognition and
+weapon alert) either one after another or concurrently on a thread pool.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+Analyzer = Callable[[], dict[str, Any]]
+"""Function that analyzes an image and returns part of the detection results."""
+
+
+class AnalyzerExecutor:
+    """
+    Execution engine for the analyzers of ImageProcessing.
+
+    In concurrent mode every analyzer of an image is submitted to a thread pool at the same
+    time, so the image latency is the slowest analyzer instead of the sum of all of them.
+    The torch and TensorFlow kernels release the GIL, so the analyzers run in parallel.
+    Each analyzer runs in a copy of the caller context, so context variables (such as the
+    device labelling the stage metrics) are seen by the pool threads.
+
+    Attributes:
+        concurrent (bool): Whether analyzers run on the thread pool or sequentially.
+        timeouts (dict): Maximum time in seconds to wait for each analyzer, by name.
+
+    Methods:
+        run(analyzers: dict) -> tuple: Run the analyzers, merge their results and report
+            the analyzers that failed.
+        shutdown() -> None: Release the thread pool.
+    """
+
+    concurrent: bool
+    """Whether analyzers run on the thread pool or sequentially."""
+
+    timeouts: dict[str, float]
+    """Maximum time in seconds to wait for each analyzer, by name."""
+
+    def __init__(self, concurrent: bool = True, max_workers: int = 3,
+                 timeouts: Optional[dict[str, float]] = None) -> None:
+        """
+        Initialize the AnalyzerExecutor.
+
+        Args:
+            concurrent (bool): Whether analyzers run on a thread pool or sequentially.
+            max_workers (int): Number of threads of the pool.
+            timeouts (dict): Maximum time in seconds to wait for each analyzer, by name.
+                             Analyzers without a timeout are waited for indefinitely.
+        """
+        self.concurrent = concurrent
+        self.timeouts = timeouts or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='analyzer') if concurrent else None
+        self._stragglers: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, analyzers: dict[str, Analyzer],
+            on_skip: Optional[Callable[[str], None]] = None) -> tuple[dict[str, Any], set[str]]:
+        """
+        Run the analyzers and merge their results.
+
+        An analyzer that raises an exception or exceeds its timeout contributes no results
+        and is reported as failed, so the caller can tell a missing result from a negative
+        one. A timed out analyzer keeps running in its thread until it finishes, since
+        threads cannot be interrupted; until then, new runs of the same analyzer are not
+        submitted (and are reported as failed), so stuck analyzers do not pile up on the pool.
+
+        Args:
+            analyzers (dict): Analyzers to be run, by name.
+            on_skip (Callable): Function called with the name of each analyzer that is not
+                                submitted because its previous run is still busy, so the
+                                caller can release anything waiting for it.
+
+        Returns:
+            tuple: The merged results of the analyzers that finished in time, and the names
+                   of the analyzers that failed, timed out or were not submitted.
+        """
+        results: dict[str, Any] = {}
+        failed: set[str] = set()
+
+        if self._pool is None:
+            for name, analyzer in analyzers.items():
+                try:
+                    results.update(analyzer())
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    print(f"Erro no analisador {name}: {e}")
+                    failed.add(name)
+            return results, failed
+
+        start = time.monotonic()
+        futures: dict[str, Future] = {}
+        for name, analyzer in analyzers.items():
+            with self._lock:
+                straggler = self._stragglers.get(name)
+                busy = straggler is not None and not straggler.done()
+                if not busy:
+                    self._stragglers.pop(name, None)
+            if busy:
+                print(f"Analisador {name} ignorado: a execução anterior ainda não terminou")
+                failed.add(name)
+                if on_skip is not None:
+                    on_skip(name)
+                continue
+            futures[name] = self._pool.submit(contextvars.copy_context().run, analyzer)
+
+        for name, future in futures.items():
+            timeout = self.timeouts.get(name)
+            remaining = None if timeout is None else max(0.0, start + timeout - time.monotonic())
+            try:
+                results.update(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                print(f"Analisador {name} excedeu o tempo limite de {timeout} segundos")
+                failed.add(name)
+                with self._lock:
+                    self._stragglers[name] = future
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Erro no analisador {name}: {e}")
+                failed.add(name)
+
+        return results, failed
+
+    def shutdown(self) -> None:
+        """Release the thread pool without waiting for running analyzers."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,164 @@
+"""
+Batched inference module for the computer vision system.
+
+This module groups frames that can share a single model call and provides a micro-batching
+queue that collects single-frame requests for a short time and runs them as one batch.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def group_frames(frames: list[np.ndarray],
+                 key: Optional[Callable[[np.ndarray], Hashable]] = None) -> list[list[int]]:
+    """
+    Group the frames that are letterboxed to the same input size.
+
+    YOLO letterboxes every frame of a batch to a common size, which is only tight (and
+    identical to a single-frame call) when all the frames share the same shape.
+
+    Args:
+        frames (list): Frames to be grouped.
+        key (Callable): Function computing the grouping key of a frame. Defaults to its shape.
+
+    Returns:
+        list: Groups of frame positions, in order of first appearance.
+    """
+    groups: dict[Hashable, list[int]] = {}
+    for position, frame in enumerate(frames):
+        groups.setdefault(frame.shape if key is None else key(frame), []).append(position)
+    return list(groups.values())
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Queue that collects single requests and runs them as batches.
+
+    Requests are collected until `max_batch_size` are waiting or `max_wait_ms` milliseconds
+    passed since the first one arrived, then a single call to the batch function serves all
+    of them. This amortizes the per-call overhead when several cameras publish at once.
+
+    The batch function runs on the batching thread, without the context variables of the
+    callers (such as the device label of the stage metrics), so it must set them itself.
+
+    Attributes:
+        batch_fn (Callable): Function mapping a list of items to the list of their results.
+        max_batch_size (int): Maximum number of items of a batch.
+        max_wait_ms (float): Maximum time, in milliseconds, the first item of a batch waits.
+
+    Methods:
+        submit(item) -> Future: Queue an item and get a future of its result.
+        __call__(item): Queue an item and wait for its result.
+        close() -> None: Stop the batching thread.
+    """
+
+    batch_fn: Callable[[list[T]], list[R]]
+    """Function mapping a list of items to the list of their results."""
+
+    max_batch_size: int
+    """Maximum number of items of a batch."""
+
+    max_wait_ms: float
+    """Maximum time, in milliseconds, the first item of a batch waits."""
+
+    def __init__(self, batch_fn: Callable[[list[T]], list[R]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10) -> None:
+        """
+        Initialize the MicroBatcher and start its batching thread.
+
+        Args:
+            batch_fn (Callable): Function mapping a list of items to the list of their results.
+            max_batch_size (int): Maximum number of items of a batch.
+            max_wait_ms (float): Maximum time, in milliseconds, the first item of a batch waits.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> Future:
+        """
+        Queue an item to be processed in the next batch.
+
+        Args:
+            item: The item to be processed.
+
+        Returns:
+            Future: The future result of the item.
+        """
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: T) -> R:
+        """
+        Queue an item and wait for its result.
+
+        Args:
+            item: The item to be processed.
+
+        Returns:
+            The result of the item.
+        """
+        return self.submit(item).result()
+
+    def close(self) -> None:
+        """Stop the batching thread after the queued items are processed."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Collect batches from the queue and process them until closed."""
+        closed = False
+        while not closed:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    closed = True
+                    break
+                batch.append(request)
+
+            self._process(batch)
+
+    def _process(self, batch: list[tuple[T, Future]]) -> None:
+        """
+        Run the batch function and resolve the futures of the batch.
+
+        Args:
+            batch (list): Items and futures of the batch.
+        """
+        pending = [(item, future) for item, future in batch
+                   if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+
+        try:
+            results = self.batch_fn([item for item, _ in pending])
+            if len(results) != len(pending):
+                raise ValueError(f"O lote de {len(pending)} itens retornou "
+                                 f"{len(results)} resultados")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
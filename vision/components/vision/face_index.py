@@ -0,0 +1,159 @@
+"""
+Face embedding index module for the computer vision system.
+
+This module keeps the embeddings of the known face crops in memory so that every face
+found in a frame can be matched against the whole database with a single matrix product.
+"""
+from typing import Optional
+
+import numpy as np
+
+
+class FaceIndex:
+    """
+    In-memory index of known face embeddings.
+
+    Each row of the matrix holds the L2-normalised embedding of one identity crop, so the
+    cosine distance between a query face and every known crop is obtained with one matrix
+    multiplication.
+
+    Attributes:
+        threshold (float): Maximum cosine distance for a match to be accepted.
+        keys (list): Identifier (crop file name) of each row of the matrix.
+        names (list): Identity name of each row of the matrix.
+        matrix (np.ndarray): Matrix of L2-normalised float32 embeddings, one row per crop.
+
+    Methods:
+        add(key: str, embedding: np.ndarray) -> None: Add or replace the embedding of a crop.
+        remove(key: str) -> None: Remove the embedding of a crop from the index.
+        search(embeddings: np.ndarray) -> tuple: Match a batch of face embeddings and get
+                                                 their distances.
+        match(embeddings: np.ndarray) -> list: Match a batch of face embeddings.
+    """
+
+    threshold: float
+    """Maximum cosine distance for a match to be accepted."""
+
+    keys: list[str]
+    """Identifier (crop file name) of each row of the matrix."""
+
+    names: list[str]
+    """Identity name of each row of the matrix."""
+
+    matrix: np.ndarray
+    """Matrix of L2-normalised float32 embeddings, one row per crop."""
+
+    def __init__(self, threshold: float) -> None:
+        """
+        Initialize an empty FaceIndex.
+
+        Args:
+            threshold (float): Maximum cosine distance for a match to be accepted.
+        """
+        self.threshold = threshold
+        self.keys = []
+        self.names = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def identity(key: str) -> str:
+        """
+        Get the identity name from a crop file name (e.g. 'mayki.2.jpg' -> 'mayki').
+
+        Args:
+            key (str): Crop file name.
+
+        Returns:
+            str: The identity name.
+        """
+        return key.split(sep='/')[-1].split(sep='.')[0]
+
+    @staticmethod
+    def normalize(embeddings: np.ndarray) -> np.ndarray:
+        """
+        L2-normalise embeddings row by row.
+
+        Args:
+            embeddings (np.ndarray): Array of shape (n, d) or (d,).
+
+        Returns:
+            np.ndarray: Float32 array of shape (n, d) with unit-norm rows.
+        """
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, np.finfo(np.float32).eps)
+
+    def add(self, key: str, embedding: np.ndarray) -> None:
+        """
+        Add the embedding of a crop to the index, replacing it if the key already exists.
+
+        Args:
+            key (str): Crop file name.
+            embedding (np.ndarray): Face embedding of the crop.
+        """
+        row = self.normalize(embedding)
+
+        if key in self.keys:
+            self.matrix[self.keys.index(key)] = row[0]
+            return
+
+        self.matrix = row if len(self.keys) == 0 else np.vstack([self.matrix, row])
+        self.keys.append(key)
+        self.names.append(self.identity(key))
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the embedding of a crop from the index. Unknown keys are ignored.
+
+        Args:
+            key (str): Crop file name.
+        """
+        if key not in self.keys:
+            return
+
+        position = self.keys.index(key)
+        self.matrix = np.delete(self.matrix, position, axis=0)
+        del self.keys[position]
+        del self.names[position]
+
+    def search(self, embeddings: np.ndarray) -> tuple[list[Optional[str]], np.ndarray]:
+        """
+        Match a batch of face embeddings against the index and get their match distances.
+
+        Args:
+            embeddings (np.ndarray): Array of shape (n, d) with one embedding per face.
+
+        Returns:
+            tuple: For each face, the name of the closest known identity (None if the index is
+                   empty or the closest distance is above the threshold), and the array of the
+                   closest distances (1.0 when the index is empty).
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.size == 0:
+            return [], np.empty(0, dtype=np.float32)
+        if len(self.keys) == 0:
+            n_faces = len(np.atleast_2d(embeddings))
+            return [None] * n_faces, np.ones(n_faces, dtype=np.float32)
+
+        similarities = self.normalize(embeddings) @ self.matrix.T
+        best = np.argmax(similarities, axis=1)
+        distances = 1.0 - similarities[np.arange(len(best)), best]
+
+        return [self.names[row] if distance <= self.threshold else None
+                for row, distance in zip(best, distances)], distances
+
+    def match(self, embeddings: np.ndarray) -> list[Optional[str]]:
+        """
+        Match a batch of face embeddings against the index.
+
+        Args:
+            embeddings (np.ndarray): Array of shape (n, d) with one embedding per face.
+
+        Returns:
+            list: For each face, the name of the closest known identity, or None if the index
+                  is empty or the closest distance is above the threshold.
+        """
+        return self.search(embeddings)[0]
@@ -0,0 +1,163 @@
+"""
+Face database manifest module for the computer vision system.
+
+This module records, for every reference image, the content hash, modification time,
+face crop and embedding already computed, so the face database can be updated incrementally.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+
+class FaceManifest:
+    """
+    Manifest of the face database persisted next to the face crops.
+
+    Each entry is keyed by the reference image file name and holds its SHA-256 hash,
+    modification time, crop file name and face embedding.
+
+    Attributes:
+        path (str): Path to the manifest file.
+        model_name (str): DeepFace model used to compute the stored embeddings.
+        entries (dict): Manifest entries keyed by reference image file name.
+        outdated (bool): Whether the crops were not extracted by the current VERSION (or
+            there is no manifest), so every reference image must be cropped again.
+
+    Methods:
+        scan(images_path: str) -> tuple: Find new, changed and deleted reference images.
+        update(...) -> None: Record the crop and embedding of a reference image.
+        remove(file: str) -> None: Remove a reference image from the manifest.
+        save() -> None: Persist the manifest to disk.
+    """
+
+    FILE_NAME = 'manifest.json'
+
+    VERSION = 2
+    """Version of the face crop extraction, bumped whenever the crops are made differently."""
+
+    path: str
+    """Path to the manifest file."""
+
+    model_name: str
+    """DeepFace model used to compute the stored embeddings."""
+
+    entries: dict[str, dict[str, Any]]
+    """Manifest entries keyed by reference image file name."""
+
+    outdated: bool
+    """Whether every reference image must be cropped again."""
+
+    def __init__(self, crops_path: str, model_name: str) -> None:
+        """
+        Load the manifest stored in `crops_path`, if any.
+
+        Embeddings computed with a different model are discarded, and every crop of a
+        manifest of another version is outdated.
+
+        Args:
+            crops_path (str): Path to the directory where cropped face images are stored.
+            model_name (str): DeepFace model used to compute face embeddings.
+        """
+        self.path = os.path.join(crops_path, self.FILE_NAME)
+        self.model_name = model_name
+        self.entries = {}
+        self.outdated = True
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get('images', {})
+            self.outdated = data.get('version') != self.VERSION
+            if self.outdated or data.get('model') != model_name:
+                for entry in self.entries.values():
+                    entry['embedding'] = None
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """
+        Compute the SHA-256 hash of a file content.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def scan(self, images_path: str,
+             extensions: tuple[str, ...]) -> tuple[dict[str, tuple[str, float]], list[str]]:
+        """
+        Compare the reference images against the manifest.
+
+        Files whose modification time did not change are not hashed. Files that were
+        touched but kept the same content only have their modification time refreshed.
+        When the manifest is outdated, every image is pending.
+
+        Args:
+            images_path (str): Path to the directory containing the reference images.
+            extensions (tuple): Accepted image file extensions.
+
+        Returns:
+            tuple: A dictionary mapping each new or changed image to its (hash, mtime),
+                   and the list of images that were deleted.
+        """
+        pending = {}
+        files = [file for file in os.listdir(images_path) if file.lower().endswith(extensions)]
+
+        for file in files:
+            mtime = os.path.getmtime(os.path.join(images_path, file))
+            entry = self.entries.get(file)
+            if entry is not None and entry['mtime'] == mtime and not self.outdated:
+                continue
+
+            digest = self.file_hash(os.path.join(images_path, file))
+            if entry is not None and entry['hash'] == digest and not self.outdated:
+                entry['mtime'] = mtime
+            else:
+                pending[file] = (digest, mtime)
+
+        deleted = [file for file in self.entries if file not in files]
+
+        return pending, deleted
+
+    def update(self, file: str, digest: str, mtime: float, crop: str,
+               embedding: Optional[np.ndarray]) -> None:
+        """
+        Record the crop and embedding of a reference image.
+
+        Args:
+            file (str): Reference image file name.
+            digest (str): SHA-256 hash of the reference image.
+            mtime (float): Modification time of the reference image.
+            crop (str): Crop file name.
+            embedding (np.ndarray): Face embedding of the crop, or None if not computed.
+        """
+        self.entries[file] = {'hash': digest, 'mtime': mtime, 'crop': crop,
+                              'embedding': None if embedding is None
+                              else np.asarray(embedding, dtype=float).tolist()}
+
+    def remove(self, file: str) -> None:
+        """
+        Remove a reference image from the manifest.
+
+        Args:
+            file (str): Reference image file name.
+        """
+        self.entries.pop(file, None)
+
+    def save(self) -> None:
+        """Persist the manifest to disk, replacing the previous file atomically."""
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump({'version': self.VERSION, 'model': self.model_name,
+                       'images': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.outdated = False
@@ -1,15 +1,32 @@
 """
 Facial recognition module for the computer vision system.
 
-This module uses the DeepFace and RetinaFace libraries to recognize faces in images.
+This module uses the DeepFace and RetinaFace libraries to recognize faces in images. They are
+imported on first use, since importing them loads TensorFlow.
 """
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 
 import numpy as np
 import cv2
 
-from deepface import DeepFace
-from retinaface import RetinaFace
+from vision.components.metrics import stage_timer
+from vision.components.vision.face_index import FaceIndex
+from vision.components.vision.face_manifest import FaceManifest
+from vision.components.vision.face_tracker import FaceTracker
+from vision.components.vision.model_registry import REGISTRY, ModelRegistry
+from vision.components.vision.person_roi import upper_body_rois
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+_DETECTION_LOCK = threading.Lock()
+"""Serializes the calls of the RetinaFace model, shared by the whole process."""
+
+_REPRESENTATION_LOCK = threading.Lock()
+"""Serializes the calls of the DeepFace models, shared by the whole process."""
 
 
 class FaceRecognition:
@@ -17,14 +34,30 @@ class FaceRecognition:
     Face recognition system using RetinaFace for face detection and DeepFace for face recognition.
 
     This class updates a database of known faces and performs face recognition on input images.
+    The database is updated and its embedding index built on first use, and shared through
+    the model registry with every FaceRecognition of the same database.
 
     Attributes:
         images_path (str): Path to the reference images.
         crops_path (str): Path to the face crops.
+        model_name (str): DeepFace model used to compute face embeddings.
+        threshold (float): Maximum cosine distance for a face to be recognized.
+        index (FaceIndex): In-memory index with the embeddings of the face crops.
+        workers (int): Number of processes used to crop new reference images.
+        min_face_size (int): Minimum side, in pixels of the frame, of a recognized face.
+        roi_min_size (int): Minimum longest side, in pixels, of the person regions searched
+                            for faces; smaller regions are upscaled.
+        tracker (FaceTracker): Tracker carrying the identities of the faces across the frames
+                               of each device, or None to recognize every face of every frame.
 
     Methods:
-        __call__(img: np.ndarray) -> list: Perform facial recognition on the provided image.
-        update_db() -> None: Update the face database.
+        __call__(img: np.ndarray, person_boxes: np.ndarray, device_id: str) -> list: Perform
+            facial recognition on the provided image, optionally only inside the person boxes.
+        detect(img: np.ndarray, person_boxes: np.ndarray) -> tuple: Detect and align faces.
+        recognize(faces: list) -> tuple: Match face crops against the known faces.
+        update_db() -> None: Incrementally update the face database and the embedding index.
+        warm_up(frame: np.ndarray) -> None: Build the index and run both models once.
+        close() -> None: Release the embedding index.
     """
 
     images_path: str
@@ -33,64 +66,422 @@ class FaceRecognition:
     crops_path: str
     """Path to the directory where cropped face images are stored."""
 
-    def __init__(self, images_path: str, crops_path: str) -> None:
+    model_name: str
+    """DeepFace model used to compute face embeddings."""
+
+    threshold: float
+    """Maximum cosine distance for a face to be recognized."""
+
+    workers: Optional[int]
+    """Number of processes used to crop new reference images (None for one per CPU)."""
+
+    min_face_size: int
+    """Minimum side, in pixels of the frame, of a recognized face."""
+
+    roi_min_size: int
+    """Minimum longest side, in pixels, of the person regions searched for faces."""
+
+    tracker: Optional[FaceTracker]
+    """Tracker carrying the identities of the faces across the frames of each device."""
+
+    def __init__(self, images_path: str, crops_path: str,
+                 model_name: str = 'VGG-Face', threshold: float = 0.68,
+                 workers: Optional[int] = None, min_face_size: int = 0,
+                 roi_min_size: int = 320, tracker: Optional[FaceTracker] = None,
+                 registry: ModelRegistry = REGISTRY) -> None:
         """
         Initialize the FaceRecognition with paths to images and face crops.
 
         Args:
             images_path (str): Path to the directory containing images for face database.
             crops_path (str): Path to the directory where cropped face images are stored.
+            model_name (str): DeepFace model used to compute face embeddings.
+            threshold (float): Maximum cosine distance for a face to be recognized.
+            workers (int): Number of processes used to crop new reference images
+                           (None for one per CPU).
+            min_face_size (int): Minimum side, in pixels of the frame, of a recognized face.
+                                 Smaller faces are ignored (0 keeps every face).
+            roi_min_size (int): Minimum longest side, in pixels, of the person regions
+                                searched for faces; smaller regions are upscaled.
+            tracker (FaceTracker): Tracker carrying the identities of the faces across the
+                                   frames of each device, or None to recognize every face.
+            registry (ModelRegistry): Registry sharing the embedding index.
         """
         self.images_path = images_path
         self.crops_path = crops_path
-        self.update_db()
+        self.model_name = model_name
+        self.threshold = threshold
+        self.workers = workers
+        self.min_face_size = min_face_size
+        self.roi_min_size = roi_min_size
+        self.tracker = tracker
+        self._index = registry.acquire(
+            ('faces', os.path.abspath(images_path), os.path.abspath(crops_path), model_name,
+             threshold),
+            self._load_index)
+
+    @property
+    def index(self) -> FaceIndex:
+        """In-memory index with the embeddings of the face crops, built on first use."""
+        return self._index.get()
 
-    def __call__(self, img: np.ndarray) -> list:
+    def warm_up(self, frame: np.ndarray) -> None:
+        """
+        Build the embedding index and run both models once.
+
+        The embedding model is run even when every embedding of the index was cached in
+        the manifest, so the first real face does not pay for loading it.
+
+        Args:
+            frame (np.ndarray): A frame with the size of the frames to be processed.
+        """
+        _ = self.index
+        self._detect(frame)
+        self.represent(frame)
+
+    def close(self) -> None:
+        """Release the embedding index, which is dropped when no other instance uses it."""
+        self._index.release()
+
+    def __call__(self, img: np.ndarray, person_boxes: Optional[np.ndarray] = None,
+                 device_id: Optional[str] = None) -> list:
         """
         Perform facial recognition on the provided image.
 
+        When the person boxes are given, faces are only searched in the upper-body region of
+        each person (upscaled if small), and nothing is searched if there is no person.
+        When the tracker is enabled and the device is known, faces already recognized in the
+        previous frames of the device keep their identity without being recognized again.
+
         Args:
             img (np.ndarray): Image in which faces will be recognized.
+            person_boxes (np.ndarray): Boxes of the detected people as an (n, 4) array of
+                                       [x1, y1, x2, y2] pixels, or None to search the
+                                       whole image.
+            device_id (str): Identifier of the device that captured the image.
 
         Returns:
             list: A sorted list of names of recognized individuals.
+
+        Raises:
+            Exception: Errors of the face models are propagated, so the analyzer executor
+                       reports the face analyzer as failed instead of an empty result.
+        """
+        boxes, faces = self.detect(img, person_boxes)
+
+        if self.tracker is not None and device_id is not None:
+            found = self.tracker.update(
+                device_id, boxes,
+                lambda positions: self.recognize([faces[i] for i in positions]))
+        else:
+            found = self.recognize(faces)[0]
+
+        return sorted(name for name in found if name is not None)
+
+    def detect(self, img: np.ndarray,
+               person_boxes: Optional[np.ndarray] = None) -> tuple[np.ndarray, list]:
         """
-        names = []
-        try:
-            faces = RetinaFace.extract_faces(img)
+        Detect and align the faces of an image, dropping the ones too small to be recognized.
 
-            for face in faces:
-                face = face[:, :, ::-1]  # Convert BGR to RGB
+        Args:
+            img (np.ndarray): Image in which faces will be detected.
+            person_boxes (np.ndarray): Boxes of the detected people as an (n, 4) array of
+                                       [x1, y1, x2, y2] pixels, or None to search the
+                                       whole image.
 
-                result = DeepFace.find(face, self.crops_path,
-                                       enforce_detection=False,
-                                       silent=True,
-                                       align=False)[0]
-                if not result.empty:
-                    name = result.iloc[0]['identity'].split(sep='/')[-1].split(sep='.')[0]
-                    names.append(name)
-        except:
-            print("Erro aqui!!")
+        Returns:
+            tuple: The face boxes as an (n, 4) array of [x1, y1, x2, y2] pixels of the image,
+                   and the aligned BGR crops of the faces.
+        """
+        with stage_timer('face_detection'):
+            if person_boxes is None:
+                detections = [self._detect(img)]
+            else:
+                detections = [self._roi_detect(img, roi)
+                              for roi in upper_body_rois(person_boxes, img.shape)]
+
+        boxes = [box for roi_boxes, _ in detections for box in roi_boxes]
+        faces = [face for _, roi_faces in detections for face in roi_faces]
+        return np.array(boxes, dtype=np.float32).reshape(-1, 4), faces
+
+    def recognize(self, faces: list[np.ndarray]) -> tuple[list[Optional[str]], np.ndarray]:
+        """
+        Match face crops against the known faces.
+
+        Args:
+            faces (list): Aligned BGR crops of single faces.
+
+        Returns:
+            tuple: For each face, the name of its identity (None if unknown), and the array
+                   of the match distances.
+        """
+        if not faces:
+            return [], np.empty(0, dtype=np.float32)
+        with stage_timer('face_matching'):
+            embeddings = np.array([self.represent(face) for face in faces])
+            with self._index.locked() as index:
+                return index.search(embeddings)
+
+    def _detect(self, img: np.ndarray, scale: float = 1.0,
+                offset: tuple[int, int] = (0, 0)) -> tuple[list, list]:
+        """
+        Detect and align the faces of an image that may be an upscaled region of the frame.
+
+        Args:
+            img (np.ndarray): Image in which faces will be detected.
+            scale (float): Factor by which the image was upscaled from the frame.
+            offset (tuple): Position (x, y) of the image in the frame.
+
+        Returns:
+            tuple: The face boxes in frame pixels and the aligned BGR crops of the faces at
+                   least `min_face_size` pixels wide and high in the frame.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from retinaface import RetinaFace
+
+        with _DETECTION_LOCK:
+            detections = RetinaFace.detect_faces(img)
+        if not isinstance(detections, dict):
+            return [], []
+
+        boxes, faces = [], []
+        for detection in detections.values():
+            x1, y1, x2, y2 = detection['facial_area']
+            if min(x2 - x1, y2 - y1) < self.min_face_size * scale:
+                continue
+            face = align_face(img, detection['facial_area'], detection['landmarks'])
+            if face.size == 0:
+                continue
+            boxes.append([x1 / scale + offset[0], y1 / scale + offset[1],
+                          x2 / scale + offset[0], y2 / scale + offset[1]])
+            faces.append(face)
+
+        return boxes, faces
+
+    def _roi_detect(self, img: np.ndarray, roi: tuple[int, int, int, int]) -> tuple[list, list]:
+        """
+        Detect the faces inside a region of the image, upscaling small regions.
+
+        Args:
+            img (np.ndarray): Image in which faces will be detected.
+            roi (tuple): Region as (x1, y1, x2, y2) pixel coordinates.
+
+        Returns:
+            tuple: The face boxes in frame pixels and the aligned BGR crops of the faces.
+        """
+        x1, y1, x2, y2 = roi
+        crop = img[y1:y2, x1:x2]
+        scale = max(1.0, self.roi_min_size / max(crop.shape[:2]))
+        if scale > 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        return self._detect(crop, scale, (x1, y1))
+
+    def represent(self, face: np.ndarray) -> np.ndarray:
+        """
+        Compute the embedding of an already cropped face.
+
+        Args:
+            face (np.ndarray): BGR image of a single face.
+
+        Returns:
+            np.ndarray: The face embedding.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from deepface import DeepFace
 
-        return sorted(names)
+        with _REPRESENTATION_LOCK:
+            result = DeepFace.represent(face, model_name=self.model_name,
+                                        enforce_detection=False,
+                                        detector_backend='skip',
+                                        align=False)
+        return np.asarray(result[0]['embedding'], dtype=np.float32)
 
-    def update_db(self):
+    def update_db(self) -> None:
         """
-        Update the face database by extracting and saving cropped faces.
+        Incrementally update the face database and the embedding index.
 
-        This method reads images from `images_path`, detects faces using RetinaFace, and saves the
-        cropped face images to `crops_path` if they are not already present.
+        This method compares the images in `images_path` against the manifest stored next to
+        the crops, so only new, changed or deleted images are processed. Faces of new and
+        changed images are cropped with RetinaFace in a process pool, and the embedding index
+        is updated in place once every change is known, holding its lock so the concurrent
+        recognitions never search a partially updated index.
 
         Notes:
-            The line cv2.imwrite(os.path.join(self.crops_path, file), crop[:, :, ::-1])
-            saves the cropped face image in BGR format, which is the standard format used by OpenCV.
-             The [:, :, ::-1] operation converts the image from RGB to BGR before saving.
-        """
-        images = os.listdir(self.images_path)
-        crops = os.listdir(self.crops_path)
-
-        for file in images:
-            if file not in crops:
-                img = cv2.imread(os.path.join(self.images_path, file))
-                crop = RetinaFace.extract_faces(img)[0]
-                cv2.imwrite(os.path.join(self.crops_path, file), crop[:, :, ::-1])
+            Every image is cropped again when the manifest is missing or of another version
+            (see FaceManifest.VERSION), since older crops were not aligned like the faces of
+            the frames.
+        """
+        removed, added = self._update_db(list(self.index.keys))
+        with self._index.locked() as index:
+            self._apply(index, removed, added)
+
+    def _load_index(self) -> FaceIndex:
+        """
+        Update the face database and build its embedding index.
+
+        Returns:
+            FaceIndex: The index with the embeddings of every face crop.
+        """
+        index = FaceIndex(self.threshold)
+        self._apply(index, *self._update_db(index.keys))
+        return index
+
+    @staticmethod
+    def _apply(index: FaceIndex, removed: list[str], added: dict[str, np.ndarray]) -> None:
+        """
+        Apply the changes of the face database to an embedding index.
+
+        Args:
+            index (FaceIndex): Index updated in place.
+            removed (list): Keys of the crops removed from the database.
+            added (dict): Embeddings of the crops missing from the index, by key.
+        """
+        for key in removed:
+            index.remove(key)
+        for key, embedding in added.items():
+            index.add(key, embedding)
+
+    def _update_db(self, indexed: list[str]) -> tuple[list[str], dict[str, np.ndarray]]:
+        """
+        Incrementally update the face database, without touching the embedding index.
+
+        Args:
+            indexed (list): Keys of the crops already in the index.
+
+        Returns:
+            tuple: The keys of the crops to be removed from the index, and the embeddings of
+                   the crops to be added to it.
+        """
+        manifest = FaceManifest(self.crops_path, self.model_name)
+        if manifest.outdated and manifest.entries:
+            print(f"Manifesto de faces desatualizado, recortando novamente as imagens de "
+                  f"{self.images_path}")
+        pending, deleted = manifest.scan(self.images_path, IMAGE_EXTENSIONS)
+        removed = [self._remove_crop(file, manifest) for file in deleted]
+
+        crops = set() if manifest.outdated else set(os.listdir(self.crops_path))
+        to_extract = [file for file in pending if file in manifest.entries or file not in crops]
+        extracted = self._extract_crops(to_extract)
+
+        for file, (digest, mtime) in pending.items():
+            if file in to_extract and not extracted[file]:
+                print(f"Nenhuma face encontrada em {file}")
+                if file in manifest.entries:
+                    removed.append(self._remove_crop(file, manifest))
+                continue
+            manifest.update(file, digest, mtime, file, None)
+
+        added = {}
+        for file, entry in manifest.entries.items():
+            if entry['embedding'] is None:
+                crop = cv2.imread(os.path.join(self.crops_path, entry['crop']))
+                if crop is None:
+                    continue
+                entry['embedding'] = self.represent(crop).tolist()
+                added[entry['crop']] = np.asarray(entry['embedding'])
+            elif entry['crop'] not in indexed:
+                added[entry['crop']] = np.asarray(entry['embedding'])
+
+        manifest.save()
+        return removed, added
+
+    def _remove_crop(self, file: str, manifest: FaceManifest) -> str:
+        """
+        Remove the face crop of a reference image from the disk and the manifest.
+
+        Args:
+            file (str): Reference image file name.
+            manifest (FaceManifest): Manifest updated in place.
+
+        Returns:
+            str: The key of the removed crop, to be removed from the index.
+        """
+        crop = manifest.entries[file]['crop']
+        if os.path.exists(os.path.join(self.crops_path, crop)):
+            os.remove(os.path.join(self.crops_path, crop))
+        manifest.remove(file)
+        return crop
+
+    def _extract_crops(self, files: list[str]) -> dict[str, bool]:
+        """
+        Crop the faces of the given reference images, in parallel when there are several.
+
+        Args:
+            files (list): Reference image file names.
+
+        Returns:
+            dict: For each file, whether a face crop was saved.
+        """
+        jobs = [(os.path.join(self.images_path, file), os.path.join(self.crops_path, file))
+                for file in files]
+
+        if len(jobs) <= 1 or self.workers == 1:
+            return {file: extract_crop(*job) for file, job in zip(files, jobs)}
+
+        # Spawned workers, since forking a process that already loaded TensorFlow can hang
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = executor.map(extract_crop, *zip(*jobs))
+            return dict(zip(files, results))
+
+
+def extract_crop(image_path: str, crop_path: str) -> bool:
+    """
+    Detect the most confident face of a reference image and save its crop.
+
+    The crop is made like the crops of the faces recognized in the frames (RetinaFace
+    detection followed by `align_face`), so both embeddings come from the same kind of image.
+    It is saved in BGR format, which is the standard format used by OpenCV.
+
+    Args:
+        image_path (str): Path to the reference image.
+        crop_path (str): Path where the face crop is saved.
+
+    Returns:
+        bool: True if a face was found and its crop saved, False otherwise.
+    """
+    img = cv2.imread(image_path)
+    if img is None:
+        return False
+
+    # pylint: disable-next=import-outside-toplevel
+    from retinaface import RetinaFace
+
+    detections = RetinaFace.detect_faces(img)
+    if not isinstance(detections, dict) or not detections:
+        return False
+
+    detection = max(detections.values(), key=lambda detection: detection['score'])
+    face = align_face(img, detection['facial_area'], detection['landmarks'])
+    if face.size == 0:
+        return False
+
+    return cv2.imwrite(crop_path, face)
+
+
+def align_face(img: np.ndarray, facial_area: list, landmarks: dict) -> np.ndarray:
+    """
+    Crop a face and rotate it so that the eyes are level.
+
+    Args:
+        img (np.ndarray): Image containing the face.
+        facial_area (list): Face box as [x1, y1, x2, y2] pixels, as given by RetinaFace.
+        landmarks (dict): Face landmarks given by RetinaFace, with the 'right_eye' and
+                          'left_eye' points.
+
+    Returns:
+        np.ndarray: The aligned face crop, with the channel order of the image.
+    """
+    x1, y1, x2, y2 = (int(value) for value in facial_area)
+    face = img[max(y1, 0):y2, max(x1, 0):x2]
+    right_eye = np.asarray(landmarks['right_eye'], dtype=np.float64)
+    left_eye = np.asarray(landmarks['left_eye'], dtype=np.float64)
+    dx, dy = left_eye - right_eye
+    if face.size == 0 or dy == 0:
+        return face
+
+    center = (right_eye + left_eye) / 2 - [max(x1, 0), max(y1, 0)]
+    matrix = cv2.getRotationMatrix2D((float(center[0]), float(center[1])),
+                                     float(np.degrees(np.arctan2(dy, dx))), 1.0)
+    return cv2.warpAffine(face, matrix, (face.shape[1], face.shape[0]),
+                          borderMode=cv2.BORDER_REPLICATE)
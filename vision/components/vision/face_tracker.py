@@ -0,0 +1,255 @@
+"""
+Face tracking module for the computer vision system.
+
+This module associates the faces of consecutive frames of each device by the overlap of
+their boxes, so a recognized identity is carried forward and the face embedding is only
+computed again from time to time.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+Recognizer = Callable[[list[int]], tuple[list[Optional[str]], np.ndarray]]
+"""Function recognizing the faces at the given positions, returning their names and distances."""
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute the intersection over union of every pair of boxes.
+
+    Args:
+        a (np.ndarray): Boxes as an (n, 4) array of [x1, y1, x2, y2].
+        b (np.ndarray): Boxes as an (m, 4) array of [x1, y1, x2, y2].
+
+    Returns:
+        np.ndarray: The (n, m) matrix of intersection over union.
+    """
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(1, -1, 4)
+
+    width = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    height = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+
+    return intersection / np.maximum(area_a + area_b - intersection, np.finfo(np.float32).eps)
+
+
+@dataclass
+class FaceTrack:
+    """
+    Face followed across the frames of a device.
+
+    Attributes:
+        box (np.ndarray): Last box of the face as [x1, y1, x2, y2].
+        name (str): Identity recognized for the face, or None if unknown.
+        distance (float): Match distance of the last recognition.
+        age (int): Number of frames since the last recognition.
+        missed (int): Number of consecutive frames in which the face was not found.
+    """
+
+    box: np.ndarray
+    name: Optional[str] = None
+    distance: float = 1.0
+    age: int = 0
+    missed: int = 0
+
+
+class FaceTracker:
+    """
+    Tracker of the faces of each device, carrying recognized identities across frames.
+
+    Faces of a new frame are associated with the tracks of the previous frames of the same
+    device by greedy matching of the box intersection over union. Only new tracks, tracks not
+    recognized for `recognize_every` frames and low-confidence tracks (unknown, or with a match
+    distance above `confident_distance`) every `retry_every` frames are recognized again, so a
+    person standing in front of a camera costs no face embedding in most frames.
+
+    Attributes:
+        iou_threshold (float): Minimum intersection over union to associate a face to a track.
+        recognize_every (int): Number of frames after which a confident track is recognized again.
+        retry_every (int): Number of frames after which a low-confidence track is recognized again.
+        confident_distance (float): Maximum match distance of a confident track.
+        max_missed (int): Number of consecutive frames without a face before its track is dropped.
+        max_devices (int): Maximum number of devices tracked.
+        ttl (float): Time in seconds without frames after which the tracks of a device are dropped.
+
+    Methods:
+        update(device: str, boxes: np.ndarray, recognize: Callable) -> list: Associate the faces
+            of a frame to the tracks of the device and get their names.
+    """
+
+    iou_threshold: float
+    """Minimum intersection over union to associate a face to a track."""
+
+    recognize_every: int
+    """Number of frames after which a confident track is recognized again."""
+
+    retry_every: int
+    """Number of frames after which a low-confidence track is recognized again."""
+
+    confident_distance: float
+    """Maximum match distance of a confident track."""
+
+    max_missed: int
+    """Number of consecutive frames without a face before its track is dropped."""
+
+    max_devices: int
+    """Maximum number of devices tracked."""
+
+    ttl: float
+    """Time in seconds without frames after which the tracks of a device are dropped."""
+
+    def __init__(self, iou_threshold: float = 0.3, recognize_every: int = 15,
+                 retry_every: int = 3, confident_distance: float = 0.5, max_missed: int = 2,
+                 max_devices: int = 1024, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the FaceTracker without tracks.
+
+        Args:
+            iou_threshold (float): Minimum intersection over union to associate a face to a
+                                   track.
+            recognize_every (int): Number of frames after which a confident track is
+                                   recognized again.
+            retry_every (int): Number of frames after which a low-confidence track is
+                               recognized again.
+            confident_distance (float): Maximum match distance of a confident track.
+            max_missed (int): Number of consecutive frames without a face before its track
+                              is dropped.
+            max_devices (int): Maximum number of devices tracked.
+            ttl (float): Time in seconds without frames after which the tracks of a device
+                         are dropped.
+            clock (Callable): Function returning the current time in seconds.
+        """
+        self.iou_threshold = iou_threshold
+        self.recognize_every = recognize_every
+        self.retry_every = retry_every
+        self.confident_distance = confident_distance
+        self.max_missed = max_missed
+        self.max_devices = max_devices
+        self.ttl = ttl
+        self._clock = clock
+        self._devices: OrderedDict[str, tuple[float, list[FaceTrack], threading.Lock]] = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def update(self, device: str, boxes: np.ndarray, recognize: Recognizer) -> list[Optional[str]]:
+        """
+        Associate the faces of a frame to the tracks of the device and get their names.
+
+        Frames of the same device are serialized; frames of different devices are not.
+
+        Args:
+            device (str): Device identifier.
+            boxes (np.ndarray): Face boxes of the frame as an (n, 4) array of [x1, y1, x2, y2].
+            recognize (Callable): Function recognizing the faces at the given positions,
+                                  returning their names and match distances.
+
+        Returns:
+            list: For each face, the name of its identity, or None if unknown.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        tracks, device_lock = self._tracks(device)
+
+        with device_lock:
+            assigned = self._associate(tracks, boxes)
+
+            matched = {id(track) for track in assigned if track is not None}
+            for track in tracks:
+                track.age += 1
+                if id(track) not in matched:
+                    track.missed += 1
+            tracks[:] = [track for track in tracks if track.missed <= self.max_missed]
+
+            for position, track in enumerate(assigned):
+                if track is None:
+                    assigned[position] = FaceTrack(boxes[position])
+                    tracks.append(assigned[position])
+                else:
+                    track.box = boxes[position]
+                    track.missed = 0
+
+            pending = [position for position, track in enumerate(assigned) if self._due(track)]
+            if pending:
+                names, distances = recognize(pending)
+                for position, name, distance in zip(pending, names, distances):
+                    track = assigned[position]
+                    track.name, track.distance, track.age = name, float(distance), 0
+
+            return [track.name for track in assigned]
+
+    def _tracks(self, device: str) -> tuple[list[FaceTrack], threading.Lock]:
+        """
+        Get the tracks of a device, forgetting the least recently seen and expired devices.
+
+        Args:
+            device (str): Device identifier.
+
+        Returns:
+            tuple: The tracks of the device and the lock serializing its frames.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._devices.pop(device, None)
+            if entry is None or now - entry[0] > self.ttl:
+                entry = (now, [], threading.Lock())
+            self._devices[device] = (now, entry[1], entry[2])
+
+            # The least recently seen device is always first, so expired devices are at the front
+            while len(self._devices) > self.max_devices or \
+                    now - next(iter(self._devices.values()))[0] > self.ttl:
+                self._devices.popitem(last=False)
+
+        return entry[1], entry[2]
+
+    def _associate(self, tracks: list[FaceTrack],
+                   boxes: np.ndarray) -> list[Optional[FaceTrack]]:
+        """
+        Greedily associate the boxes to the tracks by decreasing intersection over union.
+
+        Args:
+            tracks (list): Tracks of the device.
+            boxes (np.ndarray): Face boxes of the frame.
+
+        Returns:
+            list: For each box, its track, or None if it starts a new track.
+        """
+        assigned: list[Optional[FaceTrack]] = [None] * len(boxes)
+        if not tracks or len(boxes) == 0:
+            return assigned
+
+        iou = box_iou(np.stack([track.box for track in tracks]), boxes)
+        for flat in np.argsort(iou, axis=None)[::-1]:
+            track_position, box_position = np.unravel_index(flat, iou.shape)
+            if iou[track_position, box_position] < self.iou_threshold:
+                break
+            if assigned[box_position] is None and \
+                    all(track is not tracks[track_position] for track in assigned):
+                assigned[box_position] = tracks[track_position]
+
+        return assigned
+
+    def _due(self, track: FaceTrack) -> bool:
+        """
+        Tell whether a track must be recognized in the current frame.
+
+        Args:
+            track (FaceTrack): An associated or new track.
+
+        Returns:
+            bool: True for new tracks and tracks whose recognition is older than allowed for
+                  their confidence.
+        """
+        if track.age == 0:
+            return True
+        confident = track.name is not None and track.distance <= self.confident_distance
+        return track.age >= (self.recognize_every if confident else self.retry_every)
@@ -0,0 +1,103 @@
+"""
+Decoded image cache module for the computer vision system.
+
+This module keeps recently downloaded images already decoded, together with the HTTP
+validators needed to revalidate them with a conditional GET.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class CachedImage:
+    """Decoded image and the HTTP validators of the response it came from."""
+
+    image: np.ndarray
+    """The decoded image."""
+
+    etag: Optional[str] = None
+    """Value of the ETag response header."""
+
+    last_modified: Optional[str] = None
+    """Value of the Last-Modified response header."""
+
+
+class ImageCache:
+    """
+    Least recently used cache of decoded images, bounded by their size in bytes.
+
+    Attributes:
+        max_bytes (int): Maximum total size in bytes of the cached images.
+        size (int): Current total size in bytes of the cached images.
+
+    Methods:
+        get(key: str) -> CachedImage: Get a cached image and mark it as recently used.
+        put(key: str, entry: CachedImage) -> None: Cache an image, evicting the least
+                                                   recently used ones if needed.
+    """
+
+    max_bytes: int
+    """Maximum total size in bytes of the cached images."""
+
+    size: int
+    """Current total size in bytes of the cached images."""
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Initialize an empty ImageCache.
+
+        Args:
+            max_bytes (int): Maximum total size in bytes of the cached images.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, CachedImage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """
+        Get a cached image and mark it as recently used.
+
+        Args:
+            key (str): The normalized URL of the image.
+
+        Returns:
+            CachedImage: The cached image, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedImage) -> None:
+        """
+        Cache an image, evicting the least recently used ones if needed.
+
+        Images larger than the whole cache are not cached.
+
+        Args:
+            key (str): The normalized URL of the image.
+            entry (CachedImage): The decoded image and its HTTP validators.
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.image.nbytes
+
+            if entry.image.nbytes > self.max_bytes:
+                return
+
+            self._entries[key] = entry
+            self.size += entry.image.nbytes
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.image.nbytes
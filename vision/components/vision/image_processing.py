@@ -1,20 +1,24 @@
 """This module provides the ImageProcessing class, which integrates functionalities
 for detecting persons, weapons, and recognizing faces within images."""
+import copy
 import os
-import urllib
-import re
-from typing import Optional, Any
+import time
+from concurrent.futures import Future
+from typing import Any, Optional
 
-import validators
 import numpy as np
 
 import yaml
 
-from cv2 import imdecode, imread
-
+from vision.components.metrics import DEVICE, device_context, stage_timer
+from vision.components.vision.analyzer_executor import Analyzer, AnalyzerExecutor
+from vision.components.vision.batching import MicroBatcher
 from vision.components.vision.person_detection import PersonDetector
-from vision.components.vision.weapon_detection import WeaponDetector
+from vision.components.vision.weapon_detection import WeaponAnalysis, WeaponDetector
 from vision.components.vision.face_recognition import FaceRecognition
+from vision.components.vision.face_tracker import FaceTracker
+from vision.components.vision.image_loader import ImageLoader
+from vision.components.vision.result_cache import FrameResultCache, dhash
 
 from monitor.task_monitor import TaskMetrics
 
@@ -27,48 +31,312 @@ class ImageProcessing:
         images to detect persons, weapons, and recognize faces.
 
         Attributes:
-            person_detector (PersonDetector): The person detection model.
+            shared_pose (bool): Whether people are counted from the pose model boxes, so a single
+                                inference feeds both the people count and the hand keypoints.
+            person_detector (PersonDetector): The person detection model, or None when
+                                              `shared_pose` is enabled.
             weapon_detector (WeaponDetector): The weapon detection model.
             face_recognition (FaceRecognition): The face recognition model and image crops.
+            face_roi (bool): Whether faces are only searched inside the detected people, and
+                             not at all when there is nobody.
+            executor (AnalyzerExecutor): Engine that runs the analyzers of each image.
+            image_loader (ImageLoader): Pooled loader of images from paths or URLs.
+            result_cache (FrameResultCache): Per-device cache of the results of unchanged
+                                             frames, or None if disabled.
+            warm_up_shape (tuple): Shape of the blank frame used to warm up the models, or
+                                   None if the warm-up is disabled.
+            person_batcher (MicroBatcher): Micro-batcher of the person detections of
+                                           concurrent images, or None if disabled.
+            weapon_batcher (MicroBatcher): Micro-batcher of the weapon analyses of concurrent
+                                           images, or None if disabled.
 
         Methods:
             process: Processes the image and detects persons, weapons, and recognizes faces.
+            process_annotated: Processes the image and annotates a copy of it with the weapon
+                               analysis.
             build_message: Constructs a message based on detection results.
             load_image_from_source: Loads an image from a local path or a URL.
+            warm_up: Loads and runs each model once on a blank frame.
+            close: Stops the micro-batchers and releases the models shared through the model
+                   registry.
     """
 
-    def __init__(self) -> None:
+    DEFAULT_STATE: dict[str, Any] = {'n_detected_people': 0,
+                                     'recognized_people': [],
+                                     'weapon_detected': False}
+    """Detection results used for analyzers that fail or exceed their timeout."""
+
+    def __init__(self, config_path: str = '../vision/components/config.yaml') -> None:
         """
             Initializes the ImageProcessing class by loading configuration settings from a YAML file
             and initializing detection models.
+
+            Args:
+                config_path (str): Path to the YAML configuration file.
         """
-        with open('../vision/components/config.yaml', 'r', encoding="utf-8") as f:
+        with open(config_path, 'r', encoding="utf-8") as f:
             config = yaml.load(f, Loader=yaml.SafeLoader)
 
-        self.person_detector = PersonDetector(config['PERSON_DETECTION_MODEL'])
+        self.image_loader = ImageLoader(**config.get('IMAGE_LOADER', {}))
+        result_cache = dict(config.get('RESULT_CACHE', {}))
+        self.result_cache: Optional[FrameResultCache] = None
+        if result_cache.pop('enabled', False):
+            self.result_cache = FrameResultCache(**result_cache)
+        self.shared_pose = config.get('SHARED_POSE_INFERENCE', False)
+        self.person_detector = None if self.shared_pose else \
+            PersonDetector(config['PERSON_DETECTION_MODEL'], **config.get('INFERENCE_BACKEND', {}))
         self.weapon_detector = WeaponDetector(config)
+        concurrent = config.get('ANALYZER_EXECUTION', 'concurrent') == 'concurrent'
+        self.executor = AnalyzerExecutor(concurrent, timeouts=config.get('ANALYZER_TIMEOUTS'))
+        face_tracking = dict(config.get('FACE_TRACKING', {}))
+        face_tracker = None
+        if face_tracking.pop('enabled', False):
+            face_tracker = FaceTracker(**face_tracking)
         self.face_recognition = FaceRecognition(config['FACE_RECOGNITION_IMAGES'],
-                                                config['FACE_RECOGNITION_CROPS'])
-
-    def process(self, img: np.ndarray) -> dict[str, Any]:
+                                                config['FACE_RECOGNITION_CROPS'],
+                                                config.get('FACE_RECOGNITION_MODEL', 'VGG-Face'),
+                                                config.get('FACE_RECOGNITION_THRESHOLD', 0.68),
+                                                config.get('FACE_RECOGNITION_WORKERS'),
+                                                config.get('FACE_RECOGNITION_MIN_FACE_SIZE', 0),
+                                                config.get('FACE_RECOGNITION_ROI_MIN_SIZE', 320),
+                                                face_tracker)
+        self.face_roi = config.get('FACE_RECOGNITION_PERSON_ROI', False)
+        warm_up = config.get('WARM_UP', {})
+        self.warm_up_shape: Optional[tuple[int, int, int]] = None
+        if warm_up.get('enabled', False):
+            self.warm_up_shape = (warm_up.get('height', 480), warm_up.get('width', 640), 3)
+        micro_batching = dict(config.get('MICRO_BATCHING', {}))
+        self.person_batcher: Optional[MicroBatcher] = None
+        self.weapon_batcher: Optional[MicroBatcher] = None
+        if micro_batching.pop('enabled', False):
+            if self.person_detector is not None:
+                self.person_batcher = MicroBatcher(self._person_batch, **micro_batching)
+            self.weapon_batcher = MicroBatcher(self._analyze_batch, **micro_batching)
+
+    def process(self, img: np.ndarray, device_id: Optional[str] = None) -> dict[str, Any]:
         """
             Processes an image to detect persons, weapons, and recognize faces.
 
+            When the result cache is enabled and the device is known, an image perceptually
+            similar to the last processed image of the same device reuses its results.
+
+            Args:
+                img (np.ndarray): The image to be processed.
+                device_id (str): Identifier of the device that captured the image.
+
+            Returns:
+                dict: A dictionary containing the detection results.
+        """
+        return self._process(img, device_id)
+
+    def process_annotated(self, img: np.ndarray,
+                          device_id: Optional[str] = None) -> tuple[dict[str, Any], np.ndarray]:
+        """
+            Processes an image and draws the weapon analysis on a copy of it.
+
+            The annotations are drawn from the results of the weapon analyzer, so no extra
+            inference is run. Images whose results come from the result cache, or whose
+            weapon analyzer failed, are returned without annotations.
+
+            Args:
+                img (np.ndarray): The image to be processed.
+                device_id (str): Identifier of the device that captured the image.
+
+            Returns:
+                tuple: The detection results and the annotated copy of the image.
+        """
+        analyses: dict[str, WeaponAnalysis] = {}
+        state = self._process(img, device_id, analyses)
+
+        annotated = img.copy()
+        if 'weapons' in analyses:
+            annotated = self.weapon_detector.annotate(annotated, analyses['weapons'])
+
+        return state, annotated
+
+    def _process(self, img: np.ndarray, device_id: Optional[str] = None,
+                 analyses: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """
+            Processes an image, checking the result cache first.
+
+            The whole processing is observed as the 'process' stage of the
+            vision_stage_seconds histogram, and every stage observed inside it (also in the
+            analyzer threads) is labelled with the device. An analyzer that fails, exceeds its
+            timeout or is still busy with an earlier image contributes its DEFAULT_STATE values;
+            the failure is logged and the incomplete results are not cached.
+
             Args:
                 img (np.ndarray): The image to be processed.
+                device_id (str): Identifier of the device that captured the image.
+                analyses (dict): Dictionary that receives the full analyses of the image
+                                 (such as the WeaponAnalysis under 'weapons'), or None.
 
             Returns:
                 dict: A dictionary containing the detection results.
         """
+        with device_context(device_id), stage_timer('process'):
+            frame_hash = None
+            if self.result_cache is not None and device_id is not None:
+                frame_hash = dhash(img)
+                cached_state = self.result_cache.get(device_id, frame_hash)
+                if cached_state is not None:
+                    return cached_state
+
+            person_boxes: Optional[Future] = Future() if self.face_roi else None
+
+            def release(name: str) -> None:
+                # A skipped people analyzer must not leave the face analyzer waiting forever
+                if person_boxes is not None and name != 'faces' and not person_boxes.done():
+                    person_boxes.set_exception(RuntimeError(f"Analisador {name} não executado"))
+
+            results, failed = self.executor.run(
+                self._analyzers(img, device_id, analyses, person_boxes), release)
+            if failed:
+                print(f"Resultados incompletos do dispositivo {device_id}, valores padrão para: "
+                      f"{', '.join(sorted(failed))}")
+
+            new_state = copy.deepcopy(self.DEFAULT_STATE)
+            new_state.update(results)
+
+            if self.result_cache is not None and frame_hash is not None and not failed:
+                self.result_cache.put(device_id, frame_hash, new_state)
+
+            monitor_url = "http://localhost:9091"
+            # TaskMetrics.collect_metrics(process, monitor_url)
+
+            return new_state
+
+    def _analyzers(self, img: np.ndarray, device_id: Optional[str] = None,
+                   analyses: Optional[dict[str, Any]] = None,
+                   person_boxes: Optional[Future] = None) -> dict[str, Analyzer]:
+        """
+        Build the analyzers of an image.
+
+        The analyzers are independent except when `face_roi` is enabled: then the person boxes
+        found by the people analyzer are handed to the face analyzer through a future, so face
+        recognition waits only for the person detection while the weapon detection goes on.
+
+        Args:
+            img (np.ndarray): The image to be processed.
+            device_id (str): Identifier of the device that captured the image.
+            analyses (dict): Dictionary that receives the WeaponAnalysis of the image under
+                             'weapons', or None.
+            person_boxes (Future): Future handing the person boxes to the face analyzer when
+                                   `face_roi` is enabled, or None.
+
+        Returns:
+            dict: Analyzers by name, each returning part of the detection results.
+        """
+        analyzers: dict[str, Analyzer] = {}
+
+        def weapons(keypoints: Optional[np.ndarray] = None) -> dict[str, Any]:
+            if self.weapon_batcher is None:
+                analysis = self.weapon_detector.analyze(img, keypoints)
+            else:
+                analysis = self.weapon_batcher((img, keypoints, DEVICE.get()))
+            if analyses is not None:
+                analyses['weapons'] = analysis
+            return {'weapon_detected': analysis.alert}
+
+        if self.person_detector is None:
+            def people_and_weapons() -> dict[str, Any]:
+                boxes, keypoints = self._people(img, person_boxes)
+                return {'n_detected_people': len(boxes), **weapons(keypoints)}
+
+            analyzers['people_weapons'] = people_and_weapons
+        else:
+            analyzers['people'] = lambda: {
+                'n_detected_people': len(self._people(img, person_boxes)[0])
+            }
+            analyzers['weapons'] = weapons
+
+        # Added last, so the sequential execution has the person boxes ready
+        if person_boxes is None:
+            analyzers['faces'] = lambda: {
+                'recognized_people': self.face_recognition(img, device_id=device_id)
+            }
+        else:
+            analyzers['faces'] = lambda: {
+                'recognized_people': self.face_recognition(img, person_boxes.result(), device_id)
+            }
+
+        return analyzers
+
+    def _people(self, img: np.ndarray,
+                person_boxes: Optional[Future]) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Detect the people of an image and hand their boxes to the face analyzer.
+
+        Args:
+            img (np.ndarray): The image to be processed.
+            person_boxes (Future): Future resolved with the person boxes (or the detection
+                                   exception), or None if no analyzer waits for them.
+
+        Returns:
+            tuple: The person boxes as an (n, 4) array of [x1, y1, x2, y2] pixels, and their
+                   hand keypoints when `shared_pose` is enabled (None otherwise).
+        """
+        try:
+            if self.person_detector is None:
+                boxes, keypoints = self.weapon_detector.people_boxes(img)
+            elif self.person_batcher is None:
+                boxes, keypoints = self.person_detector.boxes(img).xyxy.cpu().numpy(), None
+            else:
+                boxes = self.person_batcher((img, DEVICE.get())).xyxy.cpu().numpy()
+                keypoints = None
+        except Exception as e:
+            if person_boxes is not None:
+                person_boxes.set_exception(e)
+            raise
+
+        if person_boxes is not None:
+            person_boxes.set_result(boxes)
+        return boxes, keypoints
+
+    def _person_batch(self, requests: list[tuple[np.ndarray, str]]) -> list:
+        """
+        Detect the people of the images collected by the person micro-batcher.
+
+        Args:
+            requests (list): Images and the devices that captured them.
+
+        Returns:
+            list: The person boxes of each image.
+        """
+        with device_context(self._batch_device([device for _, device in requests])):
+            return self.person_detector.boxes_batch([img for img, _ in requests])
+
+    def _analyze_batch(self, requests: list[tuple[np.ndarray, Optional[np.ndarray], str]]
+                       ) -> list[WeaponAnalysis]:
+        """
+        Analyze the weapons of the images collected by the weapon micro-batcher.
 
-        new_state = {'n_detected_people': self.person_detector.count(img),
-                     'recognized_people': self.face_recognition(img),
-                     'weapon_detected': self.weapon_detector.alert(img)}
+        Args:
+            requests (list): Images, their hand keypoints (None if not computed yet) and the
+                             devices that captured them.
+
+        Returns:
+            list: The analysis of each image.
+        """
+        with device_context(self._batch_device([device for _, _, device in requests])):
+            return self.weapon_detector.analyze_batch(
+                [img for img, _, _ in requests], [keypoints for _, keypoints, _ in requests])
+
+    @staticmethod
+    def _batch_device(devices: list[str]) -> str:
+        """
+        Get the device label of the stages of a micro-batch.
 
-        monitor_url = "http://localhost:9091"
-        # TaskMetrics.collect_metrics(process, monitor_url)
+        The batches run on the thread of the micro-batcher, which does not inherit the device
+        of the analyzers, so the label is set explicitly.
 
-        return new_state
+        Args:
+            devices (list): Devices of the images of the batch.
+
+        Returns:
+            str: The device shared by every image, or 'batch' for images of several devices.
+        """
+        return devices[0] if len(set(devices)) == 1 else 'batch'
 
     @staticmethod
     def build_message(request: dict, state: dict) -> dict:
@@ -103,40 +371,61 @@ class ImageProcessing:
 
         return response
 
-    @staticmethod
-    def load_image_from_source(path: str) -> Optional[np.ndarray]:
+    def load_image_from_source(self, path: str) -> Optional[np.ndarray]:
         """
         Load an image from a given file path or URL.
 
         This function supports loading images from local file paths or URLs. For Google Drive URLs,
-        it converts the sharing URL to a direct download URL. It uses the OpenCV function `imdecode`
-        to decode the image from the URL response.
+        it converts the sharing URL to a direct download URL. URLs are downloaded by the pooled
+        `image_loader`, with the timeouts and size limit set in the IMAGE_LOADER configuration.
 
         Args:
             path (str): The file path or URL to the image.
 
         Returns:
             np.ndarray: The loaded image as a NumPy array, or None if an error occurs.
+        """
+        return self.image_loader.load(path)
 
-        Raises:
-            urllib.error.URLError: If there is an error opening the URL.
-            ValueError: If the URL is invalid.
+    def warm_up(self) -> dict[str, float]:
         """
-        try:
-            if validators.url(path):
-                if path.startswith("https://drive.google.com"):
-                    match = re.search(r'/file/d/(.*?)/', path)
-                    if match is not None:  # Verificar se match não é None antes de acessar group
-                        path = f'https://drive.google.com/uc?id={match.group(1)}'
-                    else:
-                        raise ValueError("Invalid Google Drive URL")
-                with urllib.request.urlopen(path) as url_response:
-                    img = imdecode(np.array(bytearray(url_response.read()), dtype=np.uint8), -1)
+        Load and run each model once on a blank frame of `warm_up_shape`.
 
-            else:
-                img = imread(path)
+        The models are loaded lazily, and the first inference of each one also builds its
+        graph and kernels, so without the warm-up the first messages after a restart take
+        much longer than the others.
 
-            return img
-        except (urllib.error.URLError, ValueError) as e:
-            print(f"Error loading image from source: {e}")
-            return None
+        Returns:
+            dict: Duration in seconds of the warm-up of each model, by model name (empty if
+                  the warm-up is disabled).
+        """
+        if self.warm_up_shape is None:
+            return {}
+
+        frame = np.zeros(self.warm_up_shape, dtype=np.uint8)
+        models = {'person_detection': self.person_detector,
+                  'weapon_detection': self.weapon_detector,
+                  'face_recognition': self.face_recognition}
+
+        durations = {}
+        for name, model in models.items():
+            if model is None:
+                continue
+            start = time.perf_counter()
+            model.warm_up(frame)
+            durations[name] = time.perf_counter() - start
+        return durations
+
+    def close(self) -> None:
+        """
+        Stop the micro-batchers and release the models shared through the model registry.
+
+        Models still used by another ImageProcessing of the process stay loaded.
+        """
+        for batcher in (self.person_batcher, self.weapon_batcher):
+            if batcher is not None:
+                batcher.close()
+        if self.person_detector is not None:
+            self.person_detector.close()
+        self.weapon_detector.close()
+        self.face_recognition.close()
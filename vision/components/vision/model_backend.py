@@ -0,0 +1,147 @@
+"""
+Inference backend module for the computer vision system.
+
+This module loads the YOLO models either with PyTorch or as ONNX Runtime / OpenVINO models
+exported from the PyTorch weights on first use and cached next to them, and shares each
+loaded model through the model registry.
+"""
+import functools
+import os
+import shutil
+from typing import TYPE_CHECKING, Optional
+
+from vision.components.vision.model_registry import REGISTRY, ModelHandle, ModelRegistry
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+BACKENDS = ('torch', 'onnx', 'openvino')
+"""Supported inference backends."""
+
+
+def exported_path(weights: str, backend: str, int8: bool = False) -> str:
+    """
+    Get the path of the cached export of a PyTorch weights file.
+
+    Args:
+        weights (str): Path to the PyTorch weights (.pt).
+        backend (str): Inference backend, one of BACKENDS.
+        int8 (bool): Whether the export is quantized to INT8.
+
+    Returns:
+        str: The path of the exported model (a file for ONNX, a directory for OpenVINO), or
+             the weights themselves for the torch backend.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferência inválido: {backend}")
+
+    stem = os.path.splitext(weights)[0]
+    if backend == 'onnx':
+        return f'{stem}_int8.onnx' if int8 else f'{stem}.onnx'
+    if backend == 'openvino':
+        return f'{stem}_int8_openvino_model' if int8 else f'{stem}_openvino_model'
+    return weights
+
+
+def is_stale(weights: str, export: str) -> bool:
+    """
+    Tell whether an export is missing or older than its weights.
+
+    Args:
+        weights (str): Path to the PyTorch weights.
+        export (str): Path of the exported model.
+
+    Returns:
+        bool: True if the model must be exported again.
+    """
+    return not os.path.exists(export) or os.path.getmtime(export) < os.path.getmtime(weights)
+
+
+def load_yolo(weights: str, backend: str = 'torch', int8: bool = False,
+              task: Optional[str] = None, calibration_data: Optional[str] = None) -> 'YOLO':
+    """
+    Load a YOLO model with the given inference backend.
+
+    Non-torch backends export the PyTorch weights on first use (or when the weights change)
+    with dynamic input shapes, since the weapon model runs at a size that depends on the
+    frame. Later loads read the cached export directly, without loading PyTorch weights.
+    Weights that are not .pt files (e.g. .tflite exports) are loaded as they are.
+
+    Args:
+        weights (str): Path to the PyTorch weights (.pt).
+        backend (str): Inference backend, one of BACKENDS.
+        int8 (bool): Whether to quantize the export to INT8: post-training quantization with
+                     NNCF for OpenVINO, dynamic weight quantization for ONNX.
+        task (str): Task of the model (e.g. 'detect' or 'pose'), or None to guess it from
+                    the export.
+        calibration_data (str): Dataset YAML used to calibrate the OpenVINO INT8 quantization
+                                (None for the ultralytics default).
+
+    Returns:
+        YOLO: The loaded model, with the same prediction interface for every backend.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from ultralytics import YOLO
+
+    export = exported_path(weights, backend, int8)
+    if backend == 'torch' or not weights.endswith('.pt'):
+        return YOLO(weights, task=task)
+
+    if is_stale(weights, export):
+        print(f"Exportando {weights} para {backend}{' INT8' if int8 else ''}")
+        model = YOLO(weights)
+        task = task or model.task
+        if os.path.isdir(export):
+            shutil.rmtree(export)
+
+        if backend == 'openvino':
+            options = {} if calibration_data is None else {'data': calibration_data}
+            exported = model.export(format='openvino', dynamic=True, int8=int8, **options)
+            if os.path.abspath(exported) != os.path.abspath(export):
+                os.replace(exported, export)
+        else:
+            exported = model.export(format='onnx', dynamic=True)
+            if int8:
+                # pylint: disable-next=import-outside-toplevel
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                quantize_dynamic(exported, export, weight_type=QuantType.QUInt8)
+            elif os.path.abspath(exported) != os.path.abspath(export):
+                os.replace(exported, export)
+
+    return YOLO(export, task=task)
+
+
+def acquire_yolo(weights: str, backend: str = 'torch', int8: bool = False,
+                 task: Optional[str] = None, calibration_data: Optional[str] = None,
+                 registry: ModelRegistry = REGISTRY) -> ModelHandle:
+    """
+    Get a handle of a YOLO model shared through the model registry.
+
+    The model is loaded with `load_yolo` on the first use of any handle of the same weights,
+    backend and quantization, so detectors built with the same weights share one model.
+
+    Args:
+        weights (str): Path to the PyTorch weights (.pt).
+        backend (str): Inference backend, one of BACKENDS.
+        int8 (bool): Whether the export is quantized to INT8.
+        task (str): Task of the model (e.g. 'detect' or 'pose'), or None to guess it.
+        calibration_data (str): Dataset YAML used to calibrate the OpenVINO INT8 quantization
+                                (None for the ultralytics default).
+        registry (ModelRegistry): Registry holding the model.
+
+    Returns:
+        ModelHandle: Handle of the model, which is loaded lazily.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    exported_path(weights, backend, int8)
+    return registry.acquire(('yolo', os.path.abspath(weights), backend, int8),
+                            functools.partial(load_yolo, weights, backend, int8, task,
+                                              calibration_data))
@@ -0,0 +1,270 @@
+"""
+Model registry module for the computer vision system.
+
+This module loads each model once per process, lazily on first use, and shares it between
+every detector that asks for the same weights through reference-counted handles. Calls of a
+shared model through its handles are serialized, since the models (e.g. the YOLO predictors)
+are not thread-safe.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator
+
+
+class _Entry:  # pylint: disable=too-few-public-methods
+    """Model of the registry with its loader and the number of handles referencing it."""
+
+    def __init__(self, loader: Callable[[], Any]) -> None:
+        self.loader = loader
+        self.model: Any = None
+        self.loaded = False
+        self.refs = 0
+        self.lock = threading.Lock()
+        self.call_lock = threading.Lock()
+
+
+class ModelHandle:
+    """
+    Reference-counted handle of a model of the registry.
+
+    The model is loaded on the first call to `get`. Releasing the last handle of a model
+    drops it from the registry, so its memory is freed once no detector uses it. Calling the
+    handle calls the model, one thread at a time across every handle of the same model.
+
+    Attributes:
+        key (Hashable): Key of the model in the registry.
+
+    Methods:
+        get() -> Any: Get the model, loading it on first use.
+        locked() -> Iterator: Use the model while no other thread calls it.
+        release() -> None: Release the handle.
+    """
+
+    key: Hashable
+    """Key of the model in the registry."""
+
+    def __init__(self, registry: 'ModelRegistry', key: Hashable) -> None:
+        """
+        Initialize the ModelHandle.
+
+        Args:
+            registry (ModelRegistry): Registry holding the model.
+            key (Hashable): Key of the model in the registry.
+        """
+        self.key = key
+        self._registry = registry
+        self._released = False
+
+    def __enter__(self) -> 'ModelHandle':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call the model, waiting for the calls of the same model from other threads.
+
+        Returns:
+            Any: The result of the model.
+
+        Raises:
+            RuntimeError: If the handle was released.
+        """
+        if self._released:
+            raise RuntimeError(f"Handle do modelo {self.key} já foi liberado")
+        return self._registry.call(self.key, *args, **kwargs)
+
+    def get(self) -> Any:
+        """
+        Get the model, loading it on first use.
+
+        Returns:
+            Any: The shared model.
+
+        Raises:
+            RuntimeError: If the handle was released.
+        """
+        if self._released:
+            raise RuntimeError(f"Handle do modelo {self.key} já foi liberado")
+        return self._registry.get(self.key)
+
+    @contextmanager
+    def locked(self) -> Iterator[Any]:
+        """
+        Use the model, loading it on first use, while no other thread calls it.
+
+        Yields:
+            Any: The shared model.
+
+        Raises:
+            RuntimeError: If the handle was released.
+        """
+        if self._released:
+            raise RuntimeError(f"Handle do modelo {self.key} já foi liberado")
+        with self._registry.locked(self.key) as model:
+            yield model
+
+    def release(self) -> None:
+        """Release the handle; releasing it again has no effect."""
+        if not self._released:
+            self._released = True
+            self._registry.release(self.key)
+
+
+class ModelRegistry:
+    """
+    Registry of the models shared by the detectors of a process.
+
+    Models are registered with a key (e.g. the weights path and the inference backend) and
+    the function that loads them. Every `acquire` of the same key returns a new handle to
+    the same model, which is loaded once, on the first `get` of any of its handles.
+
+    Methods:
+        acquire(key: Hashable, loader: Callable) -> ModelHandle: Get a handle of a model.
+        get(key: Hashable) -> Any: Get a model, loading it on first use.
+        call(key: Hashable, *args, **kwargs) -> Any: Call a model, one thread at a time.
+        locked(key: Hashable) -> Iterator: Use a model while no other thread calls it.
+        release(key: Hashable) -> None: Release a handle of a model.
+        loaded() -> list: Keys of the models already loaded.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ModelRegistry without models."""
+        self._entries: dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def acquire(self, key: Hashable, loader: Callable[[], Any]) -> ModelHandle:
+        """
+        Get a handle of a model, registering it if needed.
+
+        Args:
+            key (Hashable): Key identifying the model, such as its weights path and backend.
+            loader (Callable): Function loading the model, used only if the key is new.
+
+        Returns:
+            ModelHandle: A new handle of the model, which is not loaded yet if it is new.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(loader)
+            entry.refs += 1
+        return ModelHandle(self, key)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a model, loading it on first use.
+
+        Different models load concurrently; concurrent first uses of the same model wait for
+        a single load.
+
+        Args:
+            key (Hashable): Key of the model.
+
+        Returns:
+            Any: The shared model.
+
+        Raises:
+            KeyError: If the model is not registered.
+        """
+        return self._loaded_entry(key).model
+
+    def call(self, key: Hashable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a model, loading it on first use.
+
+        The calls of the same model are serialized, so several inference workers can share
+        it safely; different models still run concurrently.
+
+        Args:
+            key (Hashable): Key of the model.
+            *args: Positional arguments of the model call.
+            **kwargs: Keyword arguments of the model call.
+
+        Returns:
+            Any: The result of the model.
+
+        Raises:
+            KeyError: If the model is not registered.
+        """
+        entry = self._loaded_entry(key)
+        with entry.call_lock:
+            return entry.model(*args, **kwargs)
+
+    @contextmanager
+    def locked(self, key: Hashable) -> Iterator[Any]:
+        """
+        Use a model, loading it on first use, while no other thread calls it.
+
+        The block holds the lock of the model calls, so it can use or update a model that
+        is not callable (such as an index) without racing the other users.
+
+        Args:
+            key (Hashable): Key of the model.
+
+        Yields:
+            Any: The shared model.
+
+        Raises:
+            KeyError: If the model is not registered.
+        """
+        entry = self._loaded_entry(key)
+        with entry.call_lock:
+            yield entry.model
+
+    def release(self, key: Hashable) -> None:
+        """
+        Release a handle of a model, dropping the model when no handle is left.
+
+        Args:
+            key (Hashable): Key of the model.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._entries[key]
+
+    def loaded(self) -> list[Hashable]:
+        """
+        Get the keys of the models already loaded.
+
+        Returns:
+            list: Keys of the loaded models.
+        """
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.loaded]
+
+    def _loaded_entry(self, key: Hashable) -> _Entry:
+        """
+        Get the entry of a model, loading the model on first use.
+
+        Args:
+            key (Hashable): Key of the model.
+
+        Returns:
+            _Entry: The entry of the loaded model.
+
+        Raises:
+            KeyError: If the model is not registered.
+        """
+        with self._lock:
+            entry = self._entries[key]
+        with entry.lock:
+            if not entry.loaded:
+                entry.model = entry.loader()
+                entry.loaded = True
+        return entry
+
+
+REGISTRY = ModelRegistry()
+"""Registry of the models shared by every detector of the process."""
@@ -3,8 +3,17 @@ Person detection module for the computer vision system.
 
 This module uses the YOLO model to detect people in images.
 """
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
-from ultralytics import YOLO
+
+from vision.components.metrics import stage_timer
+from vision.components.vision.batching import group_frames
+from vision.components.vision.model_backend import acquire_yolo
+from vision.components.vision.model_registry import REGISTRY, ModelRegistry
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 
 class PersonDetector:
@@ -13,26 +22,56 @@ class PersonDetector:
 
     This class uses the YOLO model to detect people in the provided image frame.
 
+    The model is shared through the model registry and only loaded on first use.
+
     Attributes:
         model (YOLO): YOLO model for person detection.
 
     Methods:
-        __init__(path: str) -> None: Initialize the PersonDetector with the path to the YOLO model.
+        __init__(path: str, backend: str, int8: bool, registry: ModelRegistry) -> None:
+            Initialize the PersonDetector with the path to the YOLO model.
         boxes(frame: np.ndarray) -> list: Get bounding boxes for detected people in the image frame.
         count(frame: np.ndarray) -> int: Detect the number of people in the provided image frame.
+        boxes_batch(frames: list) -> list: Get bounding boxes for several image frames.
+        count_batch(frames: list) -> list: Detect the number of people in several image frames.
+        warm_up(frame: np.ndarray) -> None: Load the model and run it once.
+        close() -> None: Release the model.
     """
 
-    model: YOLO
-    """YOLO model used for person detection."""
-
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, backend: str = 'torch', int8: bool = False,
+                 calibration_data: Optional[str] = None,
+                 registry: ModelRegistry = REGISTRY) -> None:
         """
         Initialize the PersonDetector with the path to the YOLO model.
 
         Args:
             path (str): Path to the pre-trained YOLO model.
+            backend (str): Inference backend ('torch', 'onnx' or 'openvino').
+            int8 (bool): Whether the exported model is quantized to INT8.
+            calibration_data (str): Dataset YAML used to calibrate the OpenVINO INT8
+                                    quantization (None for the ultralytics default).
+            registry (ModelRegistry): Registry sharing the model.
+        """
+        self._model = acquire_yolo(path, backend, int8, 'detect', calibration_data, registry)
+
+    @property
+    def model(self) -> 'YOLO':
+        """YOLO model used for person detection, loaded on first use (not locked: the detector
+        calls it through its handle, serialized with the other threads)."""
+        return self._model.get()
+
+    def warm_up(self, frame: np.ndarray) -> None:
         """
-        self.model = YOLO(path)
+        Load the model and run it once, so the first real frame does not pay for it.
+
+        Args:
+            frame (np.ndarray): A frame with the size of the frames to be processed.
+        """
+        self._model(frame, classes=[0], verbose=False)
+
+    def close(self) -> None:
+        """Release the model, which is dropped when no other detector uses it."""
+        self._model.release()
 
     def boxes(self, frame: np.ndarray) -> list:
         """
@@ -44,7 +83,8 @@ class PersonDetector:
         Returns:
             list: A list of bounding boxes for detected people.
         """
-        results = self.model(frame, classes=[0], verbose=False)[0].boxes
+        with self._model.locked() as model, stage_timer('person_detection'):
+            results = model(frame, classes=[0], verbose=False)[0].boxes
 
         return results
 
@@ -62,3 +102,38 @@ class PersonDetector:
         count = len(self.boxes(frame))
 
         return count
+
+    def boxes_batch(self, frames: list[np.ndarray]) -> list:
+        """
+        Get bounding boxes for detected people in several image frames.
+
+        Frames with the same shape are letterboxed to the same size and run in a single
+        model call.
+
+        Args:
+            frames (list): The image frames to be analyzed.
+
+        Returns:
+            list: For each frame, the bounding boxes of the detected people.
+        """
+        boxes: list = [None] * len(frames)
+
+        for group in group_frames(frames):
+            with self._model.locked() as model, stage_timer('person_detection'):
+                results = model([frames[i] for i in group], classes=[0], verbose=False)
+            for position, result in zip(group, results):
+                boxes[position] = result.boxes
+
+        return boxes
+
+    def count_batch(self, frames: list[np.ndarray]) -> list[int]:
+        """
+        Detect the number of people in several image frames.
+
+        Args:
+            frames (list): The image frames in which to detect people.
+
+        Returns:
+            list: For each frame, the number of people detected.
+        """
+        return [len(boxes) for boxes in self.boxes_batch(frames)]
@@ -0,0 +1,57 @@
+"""
+Person regions of interest module for the computer vision system.
+
+This module turns the boxes of detected people into the upper-body regions where their faces
+are searched, so face detection runs on small crops instead of the whole frame.
+"""
+import numpy as np
+
+
+def upper_body_rois(boxes: np.ndarray, shape: tuple[int, ...], ratio: float = 0.5,
+                    margin: float = 0.1) -> list[tuple[int, int, int, int]]:
+    """
+    Get the upper-body regions of the detected people.
+
+    Each region is the top `ratio` of a person box, widened by `margin` of the box width on
+    each side and clipped to the frame. Overlapping regions are merged into their bounding box,
+    so a face shared by two regions is detected only once.
+
+    Args:
+        boxes (np.ndarray): Person boxes as an (n, 4) array of [x1, y1, x2, y2] pixels.
+        shape (tuple): Shape of the frame.
+        ratio (float): Fraction of the box height, from the top, kept as upper body.
+        margin (float): Fraction of the box width added to each side of the region.
+
+    Returns:
+        list: Regions as (x1, y1, x2, y2) integer pixel coordinates.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    height, width = shape[:2]
+
+    widths = boxes[:, 2] - boxes[:, 0]
+    heights = boxes[:, 3] - boxes[:, 1]
+    regions = np.stack([boxes[:, 0] - widths * margin,
+                        boxes[:, 1] - heights * margin,
+                        boxes[:, 2] + widths * margin,
+                        boxes[:, 1] + heights * ratio], axis=1)
+    regions = np.clip(np.rint(regions), 0, [width, height, width, height]).astype(int)
+
+    rois = [tuple(region) for region in regions.tolist()
+            if region[2] > region[0] and region[3] > region[1]]
+
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rois)):
+            for j in range(i + 1, len(rois)):
+                a, b = rois[i], rois[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rois[i] = (min(a[0], b[0]), min(a[1], b[1]),
+                               max(a[2], b[2]), max(a[3], b[3]))
+                    del rois[j]
+                    merged = True
+                    break
+            if merged:
+                break
+
+    return rois
@@ -0,0 +1,118 @@
+"""
+Detection result cache module for the computer vision system.
+
+This module reuses the detection results of a device while its frames stay perceptually
+identical, so fixed cameras do not rerun every model on unchanged scenes.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import cv2
+import numpy as np
+
+
+def dhash(img: np.ndarray, size: int = 8) -> int:
+    """
+    Compute the difference hash of an image.
+
+    The image is converted to grayscale and downscaled to (size + 1) x size pixels; each bit
+    of the hash tells whether a pixel is brighter than its right neighbour. Small changes in
+    noise, compression or lighting flip few bits, while scene changes flip many.
+
+    Args:
+        img (np.ndarray): BGR or grayscale image.
+        size (int): Side of the hash grid; the hash has size * size bits.
+
+    Returns:
+        int: The hash as an integer.
+    """
+    gray = img if img.ndim == 2 else cv2.cvtColor(img[:, :, :3], cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+class FrameResultCache:
+    """
+    Per-device cache of the detection results of the last processed frame.
+
+    A frame whose hash is within `max_distance` bits of the hash of the last processed frame
+    of the same device reuses its results, as long as they are not older than `max_age`.
+
+    Attributes:
+        max_distance (int): Maximum number of different hash bits for frames to be similar.
+        max_age (float): Maximum age in seconds of reused results.
+        max_devices (int): Maximum number of devices tracked.
+
+    Methods:
+        get(device: str, frame_hash: int) -> dict: Get the cached results for a similar frame.
+        put(device: str, frame_hash: int, state: dict) -> None: Cache the results of a frame.
+    """
+
+    max_distance: int
+    """Maximum number of different hash bits for frames to be similar."""
+
+    max_age: float
+    """Maximum age in seconds of reused results."""
+
+    max_devices: int
+    """Maximum number of devices tracked."""
+
+    def __init__(self, max_distance: int = 4, max_age: float = 30.0, max_devices: int = 1024,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize an empty FrameResultCache.
+
+        Args:
+            max_distance (int): Maximum number of different hash bits for frames to be similar.
+            max_age (float): Maximum age in seconds of reused results.
+            max_devices (int): Maximum number of devices tracked.
+            clock (Callable): Function returning the current time in seconds.
+        """
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.max_devices = max_devices
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[int, float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, device: str, frame_hash: int) -> Optional[dict[str, Any]]:
+        """
+        Get the cached results of a device if the frame is similar to the cached one.
+
+        Args:
+            device (str): Device identifier.
+            frame_hash (int): Hash of the new frame.
+
+        Returns:
+            dict: A copy of the cached results, or None if there are no fresh results for
+                  a similar frame.
+        """
+        with self._lock:
+            entry = self._entries.get(device)
+            if entry is None:
+                return None
+            cached_hash, timestamp, state = entry
+            if self._clock() - timestamp > self.max_age or \
+                    (cached_hash ^ frame_hash).bit_count() > self.max_distance:
+                return None
+            self._entries.move_to_end(device)
+            return copy.deepcopy(state)
+
+    def put(self, device: str, frame_hash: int, state: dict[str, Any]) -> None:
+        """
+        Cache the results of a processed frame of a device.
+
+        Args:
+            device (str): Device identifier.
+            frame_hash (int): Hash of the processed frame.
+            state (dict): Detection results of the frame.
+        """
+        with self._lock:
+            self._entries.pop(device, None)
+            self._entries[device] = (frame_hash, self._clock(), copy.deepcopy(state))
+            while len(self._entries) > self.max_devices:
+                self._entries.popitem(last=False)
@@ -3,41 +3,116 @@ Weapon detection module for the computer vision system.
 
 This module uses the YOLO model to detect weapons in images.
 """
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
-from ultralytics import YOLO
 import cv2
 
+from vision.components.metrics import stage_timer
+from vision.components.vision.batching import group_frames
+from vision.components.vision.model_backend import acquire_yolo
+from vision.components.vision.model_registry import REGISTRY, ModelRegistry
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+    from ultralytics.engine.results import Results
+
+
+@dataclass
+class WeaponAnalysis:
+    """Weapons and people found in a frame by a single pass of the pose and weapon models."""
+
+    boxes: np.ndarray
+    """Normalized [x1, y1, x2, y2] boxes of the weapons held by someone, as an (m, 4) array."""
+
+    scores: np.ndarray
+    """Confidence of each weapon detection."""
+
+    persons: np.ndarray
+    """Index, in `keypoints` (and `person_boxes`), of the person holding each weapon."""
+
+    keypoints: np.ndarray
+    """Hand keypoints of the detected people, as an (n, 2, 2) array."""
+
+    person_boxes: Optional[np.ndarray] = field(default=None)
+    """[x1, y1, x2, y2] pixel boxes of the detected people, or None if not computed."""
+
+    @property
+    def alert(self) -> bool:
+        """Whether someone holds a weapon."""
+        return len(self.boxes) > 0
+
+    def detections(self) -> list:
+        """
+        Get the weapon detections as lists.
+
+        Returns:
+            list: A list of [x1, y1, x2, y2, conf, person] weapon detections.
+        """
+        return [[*box, score, person] for box, score, person in
+                zip(self.boxes.tolist(), self.scores.tolist(), self.persons.tolist())]
+
 
 class WeaponDetector:
     """
     Weapon detector using the YOLO model to identify firearms in an image.
 
     This class uses a pre-trained YOLO model to detect firearms in the provided image frame
-    with a minimum confidence threshold of 0.59.
+    with a minimum confidence threshold of 0.439. The models are shared through the model
+    registry and only loaded on first use.
 
     Attributes:
         pose_model (YOLO): YOLO model used for pose estimation.
         weapon_model (YOLO): YOLO model used for weapon detection.
         conf (float): Confidence threshold for weapon detection.
+        max_imgsz (int): Maximum inference size of the weapon model on a full frame.
+        multiscale (bool): Whether the full frame is analyzed at `low_imgsz` and refined with
+                           full-resolution tiles around the hands.
+        low_imgsz (int): Inference size of the low-resolution pass of the multi-scale mode.
+        tile_size (int): Side, in pixels, of the full-resolution tiles around the hands.
 
     Methods:
-        __init__(config: dict) -> None: Initialize the WeaponDetector with the given configuration.
+        __init__(config: dict, registry: ModelRegistry) -> None: Initialize the WeaponDetector
+            with the given configuration.
+        analyze(frame: np.ndarray) -> WeaponAnalysis: Detect the weapons held by people with a
+                                                      single pass of each model.
         boxes(frame: np.ndarray) -> list: Get bounding boxes for detected weapons
-                                          in the image frame.
-        keypoints(frame: np.ndarray) -> list: Get keypoints for detected people
-                                              in the image frame.
+                                          in the image frame, with the person holding them.
+        keypoints(frame: np.ndarray) -> np.ndarray: Get hand keypoints for detected people
+                                                    in the image frame.
+        people(frame: np.ndarray) -> tuple: Get the number of people and their hand keypoints
+                                            with a single pose inference.
+        people_boxes(frame: np.ndarray) -> tuple: Get the boxes of the people and their hand
+                                                  keypoints with a single pose inference.
+        annotate(frame: np.ndarray, analysis: WeaponAnalysis) -> np.ndarray: Draw an analysis
+                                                                         on its frame.
         plot(frame: np.ndarray) -> np.ndarray: Annotate the image with detected
                                                weapons and keypoints.
         alert(frame: np.ndarray) -> bool: Check if any weapons are detected in the image frame.
+        analyze_batch(frames: list) -> list: Detect the weapons held by people in several
+                                             image frames.
+        boxes_batch(frames: list) -> list: Get weapon bounding boxes for several image frames.
+        people_batch(frames: list) -> list: Get people count and hand keypoints for several
+                                            image frames.
+        alert_batch(frames: list) -> list: Check if weapons are detected in several image frames.
+        warm_up(frame: np.ndarray) -> None: Load both models and run them once.
+        close() -> None: Release the models.
     """
 
-    #YOLO model used for pose estimation.
-    pose_model: YOLO
+    max_imgsz: int
+    """Maximum inference size of the weapon model on a full frame."""
 
-    #YOLO model used for weapon detection.
-    weapon_model: YOLO
+    multiscale: bool
+    """Whether the frame is analyzed at low resolution and refined with tiles around the hands."""
 
-    def __init__(self, config: dict) -> None:
+    low_imgsz: int
+    """Inference size of the low-resolution pass of the multi-scale mode."""
+
+    tile_size: int
+    """Side, in pixels, of the full-resolution tiles around the hands."""
+
+    def __init__(self, config: dict, registry: ModelRegistry = REGISTRY) -> None:
         """
         Initialize the WeaponDetector with the given configuration.
 
@@ -45,41 +120,286 @@ class WeaponDetector:
             config (dict): Configuration dictionary containing paths to the YOLO models.
                 - POSE_ESTIMATION_MODEL (str): Path to the YOLO model for pose estimation.
                 - WEAPON_DETECTION_MODEL (str): Path to the YOLO model for weapon detection.
+                - WEAPON_DETECTION (dict): Optional inference resolution settings, with the
+                  max_imgsz, multiscale, low_imgsz and tile_size keys.
+                - INFERENCE_BACKEND (dict): Optional inference backend settings, with the
+                  backend, int8 and calibration_data keys.
+            registry (ModelRegistry): Registry sharing the models.
         """
-        self.pose_model = YOLO(config['POSE_ESTIMATION_MODEL'])
-        self.weapon_model = YOLO(config['WEAPON_DETECTION_MODEL'])
+        backend = config.get('INFERENCE_BACKEND', {})
+        self._pose_model = acquire_yolo(config['POSE_ESTIMATION_MODEL'], task='pose',
+                                        registry=registry, **backend)
+        self._weapon_model = acquire_yolo(config['WEAPON_DETECTION_MODEL'], task='detect',
+                                          registry=registry, **backend)
         self.conf = 0.439
 
-    def boxes(self, frame: np.ndarray) -> list:
+        resolution = config.get('WEAPON_DETECTION', {})
+        self.max_imgsz = resolution.get('max_imgsz', 4000)
+        self.multiscale = resolution.get('multiscale', False)
+        self.low_imgsz = resolution.get('low_imgsz', 640)
+        self.tile_size = resolution.get('tile_size', 640)
+
+    @property
+    def pose_model(self) -> 'YOLO':
+        """YOLO model used for pose estimation, loaded on first use (not locked: the detector
+        calls it through its handle, serialized with the other threads)."""
+        return self._pose_model.get()
+
+    @property
+    def weapon_model(self) -> 'YOLO':
+        """YOLO model used for weapon detection, loaded on first use (not locked: the detector
+        calls it through its handle, serialized with the other threads)."""
+        return self._weapon_model.get()
+
+    def warm_up(self, frame: np.ndarray) -> None:
+        """
+        Load both models and run them once, so the first real frame does not pay for it.
+
+        The weapon model is run directly, since `analyze` skips it on frames without hands.
+
+        Args:
+            frame (np.ndarray): A frame with the size of the frames to be processed.
+        """
+        self._pose_model(frame, verbose=False)
+        imgsz = self.low_imgsz if self.multiscale else self.imgsz(frame, self.max_imgsz)
+        self._weapon_model(frame, imgsz=imgsz, conf=self.conf, iou=0.3, verbose=False)
+
+    def close(self) -> None:
+        """Release the models, which are dropped when no other detector uses them."""
+        self._pose_model.release()
+        self._weapon_model.release()
+
+    def analyze(self, frame: np.ndarray,
+                keypoints: Optional[np.ndarray] = None) -> WeaponAnalysis:
+        """
+        Detect the weapons held by people in the image frame.
+
+        The pose model (unless the hand keypoints are given) and the weapon model run once,
+        and every other result of the frame (alert, boxes, annotated image) is derived from
+        the returned analysis. Frames without hands skip the weapon model, since no weapon
+        could be associated to a person.
+
+        In multi-scale mode the weapon model first runs on the whole frame at `low_imgsz`,
+        then at full resolution on `tile_size` tiles around the hands (in a single batch),
+        so small weapons are still found without running the model on the whole 4K frame.
+
+        Args:
+            frame (np.ndarray): The image frame to be analyzed.
+            keypoints (np.ndarray): Hand keypoints already computed for the frame. If None, the
+                                    pose model is run to obtain them.
+
+        Returns:
+            WeaponAnalysis: The weapons held by people and the hand keypoints of the frame.
+        """
+        person_boxes = None
+        if keypoints is None:
+            person_boxes, keypoints = self.people_boxes(frame)
+
+        if len(np.asarray(keypoints).reshape(-1, 2)) == 0:
+            detections = np.empty((0, 5), dtype=np.float32)
+        elif self.multiscale:
+            detections = self._multiscale_detections(frame, keypoints)
+        else:
+            with self._weapon_model.locked() as model, stage_timer('weapon_detection'):
+                results = model(frame, imgsz=self.imgsz(frame, self.max_imgsz),
+                               conf=self.conf, iou=0.3, verbose=False)[0]
+            detections = self._detections(results)
+
+        return self._analysis(detections, keypoints, person_boxes)
+
+    def _multiscale_detections(self, frame: np.ndarray, keypoints: np.ndarray) -> np.ndarray:
+        """
+        Detect weapons with a low-resolution pass and full-resolution tiles around the hands.
+
+        Args:
+            frame (np.ndarray): The image frame to be analyzed.
+            keypoints (np.ndarray): Hand keypoints of the frame.
+
+        Returns:
+            np.ndarray: An (m, 5) array of normalized [x1, y1, x2, y2, conf] detections.
+        """
+        low_imgsz = self.imgsz(frame, min(self.low_imgsz, self.max_imgsz))
+        with self._weapon_model.locked() as model, stage_timer('weapon_detection'):
+            results = model(frame, imgsz=low_imgsz, conf=self.conf, iou=0.3, verbose=False)[0]
+        detections = [self._detections(results)]
+
+        # The low-resolution pass already saw the frame at full resolution
+        height, width = frame.shape[:2]
+        tiles = hand_tiles(keypoints, frame.shape, self.tile_size)
+        if max(height, width) > low_imgsz and tiles:
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+            with self._weapon_model.locked() as model, stage_timer('weapon_detection'):
+                results = model(crops, imgsz=self.imgsz(crops[0], self.max_imgsz),
+                               conf=self.conf, iou=0.3, verbose=False)
+            for (x1, y1, x2, y2), result in zip(tiles, results):
+                tile = self._detections(result)
+                tile[:, [0, 2]] = (tile[:, [0, 2]] * (x2 - x1) + x1) / width
+                tile[:, [1, 3]] = (tile[:, [1, 3]] * (y2 - y1) + y1) / height
+                detections.append(tile)
+
+        return non_max_suppression(np.vstack(detections), 0.3)
+
+    def analyze_batch(self, frames: list[np.ndarray],
+                      keypoints: Optional[list[np.ndarray]] = None) -> list[WeaponAnalysis]:
+        """
+        Detect the weapons held by people in several image frames.
+
+        Frames with the same shape share the inference size, so they are run in a single
+        weapon model call. As in `analyze`, frames without hands skip the weapon model. In
+        multi-scale mode each frame is analyzed on its own, with its tiles in a single call.
+
+        Args:
+            frames (list): The image frames to be analyzed.
+            keypoints (list): Hand keypoints already computed for each frame. If None (or None
+                              for some frames), the pose model is run in batch to obtain them.
+
+        Returns:
+            list: The analysis of each frame.
+        """
+        keypoints = list(keypoints) if keypoints is not None else [None] * len(frames)
+        missing = [position for position, hands in enumerate(keypoints) if hands is None]
+        if missing:
+            people = self.people_batch([frames[position] for position in missing])
+            for position, (_, hands) in zip(missing, people):
+                keypoints[position] = hands
+
+        analyses: list = [self._analysis(np.empty((0, 5), dtype=np.float32), hands)
+                          for hands in keypoints]
+        with_hands = [position for position, hands in enumerate(keypoints)
+                      if len(np.asarray(hands).reshape(-1, 2))]
+        for group in group_frames([frames[position] for position in with_hands]):
+            group = [with_hands[i] for i in group]
+            if self.multiscale:
+                for position in group:
+                    analyses[position] = self.analyze(frames[position], keypoints[position])
+                continue
+
+            with self._weapon_model.locked() as model, stage_timer('weapon_detection'):
+                results = model([frames[i] for i in group],
+                               imgsz=self.imgsz(frames[group[0]], self.max_imgsz),
+                               conf=self.conf, iou=0.3, verbose=False)
+            for position, result in zip(group, results):
+                analyses[position] = self._analysis(self._detections(result),
+                                                    keypoints[position])
+
+        return analyses
+
+    def boxes(self, frame: np.ndarray, keypoints: Optional[np.ndarray] = None) -> list:
         """
         Get bounding boxes for detected weapons in the image frame.
 
         Args:
             frame (np.ndarray): The image frame to be analyzed.
+            keypoints (np.ndarray): Hand keypoints already computed for the frame. If None, the
+                                    pose model is run to obtain them.
+
+        Returns:
+            list: A list of [x1, y1, x2, y2, conf, person] weapon detections, with normalized
+                  coordinates and the index of the person holding the weapon.
+        """
+        return self.analyze(frame, keypoints).detections()
+
+    def boxes_batch(self, frames: list[np.ndarray],
+                    keypoints: Optional[list[np.ndarray]] = None) -> list[list]:
+        """
+        Get bounding boxes for detected weapons in several image frames.
+
+        Args:
+            frames (list): The image frames to be analyzed.
+            keypoints (list): Hand keypoints already computed for each frame. If None (or None
+                              for some frames), the pose model is run in batch to obtain them.
+
+        Returns:
+            list: For each frame, a list of [x1, y1, x2, y2, conf, person] weapon detections.
+        """
+        return [analysis.detections() for analysis in self.analyze_batch(frames, keypoints)]
+
+    @staticmethod
+    def imgsz(frame: np.ndarray, max_imgsz: int = 4000) -> int:
+        """
+        Get the weapon model inference size for a frame: its long side, up to `max_imgsz`
+        pixels, rounded down to a multiple of 32.
+
+        Args:
+            frame (np.ndarray): The image frame to be analyzed.
+            max_imgsz (int): Maximum inference size.
+
+        Returns:
+            int: The inference size.
+        """
+        imgsz = min(max(frame.shape[0], frame.shape[1]), max_imgsz)
+        return max(imgsz - imgsz % 32, 32)
+
+    @staticmethod
+    def _detections(result: 'Results') -> np.ndarray:
+        """
+        Get the normalized boxes and confidences of a weapon model result.
+
+        Args:
+            result (Results): The weapon model result of a frame.
+
+        Returns:
+            np.ndarray: An (m, 5) array of [x1, y1, x2, y2, conf] detections.
+        """
+        return np.hstack([result.boxes.xyxyn.cpu().numpy().reshape(-1, 4),
+                          result.boxes.conf.cpu().numpy().reshape(-1, 1)])
+
+    @classmethod
+    def _analysis(cls, detections: np.ndarray, keypoints: np.ndarray,
+                  person_boxes: Optional[np.ndarray] = None) -> WeaponAnalysis:
+        """
+        Build the analysis of a frame from its weapon detections and hand keypoints.
+
+        Args:
+            detections (np.ndarray): An (m, 5) array of [x1, y1, x2, y2, conf] detections.
+            keypoints (np.ndarray): Hand keypoints of the people of the frame.
+            person_boxes (np.ndarray): Pixel boxes of the people of the frame, if known.
 
         Returns:
-            list: A list of bounding boxes for detected weapons.
+            WeaponAnalysis: The weapons held by people and the hand keypoints of the frame.
         """
-        imgsz = min(max(frame.shape[0], frame.shape[1]), 4000)
-        imgsz -= imgsz % 32
+        held, persons = cls._associate(detections, keypoints)
+        return WeaponAnalysis(held[:, :4], held[:, 4], persons,
+                              np.asarray(keypoints, dtype=np.float32).reshape(-1, 2, 2),
+                              person_boxes)
 
-        results = self.weapon_model(frame, imgsz=imgsz, conf=self.conf,
-                                    iou=0.3, verbose=False)[0].boxes
-        results = [x[0] + [x[1]] for x in zip(results.xyxyn.cpu().tolist(),
-                                              results.conf.cpu().tolist())]
-        keypoints = self.keypoints(frame)
+    @staticmethod
+    def _associate(detections: np.ndarray, keypoints: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Keep only the weapon detections that contain a hand keypoint, with the person holding
+        each of them.
 
-        boxes = []
-        for detection in results:
-            for keypoint in keypoints:
-                if (detection[0] <= keypoint[0] <= detection[2] and
-                        detection[1] <= keypoint[1] <= detection[3]):
-                    boxes.append(detection)
-                    break
+        Every hand is tested against every box at once by broadcasting. When the hands of
+        several people fall inside a box, the weapon goes to the person whose hand is closest
+        to the box center.
 
-        return boxes
+        Args:
+            detections (np.ndarray): An (m, 5) array of [x1, y1, x2, y2, conf] detections.
+            keypoints (np.ndarray): Hand keypoints as an (n, 2, 2) array with the two hands of
+                                    each person (a flat list of [x, y] points is also accepted).
 
-    def keypoints(self, frame: np.ndarray) -> list:
+        Returns:
+            tuple: The (k, 5) array of the detections that contain at least one hand, and the
+                   index of the person holding each of them.
+        """
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+        hands = np.asarray(keypoints, dtype=np.float32).reshape(-1, 2, 2)
+        if len(detections) == 0 or len(hands) == 0:
+            return np.empty((0, 5), dtype=np.float32), np.empty(0, dtype=int)
+
+        # (m, 1, 1) boxes against (1, n, 2) hands
+        x1, y1, x2, y2 = (detections[:, i, None, None] for i in range(4))
+        x, y = hands[None, :, :, 0], hands[None, :, :, 1]
+        inside = (x1 <= x) & (x <= x2) & (y1 <= y) & (y <= y2)
+
+        centers = (detections[:, None, None, :2] + detections[:, None, None, 2:4]) / 2
+        distances = np.where(inside, np.linalg.norm(hands[None] - centers, axis=-1), np.inf)
+        closest = distances.min(axis=2)
+
+        held = inside.any(axis=(1, 2))
+        return detections[held], closest[held].argmin(axis=1)
+
+    def keypoints(self, frame: np.ndarray) -> np.ndarray:
         """
          Get keypoints for detected people in the image frame.
 
@@ -87,58 +407,238 @@ class WeaponDetector:
              frame (np.ndarray): The image frame to be analyzed.
 
          Returns:
-             list: A list of keypoints for detected people.
+             np.ndarray: The hand keypoints of the detected people, as an (n, 2, 2) array.
          """
-        results = self.pose_model(frame, verbose=False)[0].keypoints.xyn.cpu().tolist()
-        hand_keypoints = []
-        ratio = 0.3
+        return self.people(frame)[1]
+
+    def people(self, frame: np.ndarray) -> tuple[int, np.ndarray]:
+        """
+        Run the pose model once and get both the number of people and their hand keypoints.
+
+        Args:
+            frame (np.ndarray): The image frame to be analyzed.
+
+        Returns:
+            tuple: The number of people detected and their hand keypoints as an (n, 2, 2)
+                   array.
+        """
+        with self._pose_model.locked() as model, stage_timer('pose'):
+            pose = model(frame, verbose=False)[0]
+        return self._hands(pose)
+
+    def people_boxes(self, frame: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Run the pose model once and get both the boxes of the people and their hand keypoints.
+
+        Args:
+            frame (np.ndarray): The image frame to be analyzed.
+
+        Returns:
+            tuple: The person boxes as an (n, 4) array of [x1, y1, x2, y2] pixels and their
+                   hand keypoints as an (n, 2, 2) array, in the same order.
+        """
+        with self._pose_model.locked() as model, stage_timer('pose'):
+            pose = model(frame, verbose=False)[0]
+        return pose.boxes.xyxy.cpu().numpy(), self._hands(pose)[1]
+
+    def people_batch(self, frames: list[np.ndarray]) -> list[tuple[int, np.ndarray]]:
+        """
+        Get the number of people and their hand keypoints in several image frames.
 
-        for person in results:
-            if person:
-                hand1 = [person[9][0] + (person[9][0] - person[7][0]) *
-                         ratio, person[9][1] + (person[9][1] - person[7][1]) * ratio]
-                hand2 = [person[10][0] + (person[10][0] - person[8][0]) *
-                         ratio, person[10][1] + (person[10][1] - person[8][1]) * ratio]
-                hand_keypoints.append(hand1)
-                hand_keypoints.append(hand2)
+        Frames with the same shape are run in a single pose model call.
+
+        Args:
+            frames (list): The image frames to be analyzed.
+
+        Returns:
+            list: For each frame, the number of people detected and their hand keypoints as an
+                  (n, 2, 2) array.
+        """
+        people: list[tuple[int, np.ndarray]] = [(0, np.empty((0, 2, 2), dtype=np.float32))
+                                                for _ in frames]
+        for group in group_frames(frames):
+            with self._pose_model.locked() as model, stage_timer('pose'):
+                results = model([frames[i] for i in group], verbose=False)
+            for position, result in zip(group, results):
+                people[position] = self._hands(result)
+
+        return people
+
+    @staticmethod
+    def _hands(pose: 'Results') -> tuple[int, np.ndarray]:
+        """
+        Get the number of people and their hand keypoints from a pose model result.
+
+        Args:
+            pose (Results): The pose model result of a frame.
 
-        return hand_keypoints
+        Returns:
+            tuple: The number of people detected and their hand keypoints as an (n, 2, 2)
+                   array.
+        """
+        return len(pose.boxes), hand_keypoints(pose.keypoints.xyn.cpu().numpy())
 
-    def plot(self, frame: np.ndarray) -> np.ndarray:
+    def plot(self, frame: np.ndarray, analysis: Optional[WeaponAnalysis] = None) -> np.ndarray:
         """
         Annotate the image with detected weapons and keypoints.
 
         Args:
             frame (np.ndarray): The image frame to be annotated.
+            analysis (WeaponAnalysis): Analysis already computed for the frame. If None, the
+                                       frame is analyzed.
 
         Returns:
             np.ndarray: The annotated image frame.
         """
-        boxes = self.boxes(frame)
-        keypoints = self.keypoints(frame)
+        return self.annotate(frame, self.analyze(frame) if analysis is None else analysis)
+
+    @staticmethod
+    def annotate(frame: np.ndarray, analysis: WeaponAnalysis) -> np.ndarray:
+        """
+        Draw an analysis on its frame: the held weapons, with the index of the person holding
+        them and their confidence, and the hand keypoints.
 
+        Args:
+            frame (np.ndarray): The image frame to be annotated.
+            analysis (WeaponAnalysis): Analysis of the frame.
+
+        Returns:
+            np.ndarray: The annotated image frame.
+        """
         height = frame.shape[0]
         width = frame.shape[1]
 
-        for box in boxes:
+        for box, score, person in zip(analysis.boxes, analysis.scores, analysis.persons):
             pt1 = (round(box[0] * width), round(box[1] * height))
             pt2 = (round(box[2] * width), round(box[3] * height))
             frame = cv2.rectangle(frame, pt1, pt2, (0, 0, 255), 10)
+            frame = cv2.putText(frame, f"{int(person)}: {score:.2f}",
+                                (pt1[0], max(pt1[1] - 15, 0)), cv2.FONT_HERSHEY_SIMPLEX,
+                                1.5, (0, 0, 255), 3)
 
-        for keypoint in keypoints:
+        for keypoint in analysis.keypoints.reshape(-1, 2):
             center = (round(keypoint[0] * width), round(keypoint[1] * height))
             frame = cv2.circle(frame, center, 20, (0, 255, 0), -1)
 
         return frame
 
-    def alert(self, frame):
+    def alert(self, frame: np.ndarray, keypoints: Optional[np.ndarray] = None) -> bool:
         """
         Check if any weapons are detected in the image frame.
 
         Args:
             frame (np.ndarray): The image frame to be analyzed.
+            keypoints (np.ndarray): Hand keypoints already computed for the frame. If None, the
+                                    pose model is run to obtain them.
 
         Returns:
             bool: True if weapons are detected, False otherwise.
         """
-        return len(self.boxes(frame)) > 0
+        return self.analyze(frame, keypoints).alert
+
+    def alert_batch(self, frames: list[np.ndarray],
+                    keypoints: Optional[list[np.ndarray]] = None) -> list[bool]:
+        """
+        Check if any weapons are detected in each of several image frames.
+
+        Args:
+            frames (list): The image frames to be analyzed.
+            keypoints (list): Hand keypoints already computed for each frame. If None (or None
+                              for some frames), the pose model is run in batch to obtain them.
+
+        Returns:
+            list: For each frame, True if weapons are detected, False otherwise.
+        """
+        return [analysis.alert for analysis in self.analyze_batch(frames, keypoints)]
+
+
+def hand_keypoints(keypoints: np.ndarray, ratio: float = 0.3) -> np.ndarray:
+    """
+    Estimate the hand positions of every person by extrapolating the forearms.
+
+    Each hand is placed past the wrist along the elbow to wrist direction, by `ratio` of the
+    forearm length, for all the people at once.
+
+    Args:
+        keypoints (np.ndarray): COCO pose keypoints as an (n, 17, 2) array.
+        ratio (float): Fraction of the forearm length added past the wrist.
+
+    Returns:
+        np.ndarray: The (n, 2, 2) array of the [x, y] positions of the two hands of each person.
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    if keypoints.ndim != 3 or keypoints.shape[1] < 11:
+        return np.empty((0, 2, 2), dtype=np.float32)
+
+    wrists = keypoints[:, [9, 10]]
+    elbows = keypoints[:, [7, 8]]
+    return wrists + (wrists - elbows) * ratio
+
+
+def hand_tiles(keypoints: np.ndarray, shape: tuple[int, ...],
+               tile_size: int) -> list[tuple[int, int, int, int]]:
+    """
+    Get the full-resolution tiles in which weapons held by the hands are searched.
+
+    Each tile is a `tile_size` square centered on a hand and shifted to fit inside the frame,
+    so all the tiles of a frame have the same shape and run in one batch. Hands already near
+    the center of a previous tile (within a quarter of its side) do not get their own tile.
+
+    Args:
+        keypoints (np.ndarray): Normalized hand keypoints as an (n, 2, 2) array or a flat list
+                                of [x, y] points.
+        shape (tuple): Shape of the frame.
+        tile_size (int): Side of the tiles in pixels.
+
+    Returns:
+        list: Tiles as (x1, y1, x2, y2) pixel coordinates.
+    """
+    height, width = shape[:2]
+    tile_width, tile_height = min(tile_size, width), min(tile_size, height)
+    hands = np.asarray(keypoints, dtype=np.float32).reshape(-1, 2) * [width, height]
+
+    tiles: list[tuple[int, int, int, int]] = []
+    centers: list[np.ndarray] = []
+    for hand in hands:
+        if any(np.all(np.abs(hand - center) <= tile_size / 4) for center in centers):
+            continue
+        x1 = int(np.clip(round(hand[0] - tile_width / 2), 0, width - tile_width))
+        y1 = int(np.clip(round(hand[1] - tile_height / 2), 0, height - tile_height))
+        tile = (x1, y1, x1 + tile_width, y1 + tile_height)
+        if tile not in tiles:
+            tiles.append(tile)
+        centers.append(hand)
+
+    return tiles
+
+
+def non_max_suppression(detections: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Remove the detections overlapping a more confident one.
+
+    Args:
+        detections (np.ndarray): An (m, 5) array of [x1, y1, x2, y2, conf] detections.
+        iou_threshold (float): Maximum intersection over union with a kept detection.
+
+    Returns:
+        np.ndarray: The kept detections, by decreasing confidence.
+    """
+    detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+    detections = detections[np.argsort(-detections[:, 4], kind='stable')]
+    areas = (detections[:, 2] - detections[:, 0]) * (detections[:, 3] - detections[:, 1])
+
+    keep = np.ones(len(detections), dtype=bool)
+    for i in range(len(detections)):
+        if not keep[i]:
+            continue
+        others = detections[i + 1:]
+        width = np.clip(np.minimum(others[:, 2], detections[i, 2]) -
+                        np.maximum(others[:, 0], detections[i, 0]), 0, None)
+        height = np.clip(np.minimum(others[:, 3], detections[i, 3]) -
+                         np.maximum(others[:, 1], detections[i, 1]), 0, None)
+        intersection = width * height
+        iou = intersection / np.maximum(areas[i] + areas[i + 1:] - intersection,
+                                        np.finfo(np.float32).eps)
+        keep[i + 1:] &= iou <= iou_threshold
+
+    return detections[keep]